@@ -3,6 +3,7 @@ from video_gen.settings import setting_init
 from video_gen.logger import logging_init
 from video_gen.audio_gen import discover_tts_models
 from video_gen.video_gen import generate_video
+from video_gen.editor.ffmpeg import FFmpeg
 from dotenv import load_dotenv
 
 
@@ -18,6 +19,9 @@ def init(
     logging_init(debug or setting.debug, log_to_console)          # setting up logging info
     load_dotenv()                                                 # loading all the api keys
     discover_tts_models()                                         # setup audio package 
+    missing = FFmpeg().check_capabilities()                       # fail now, not mid render
+    if missing:
+        raise RuntimeError(f"ffmpeg is missing required features: {', '.join(missing)}")
     # setup image_gen
     # video_gen then
     
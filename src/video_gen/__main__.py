@@ -1,10 +1,13 @@
 from argparse import ArgumentParser, Namespace
 from video_gen import generate_video
 from video_gen.utils import TempFile  
+from video_gen.editor.cache import media_cache
+from video_gen.editor.trace import tracer, summarize_trace, format_summary
 from video_gen import init
 import logging
 import json
 import sys
+import os
 
 
 def parse_arguments() -> Namespace:
@@ -25,6 +28,14 @@ def parse_arguments() -> Namespace:
         action="store_true",
         help="Enable debug mode (logs more details)."
     )
+    parser.add_argument(
+        "--trace",
+        type=str,
+        metavar="TRACE_FILE",
+        default=None,
+        help="Record every ffmpeg invocation (args, wall/CPU time, RSS, I/O) to a JSONL "
+             "file and print the most expensive stages at the end."
+    )
     return parser.parse_args()
 
 
@@ -57,6 +68,8 @@ def execute(file_path:str) -> None:
                 logging.error(f"An unexpected error occurred while reading the JSON file: {e}")
                 raise
         
+        engion.prepare(json_data)
+        
         for task in json_data:
             try:
                 engion.execute(task)
@@ -77,6 +90,8 @@ def execute(file_path:str) -> None:
     
     finally:
         TempFile.cleanup()
+        media_cache.save()
+        logging.info(f"ffprobe metadata cache: {media_cache.stats}")
 
 
 def main() -> int:
@@ -93,7 +108,14 @@ def main() -> int:
     args = parse_arguments() 
     
     init(args.debug)         #inisalize video_gen 
-    execute(args.file_path)  #execute the code
+    if args.trace:
+        tracer.enable(args.trace)
+    
+    try:
+        execute(args.file_path)  #execute the code
+    finally:
+        if args.trace and os.path.exists(args.trace):
+            print(format_summary(summarize_trace(args.trace)))
     return 0
 
 if __name__ == "__main__":
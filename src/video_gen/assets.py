@@ -124,11 +124,13 @@ class Assets:
     
 from video_gen.editor.media import Video, Audio
 from video_gen.editor.ffmpeg import ffmpeg
+from video_gen.editor.profiles import get_profile
 from PIL import ImageFont, ImageDraw, Image
 import numpy as np
 import cv2
 import os
 import shutil
+import tempfile
 from typing import Optional, Tuple
 
 def hex_to_rgba(hex_color: str) -> Tuple[int, int, int, int]:
@@ -352,18 +354,18 @@ def countdown_video(
     color: str = "#FFFFFF",
     font_path: str = "path/to/font.ttf",
     output_file: str = "countdown.mov",
-    audio: Optional[str] = None
+    audio: Optional[str] = None,
+    fps=24
 ) -> str:
-    """Creates a countdown video with optional audio."""
+    """Creates a countdown video with optional audio, at the job's frame rate `fps`."""
     
     color = hex_to_rgba(color)
-    fps = 24  
     duration = 1  
-    total_frames = fps * duration  
+    total_frames = round(fps * duration)  
     fade_duration = fps * 0.5  
 
-    output_folder = os.path.join(os.path.dirname(output_file), "frames")
-    os.makedirs(output_folder, exist_ok=True)
+    # a private frame folder: countdowns rendered next to each other must not share frames
+    output_folder = tempfile.mkdtemp(prefix="frames_", dir=os.path.dirname(output_file) or None)
 
     if not os.path.exists(font_path):
         raise FileNotFoundError(f"Font file not found: {font_path}")
@@ -417,9 +419,7 @@ def countdown_video(
     cmd = [
         "-framerate", str(fps),
         "-i", os.path.join(output_folder, "frame_%04d.png"),
-        "-c:v", "prores_ks",
-        "-profile:v", "4444",
-        "-pix_fmt", "yuva444p10le",
+        *get_profile('intermediate', alpha=True).video_args(),
         "-y", output_file
     ]
 
@@ -446,11 +446,8 @@ def countdown_video(
         f"[audio_louder] afade=t=out:st={video_duration-1}:d=1 [final_audio]",
         "-map", "0:v",
         "-map", "[final_audio]",
-        "-c:v", "prores_ks",
-        "-profile:v", "4444",
-        "-pix_fmt", "yuva444p10le",
-        "-c:a", "aac",
-        "-b:a", "192k",
+        *get_profile('intermediate', alpha=True).video_args(),
+        "-c:a", "pcm_s16le",  # lossless: encoded once, by the final render
         "-shortest",
         "-y", output_file
     ]
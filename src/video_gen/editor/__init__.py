@@ -1,11 +1,16 @@
 from video_gen.editor.ffmpeg import FFmpeg
 from video_gen.editor.subtitles_gen import gen_trans_sub, typing_gen_trans_sub, typing_gen_trans_sub_std
-from video_gen.editor.edit import edit, add_video_info
-from video_gen.editor.effects import effect_get
+from video_gen.editor.edit import edit, add_video_info, compose_final
+from video_gen.editor.effects import effect_get, apply_effects
+from video_gen.editor.filtergraph import FilterGraph, Pad
+from video_gen.editor.layers import StaticLayer
+from video_gen.editor.audio_master import AudioTimeline
+from video_gen.editor.output_format import OutputFormat
 
 
 
 __all__ = [
     'FFmpeg', 'gen_trans_sub', 'edit', 'effect_get', 'add_video_info', 'typing_gen_trans_sub',
-    'typing_gen_trans_sub_std'
+    'typing_gen_trans_sub_std', 'compose_final', 'apply_effects', 'FilterGraph', 'Pad',
+    'StaticLayer', 'AudioTimeline', 'OutputFormat'
 ]   
\ No newline at end of file
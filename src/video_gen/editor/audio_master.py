@@ -0,0 +1,231 @@
+from video_gen.editor.pcm import load_pcm
+from typing import List, Optional
+import numpy as np
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+# The master is written as raw float32 PCM in this format; read it back with
+# MASTER_INPUT_ARGS placed before its -i.
+MASTER_SAMPLE_RATE = 48000
+MASTER_CHANNELS = 2
+MASTER_INPUT_ARGS = ['-f', 'f32le', '-ar', str(MASTER_SAMPLE_RATE), '-ac', str(MASTER_CHANNELS)]
+
+
+class AudioCue:
+    """
+    One sound on an audio timeline.
+
+    Attributes:
+        file_path (str): Any file with an audio stream.
+        start (float): Where it starts on the timeline, in seconds.
+        length (float or None): How much of it to play, None for all of it.
+        gain (float): Volume factor.
+        fade_out (float): Length of a linear fade out at its end, in seconds.
+        align (str): "start" plays the beginning of the file, "end" its end
+            (a file longer than `length` is cut from the front).
+        loop (bool): Repeat a file shorter than `length` until it fills it.
+    """
+    __slots__ = ('file_path', 'start', 'length', 'gain', 'fade_out', 'align', 'loop')
+
+    def __init__(
+        self,
+        file_path: str,
+        start: float = 0.0,
+        length: Optional[float] = None,
+        gain: float = 1.0,
+        fade_out: float = 0.0,
+        align: str = 'start',
+        loop: bool = False
+    ) -> None:
+        if align not in ('start', 'end'):
+            raise ValueError(f"Unknown cue alignment: {align}")
+        self.file_path = str(file_path)
+        self.start = float(start)
+        self.length = None if length is None else float(length)
+        self.gain = gain
+        self.fade_out = fade_out
+        self.align = align
+        self.loop = loop
+
+    def __repr__(self) -> str:
+        return f"AudioCue(file_path={self.file_path}, start={self.start}, length={self.length}, gain={self.gain})"
+
+
+class AudioTimeline:
+    """
+    The sounds of a video (narration, sound effects, music) placed on one
+    timeline and mixed with NumPy.
+
+    Every source is decoded once to float32 PCM (see `load_pcm`) and the mix
+    is written as raw PCM, so the audio is encoded exactly once, by the final
+    mux, instead of once by every video stage it passes through.
+
+    Example:
+        >>> timeline = AudioTimeline()
+        >>> timeline.append('line_1.mp3', 3.2)     # under the first subtitle clip
+        >>> timeline.append('line_2.mp3', 2.5)     # under the second one
+        >>> timeline.render('master.f32')
+
+    Attributes:
+        cues (List[AudioCue]): The sounds, in the order they were added.
+        cursor (float): End of the last slot reserved with `append`, in seconds.
+    """
+    def __init__(self) -> None:
+        self.cues: List[AudioCue] = []
+        self.cursor = 0.0
+
+    def add(self, file_path: str, start: float = 0.0, **options) -> AudioCue:
+        """
+        Place a sound at `start` seconds. `options` are the other `AudioCue`
+        attributes. Returns the cue.
+        """
+        cue = AudioCue(file_path, start, **options)
+        self.cues.append(cue)
+        return cue
+
+    def append(self, file_path: str, length: float, **options) -> AudioCue:
+        """
+        Place a sound at the cursor and move the cursor `length` seconds on:
+        the sound plays under the next `length` seconds of video (cut to that
+        length when it is longer).
+        """
+        cue = self.add(file_path, self.cursor, length=length, **options)
+        self.cursor += float(length)
+        return cue
+
+    def copy(self) -> 'AudioTimeline':
+        timeline = AudioTimeline()
+        timeline.cues = list(self.cues)
+        timeline.cursor = self.cursor
+        return timeline
+
+    def mix(self, duration: Optional[float] = None) -> np.ndarray:
+        """
+        Mix every cue into one array.
+
+        Levels add up; where the mix goes above full scale it is turned down
+        around that spot only (see `limit`), the rest keeps its level.
+
+        Args:
+            duration (float, optional): Length of the mix. Defaults to the end
+                of the last sound.
+
+        Returns:
+            np.ndarray: float32 samples, shape (frames, MASTER_CHANNELS).
+        """
+        rate = MASTER_SAMPLE_RATE
+        tracks = []
+        for cue in self.cues:
+            samples = load_pcm(cue.file_path, rate, MASTER_CHANNELS)
+            if cue.length is not None:
+                count = round(cue.length * rate)
+                if cue.loop and 0 < len(samples) < count:
+                    samples = np.tile(samples, (math.ceil(count / len(samples)), 1))
+                count = min(len(samples), count)
+                samples = samples[len(samples) - count:] if cue.align == 'end' else samples[:count]
+            tracks.append((round(cue.start * rate), samples, cue))
+
+        if duration is not None:
+            end = round(duration * rate)
+        else:
+            end = max((start + len(samples) for start, samples, _ in tracks), default=0)
+
+        master = np.zeros((end, MASTER_CHANNELS), dtype=np.float32)
+        for start, samples, cue in tracks:
+            count = min(len(samples), end - start)
+            if count <= 0:
+                continue
+            part = samples[:count] * np.float32(cue.gain)
+            fade = min(count, round(cue.fade_out * rate))
+            if fade:
+                part[count - fade:] *= np.linspace(1, 0, fade, dtype=np.float32)[:, None]
+            master[start:start + count] += part
+
+        return limit(master, rate)
+
+    def render(self, output_path: str, duration: Optional[float] = None) -> str:
+        """
+        Mix the timeline and write it to `output_path` as raw float32 PCM
+        (read it with MASTER_INPUT_ARGS). Returns `output_path`.
+        """
+        self.mix(duration).tofile(str(output_path))
+        return str(output_path)
+
+    def __len__(self) -> int:
+        return len(self.cues)
+
+    def __repr__(self) -> str:
+        return f"AudioTimeline(cues={len(self.cues)}, cursor={self.cursor:.3f})"
+
+
+def limit(samples: np.ndarray, rate: int = MASTER_SAMPLE_RATE, block: float = 0.01, hold: float = 0.05) -> np.ndarray:
+    """
+    Keep `samples` within full scale by turning down only the blocks that
+    go above it.
+
+    Each `block` seconds long block gets the gain bringing its peak to 1.0;
+    a reduction is held over `hold` seconds on either side and interpolated
+    between blocks, so the level ramps down and back up instead of jumping.
+    Everything away from an overload passes unchanged. Works in place.
+
+    Returns:
+        np.ndarray: `samples`.
+    """
+    if not len(samples):
+        return samples
+    size = max(1, round(block * rate))
+    count = math.ceil(len(samples) / size)
+    padded = np.zeros((count * size, samples.shape[1]), dtype=samples.dtype)
+    padded[:len(samples)] = np.abs(samples)
+    peaks = padded.reshape(count, -1).max(axis=1)
+    if peaks.max() <= 1:
+        return samples
+
+    gains = np.minimum(1.0, 1.0 / np.maximum(peaks, 1e-9))
+    reach = max(1, round(hold / block))
+    held = np.pad(gains, reach, constant_values=1.0)
+    gains = np.min([held[i:i + count] for i in range(2 * reach + 1)], axis=0)
+
+    loud = np.count_nonzero(peaks > 1) * size / rate
+    logger.debug(f"Audio master peaks at {peaks.max():.2f}, limiting {loud:.2f}s of it")
+    centers = np.arange(count) * size + (size - 1) / 2
+    envelope = np.interp(np.arange(len(samples)), centers, gains).astype(samples.dtype)
+    samples *= envelope[:, None]
+    return np.clip(samples, -1.0, 1.0, out=samples)
+
+
+def master_audio(
+    timeline: AudioTimeline,
+    output_path: str,
+    duration: Optional[float] = None,
+    bg_audio: Optional[str] = None,
+    bg_volume: float = 0.3,
+    end_audio: Optional[str] = None
+) -> str:
+    """
+    Write the final audio of a video: the timeline, background music under
+    its first `duration` seconds (looped when it is shorter) and the end
+    video's audio after them.
+
+    Args:
+        timeline (AudioTimeline): Narration and sound effects.
+        output_path (str): Destination of the raw PCM master.
+        duration (float, optional): Length of the main video. Defaults to the
+            timeline's cursor.
+        bg_audio (str, optional): Background music.
+        bg_volume (float, optional): Background music volume. Defaults to 0.3.
+        end_audio (str, optional): File whose audio follows the main video (the end video).
+
+    Returns:
+        str: `output_path`.
+    """
+    timeline = timeline.copy()
+    main = timeline.cursor if duration is None else duration
+    if bg_audio:
+        timeline.add(bg_audio, 0.0, length=main, gain=bg_volume, loop=True)
+    if end_audio:
+        timeline.add(end_audio, main)
+        return timeline.render(output_path)
+    return timeline.render(output_path, main)
@@ -0,0 +1,223 @@
+from video_gen.utils import assets
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import threading
+import logging
+import atexit
+import json
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def file_signature(file_path: str) -> Optional[str]:
+    """
+    Return a cheap fingerprint of a file built from a single stat() call.
+
+    The signature changes whenever the file is rewritten (size, mtime) or
+    replaced by another file at the same path (inode).
+
+    Args:
+        file_path (str): Path to the file.
+
+    Returns:
+        Optional[str]: "size:mtime_ns:inode" or None if the file cannot be stat()ed.
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return f"{stat.st_size}:{stat.st_mtime_ns}:{stat.st_ino}"
+
+
+_prune_lock = threading.Lock()
+
+
+def prune_directory(directory: str, suffix: str, max_bytes: int, keep: Optional[str] = None) -> None:
+    """
+    Cap a directory of cached files at `max_bytes`, removing the least
+    recently used ones (oldest mtime) first. Readers mark a hit as recently
+    used with os.utime().
+
+    Args:
+        directory (str): The cache directory.
+        suffix (str): Only files ending with it are counted and removed.
+        max_bytes (int): Size budget.
+        keep (str, optional): A file never to remove (the one just written).
+    """
+    with _prune_lock:
+        try:
+            entries = [entry for entry in os.scandir(directory) if entry.name.endswith(suffix)]
+        except FileNotFoundError:
+            return
+
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if total <= max_bytes:
+                break
+            if entry.path == keep:
+                continue
+            size = entry.stat().st_size
+            try:
+                os.remove(entry.path)
+                total -= size
+            except OSError as e:
+                logger.warning(f"Could not remove cached file {entry.path}: {e}")
+
+
+class FileCache:
+    """
+    A small persistent LRU cache that maps files to JSON data.
+
+    Entries are keyed by the absolute path of the file and validated against
+    its signature (size, mtime and inode), so a stale entry is never returned
+    after the file changes. The cache is loaded lazily from disk on first use,
+    bounded to `max_entries` (least recently used entries are evicted first)
+    and written back atomically when the interpreter exits or `save()` is called.
+
+    Attributes:
+        cache_file (str): Path of the JSON file backing the cache.
+        max_entries (int): Maximum number of entries kept.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that had to be computed.
+    """
+    _VERSION = 1
+
+    def __init__(self, cache_file: str, max_entries: int = 512, version: int = _VERSION) -> None:
+        """
+        Args:
+            cache_file (str): Path of the JSON file backing the cache.
+            max_entries (int, optional): Maximum number of entries. Defaults to 512.
+            version (int, optional): Format of the cached data; a file written with
+                another version is ignored. Bump it when the data gains fields.
+        """
+        self.cache_file = str(cache_file)
+        self.max_entries = max_entries
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple] = OrderedDict()
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+        atexit.register(self.save)
+
+    def _load(self) -> None:
+        """
+        Read the cache file from disk (once). A missing or corrupted file
+        simply starts an empty cache.
+        """
+        if self._loaded:
+            return
+        self._loaded = True
+
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable cache file {self.cache_file}: {e}")
+            return
+
+        if payload.get("version") != self.version:
+            return
+
+        for path, signature, data in payload.get("entries", [])[-self.max_entries:]:
+            self._entries[path] = (signature, data)
+
+    def get(self, file_path: str) -> Optional[Any]:
+        """
+        Look up the cached data for a file.
+
+        Args:
+            file_path (str): Path to the file.
+
+        Returns:
+            Optional[Any]: The cached data, or None on a miss or stale entry.
+        """
+        path = os.path.abspath(file_path)
+        signature = file_signature(path)
+
+        with self._lock:
+            self._load()
+            entry = self._entries.get(path)
+
+            if signature is None or entry is None or entry[0] != signature:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, file_path: str, data: Any) -> None:
+        """
+        Store data for a file, evicting the least recently used entries
+        when the cache is full.
+
+        Args:
+            file_path (str): Path to the file.
+            data (Any): JSON serialisable data to store.
+        """
+        path = os.path.abspath(file_path)
+        signature = file_signature(path)
+        if signature is None:
+            return
+
+        with self._lock:
+            self._load()
+            self._entries[path] = (signature, data)
+            self._entries.move_to_end(path)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def save(self) -> None:
+        """
+        Atomically write the cache to disk if it changed since the last save.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {
+                "version": self.version,
+                "entries": [[path, sig, data] for path, (sig, data) in self._entries.items()]
+            }
+            self._dirty = False
+
+        temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(temp_file, self.cache_file)
+        except OSError as e:
+            logger.warning(f"Could not write cache file {self.cache_file}: {e}")
+
+    def clear(self) -> None:
+        """
+        Drop every entry and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._loaded = True
+            self._dirty = True
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        Return hit/miss counters and the current number of entries.
+        """
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# version 2: video streams carry profile, level, has_b_frames and extradata_hash
+media_cache = FileCache(os.path.join(assets.cache_path, "media_info.json"), version=2)
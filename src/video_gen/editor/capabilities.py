@@ -0,0 +1,220 @@
+from video_gen.editor.cache import FileCache
+from video_gen.utils import assets
+from typing import Dict, List, Optional, Set
+import subprocess
+import threading
+import logging
+import shutil
+import os
+
+logger = logging.getLogger(__name__)
+
+# Filters and encoders the pipeline cannot work without.
+REQUIRED_FILTERS = (
+    'scale', 'fps', 'trim', 'crop', 'format', 'settb',
+    'loop', 'setpts', 'concat', 'overlay', 'pad', 'amix', 'volume',
+)
+REQUIRED_ENCODERS = ('aac',)
+
+# Filters a stage can do without: the stage degrades instead of failing.
+OPTIONAL_FILTERS = {
+    'xfade': 'clip transitions fall back to a plain concatenation',
+    'zoompan': 'Ken Burns effects are skipped',
+}
+
+capability_cache = FileCache(os.path.join(assets.cache_path, "ffmpeg_capabilities.json"), max_entries=8)
+
+
+class Capabilities:
+    """
+    The encoders, filters and pixel formats a given ffmpeg build supports.
+
+    Attributes:
+        binary (str): Path of the probed ffmpeg executable.
+        encoders (Set[str]): Encoder names (`ffmpeg -encoders`).
+        filters (Set[str]): Filter names (`ffmpeg -filters`).
+        pix_fmts (Set[str]): Pixel format names (`ffmpeg -pix_fmts`).
+    """
+    __slots__ = ('binary', 'encoders', 'filters', 'pix_fmts')
+
+    def __init__(self, binary: str, encoders: Set[str], filters: Set[str], pix_fmts: Set[str]) -> None:
+        self.binary = binary
+        self.encoders = set(encoders)
+        self.filters = set(filters)
+        self.pix_fmts = set(pix_fmts)
+
+    def has_encoder(self, name: str) -> bool:
+        return name in self.encoders
+
+    def has_filter(self, name: str) -> bool:
+        return name in self.filters
+
+    def has_pix_fmt(self, name: str) -> bool:
+        return name in self.pix_fmts
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {
+            'encoders': sorted(self.encoders),
+            'filters': sorted(self.filters),
+            'pix_fmts': sorted(self.pix_fmts),
+        }
+
+    @classmethod
+    def from_dict(cls, binary: str, data: Dict[str, List[str]]) -> 'Capabilities':
+        return cls(binary, data['encoders'], data['filters'], data['pix_fmts'])
+
+    def __repr__(self) -> str:
+        return (
+            f"Capabilities(binary={self.binary}, encoders={len(self.encoders)}, "
+            f"filters={len(self.filters)}, pix_fmts={len(self.pix_fmts)})"
+        )
+
+
+def _list_output(binary: str, option: str) -> str:
+    """Run `ffmpeg -hide_banner <option>` and return its stdout."""
+    result = subprocess.run(
+        [binary, '-hide_banner', option],
+        capture_output=True, text=True, check=True, timeout=30
+    )
+    return result.stdout
+
+
+def _parse_table(output: str) -> Set[str]:
+    """
+    Parse the names of an `-encoders` or `-pix_fmts` listing: a legend, a
+    dashed separator line, then one "<flags> <name> ..." row per entry.
+    """
+    names, in_table = set(), False
+    for line in output.splitlines():
+        parts = line.split()
+        if not in_table:
+            in_table = bool(parts) and set(parts[0]) == {'-'}
+            continue
+        if len(parts) >= 2:
+            names.add(parts[1])
+    return names
+
+
+def _parse_filters(output: str) -> Set[str]:
+    """
+    Parse the names of a `-filters` listing, whose rows look like
+    " TSC xfade  VV->V  Cross fade ...".
+    """
+    names = set()
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) >= 3 and '->' in parts[2]:
+            names.add(parts[1])
+    return names
+
+
+def probe_capabilities(binary: str) -> Capabilities:
+    """
+    Ask an ffmpeg executable for its encoders, filters and pixel formats.
+
+    Args:
+        binary (str): Path or name of the ffmpeg executable.
+
+    Returns:
+        Capabilities: What the executable supports.
+
+    Raises:
+        FileNotFoundError: If the executable does not exist.
+        subprocess.CalledProcessError: If it fails to list its features.
+    """
+    return Capabilities(
+        binary,
+        encoders=_parse_table(_list_output(binary, '-encoders')),
+        filters=_parse_filters(_list_output(binary, '-filters')),
+        pix_fmts=_parse_table(_list_output(binary, '-pix_fmts')),
+    )
+
+
+_binary = assets.ffmpeg
+_probed: Dict[str, Optional[Capabilities]] = {}
+_lock = threading.Lock()
+
+
+def use_binary(binary: str) -> None:
+    """
+    Select the ffmpeg executable whose capabilities `get_capabilities` returns.
+    """
+    global _binary
+    _binary = binary
+
+
+def get_capabilities(binary: Optional[str] = None) -> Optional[Capabilities]:
+    """
+    Return the capabilities of an ffmpeg executable, probing it only once.
+
+    Results are kept for the process and persisted to the capability cache,
+    keyed by the resolved path of the executable and validated by its
+    signature (size, mtime, inode), so a new ffmpeg build is probed again.
+
+    Args:
+        binary (str, optional): Path or name of the executable. Defaults to
+            the one selected with `use_binary` (the configured ffmpeg).
+
+    Returns:
+        Capabilities or None: None if the executable cannot be probed; callers
+        then assume every feature is available.
+    """
+    binary = binary or _binary
+    with _lock:
+        if binary in _probed:
+            return _probed[binary]
+
+        path = shutil.which(binary) or binary
+        data = capability_cache.get(path)
+        if data is not None:
+            capabilities = Capabilities.from_dict(path, data)
+        else:
+            try:
+                capabilities = probe_capabilities(path)
+            except (OSError, subprocess.SubprocessError) as e:
+                logger.warning(f"Could not probe ffmpeg capabilities of {binary}: {e}")
+                capabilities = None
+            else:
+                capability_cache.put(path, capabilities.to_dict())
+                capability_cache.save()
+
+        _probed[binary] = capabilities
+        return capabilities
+
+
+def has_filter(name: str) -> bool:
+    """
+    True if the configured ffmpeg has filter `name` (or cannot be probed).
+    """
+    capabilities = get_capabilities()
+    return capabilities is None or capabilities.has_filter(name)
+
+
+def check_capabilities(capabilities: Optional[Capabilities] = None) -> List[str]:
+    """
+    Check that ffmpeg has what the pipeline needs and log what is missing.
+
+    Args:
+        capabilities (Capabilities, optional): Defaults to the configured ffmpeg's.
+
+    When ffmpeg cannot be probed every feature is assumed present (as
+    `has_filter` does), with a warning: the first ffmpeg run will fail instead.
+
+    Returns:
+        List[str]: Missing required features, empty when ffmpeg is usable or
+        cannot be probed.
+    """
+    capabilities = capabilities or get_capabilities()
+    if capabilities is None:
+        logger.warning(f"Could not probe the capabilities of {_binary}; assuming every feature is present")
+        return []
+
+    missing = [f"filter {name}" for name in REQUIRED_FILTERS if not capabilities.has_filter(name)]
+    missing += [f"encoder {name}" for name in REQUIRED_ENCODERS if not capabilities.has_encoder(name)]
+
+    for name, fallback in OPTIONAL_FILTERS.items():
+        if not capabilities.has_filter(name):
+            logger.warning(f"ffmpeg has no {name} filter: {fallback}")
+    for name in missing:
+        logger.error(f"ffmpeg is missing the {name}")
+    return missing
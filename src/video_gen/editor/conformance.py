@@ -0,0 +1,155 @@
+from video_gen.editor.ffmpeg import ffmpeg, get_MediaInfo
+from video_gen.editor.profiles import EncodeProfile
+from video_gen.editor.media import Video
+from typing import Dict, List, Optional
+import threading
+import logging
+import shutil
+import os
+
+logger = logging.getLogger(__name__)
+
+# Audio codecs an .mp4 can hold as they are; anything else (e.g. PCM) is
+# converted when a file is remuxed into one.
+MP4_AUDIO_CODECS = ('aac', 'mp3', 'alac', 'opus', 'flac', 'ac3')
+
+
+class SkipCounter:
+    """
+    Counts the encodes that were skipped because the input already was what
+    the stage would have produced, by what was done instead: "rename",
+    "hardlink", "copy" (a file copy) or "remux" (stream copy).
+
+    Attributes:
+        counts (Dict[str, int]): Skipped encodes per replacement.
+    """
+    def __init__(self) -> None:
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, method: str) -> None:
+        with self._lock:
+            self.counts[method] = self.counts.get(method, 0) + 1
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def reset(self) -> Dict[str, int]:
+        """
+        Return the counts and start over.
+        """
+        with self._lock:
+            counts, self.counts = self.counts, {}
+        return counts
+
+    def __repr__(self) -> str:
+        return f"SkipCounter(total={self.total}, counts={self.counts})"
+
+
+skipped_encodes = SkipCounter()
+
+
+def conforms(
+    video: Video,
+    profile: EncodeProfile,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    fps: Optional[float] = None
+) -> bool:
+    """
+    True if `video` is a video (not a still image) already encoded the way
+    `profile` would encode it, at `width`x`height` and `fps` when given.
+    """
+    if video.isimage():
+        return False
+    return profile.matches(video, width, height, fps)
+
+
+def same_container(source: str, output_path: str) -> bool:
+    """True if both paths have the same (container) extension."""
+    return os.path.splitext(str(source))[1].lower() == os.path.splitext(str(output_path))[1].lower()
+
+
+def audio_codecs(source: str) -> List[str]:
+    """The codec of every audio stream of `source` (probed, cached)."""
+    return [stream['codec_name'] for stream in get_MediaInfo(str(source)).STREAMS if stream['type'] == 'audio']
+
+
+def copies_audio(source: str, output_path: str) -> bool:
+    """
+    True if `source` has audio and the container of `output_path` can hold
+    it as it is, so it can be stream copied (PCM goes into .mov/.mkv, not .mp4).
+    """
+    codecs = audio_codecs(source)
+    if not codecs:
+        return False
+    mp4 = str(output_path).lower().endswith(('.mp4', '.m4v'))
+    return not mp4 or all(codec in MP4_AUDIO_CODECS for codec in codecs)
+
+
+def reuse(source: str, output_path: str, consume: bool = False) -> str:
+    """
+    Make `output_path` the same file as `source`, without running ffmpeg.
+
+    The file is renamed when the caller gives `source` up (`consume`),
+    otherwise hard linked, or copied where links are not possible (another
+    file system). A hard linked output shares its data with the source: it
+    must be replaced, never written in place.
+
+    Returns:
+        str: What was done: "rename", "hardlink" or "copy".
+    """
+    source, output_path = str(source), str(output_path)
+    if os.path.exists(output_path):
+        if os.path.samefile(source, output_path):
+            return 'hardlink'
+        os.remove(output_path)  # e.g. the empty placeholder made by TempFile
+
+    if consume:
+        os.replace(source, output_path)
+        method = 'rename'
+    else:
+        try:
+            os.link(source, output_path)
+            method = 'hardlink'
+        except OSError:
+            shutil.copyfile(source, output_path)
+            method = 'copy'
+
+    skipped_encodes.add(method)
+    logger.debug(f"{method}: {source} -> {output_path}")
+    return method
+
+
+def remux(
+    source: str,
+    output_path: str,
+    input_args: Optional[List[str]] = None,
+    audio: bool = True,
+    duration: Optional[float] = None
+) -> str:
+    """
+    Write the streams of `source` to `output_path` by stream copy.
+
+    Audio an .mp4 cannot hold is converted to AAC on the way; the video is
+    never re-encoded.
+
+    Args:
+        source (str): Input file.
+        output_path (str): Destination; its extension picks the container.
+        input_args (List[str], optional): Input options (e.g. -ss/-t, -stream_loop).
+        audio (bool, optional): Keep the audio streams. Defaults to True.
+        duration (float, optional): Expected duration, for the supervisor deadline.
+
+    Returns:
+        str: "remux".
+    """
+    cmd = [*(input_args or []), '-i', str(source), '-map', '0:v:0']
+    if audio and audio_codecs(source):
+        cmd.extend(['-map', '0:a', '-c:a', 'copy' if copies_audio(source, output_path) else 'aac'])
+    cmd.extend(['-c:v', 'copy', '-avoid_negative_ts', 'make_zero', '-y', str(output_path)])
+    ffmpeg.run('ffmpeg', cmd, duration = duration, label = 'remux')
+
+    skipped_encodes.add('remux')
+    return 'remux'
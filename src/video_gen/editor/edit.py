@@ -1,10 +1,27 @@
-from typing import List, Tuple, Literal, Optional
+from typing import List, Tuple, Literal, Optional, Sequence, Iterable
 from video_gen.editor.media import Video, Audio
-from video_gen.editor.ffmpeg import ffmpeg
+from video_gen.editor.ffmpeg import ffmpeg, log_progress, get_MediaInfo
+from video_gen.editor.filtergraph import FilterGraph, Pad
+from video_gen.editor.capabilities import has_filter
+from video_gen.editor.profiles import get_profile
+from video_gen.editor.keyframes import get_keyframes
+from video_gen.editor.conformance import conforms, audio_codecs, copies_audio, same_container, reuse, remux
+from video_gen.editor.layers import StaticLayer, bake_layers, static_layers
+from video_gen.editor.audio_master import AudioTimeline, MASTER_INPUT_ARGS, master_audio
+from video_gen.editor.output_format import OutputFormat, DEFAULT_FORMAT, frame_rate_of, has_alpha
+from video_gen.editor.streaming import StreamPipeline
 from video_gen.assets import Assets
 from video_gen.settings import setting
+from video_gen.utils import generate_unique_path
+from concurrent.futures import ThreadPoolExecutor
+import tempfile
+import logging
+import shutil
+import math
 import os
 
+logger = logging.getLogger(__name__)
+
 VALID_TRANSITIONS = Literal[
     "fade", "fadeblack", "fadewhite", "distance",
     "wipeleft", "wiperight", "wipeup", "wipedown",
@@ -22,6 +39,266 @@ VALID_TRANSITIONS = Literal[
     "revealleft", "revealright","revealup,"
 ]
 
+def concat_fragment(
+    graph: FilterGraph,
+    pads: List[Pad],
+    durations: Sequence[float],
+    width: int,
+    height: int,
+    frame_rate: int,
+    transition_effect: VALID_TRANSITIONS | None = None,
+    transition_duration: float = 1,
+    videos: Optional[Sequence[Video]] = None,
+    pix_fmt: str = DEFAULT_FORMAT.pix_fmt
+) -> Pad:
+    """
+    Scales video pads to one size and frame rate and joins them, either back
+    to back or with an xfade transition between each pair.
+
+    With `videos` (the clip behind each pad), a clip already known to have
+    the size or frame rate gets no `scale` or `fps` filter.
+
+    Args:
+        graph (FilterGraph): Graph to add the filters to.
+        pads (List[Pad]): Video pads, in order.
+        durations (Sequence[float]): Duration of each pad (only needed for transitions).
+        width (int): Output width.
+        height (int): Output height.
+        frame_rate (int): Output frame rate.
+        transition_effect (str, optional): xfade transition, None to concatenate.
+        transition_duration (float, optional): Length of each transition. Defaults to 1.
+        videos (Sequence[Video], optional): The clips behind `pads`. Defaults to None
+            (every pad is scaled and resampled).
+        pix_fmt (str, optional): Pixel format of the xfade output. Defaults to yuv420p.
+
+    Returns:
+        Pad: The joined video.
+    """
+    # concat and xfade need one size, frame rate and time base on every input
+    output_format = OutputFormat(width, height, frame_rate, pix_fmt)
+    scaled = [
+        graph.chain(pad, [*output_format.conform_filters(video), "settb=AVTB"])
+        for pad, video in zip(pads, videos or [None] * len(pads))
+    ]
+
+    if transition_effect is None or len(scaled) == 1 or not has_filter('xfade'):
+        # If no transition effect, concatenate normally
+        return graph.chain(scaled, f"concat=n={len(scaled)}:v=1:a=0")
+
+    # chain xfade transitions, each one starts where the joined part ends
+    joined, offset = scaled[0], 0
+    for pad, prev_duration in zip(scaled[1:], durations):
+        offset += prev_duration - transition_duration
+        joined = graph.chain([joined, pad], (
+            f"xfade=transition={transition_effect}:"
+            f"duration={transition_duration}:offset={offset}"
+        ))
+
+    return graph.chain(joined, f"format={pix_fmt}")
+
+
+def joined_duration(
+    durations: Sequence[Optional[float]],
+    transition_effect: VALID_TRANSITIONS | None = None,
+    transition_duration: float = 1
+) -> Optional[float]:
+    """
+    Returns the length of the video `concat_fragment` makes out of clips of
+    `durations`: each xfade transition overlaps two clips by `transition_duration`.
+    None if a duration is unknown.
+    """
+    if not durations or None in durations:
+        return None
+    total = sum(float(duration) for duration in durations)
+    if transition_effect is not None and len(durations) > 1 and has_filter('xfade'):
+        total -= transition_duration * (len(durations) - 1)
+    return total
+
+
+def concat_av_fragment(graph: FilterGraph, streams: List[Tuple[Pad, Pad]]) -> Tuple[Pad, Pad]:
+    """
+    Joins (video, audio) pad pairs back to back.
+
+    Returns:
+        Tuple[Pad, Pad]: The joined video and audio.
+    """
+    inputs = [pad for pair in streams for pad in pair]
+    return graph.chain(inputs, f"concat=n={len(streams)}:v=1:a=1", outputs=['v', 'a'])
+
+
+def overlay_fragment(
+    graph: FilterGraph,
+    base: Pad,
+    overlay: Pad,
+    width: Optional[int],
+    height: Optional[int],
+    shortest: bool = False,
+    position: Optional[Tuple[int, int]] = None
+) -> Pad:
+    """
+    Scales `base` to `width`x`height` and draws `overlay` (with alpha) on top.
+    With no `width`/`height`, `base` already has the output size and is not scaled.
+
+    The background keeps its own pixel format: the overlay's alpha is blended
+    into it directly, without converting the whole frame to RGBA.
+
+    Args:
+        shortest (bool, optional): End with the shorter of the two inputs. Defaults to False.
+        position (Tuple[int, int], optional): Top left corner of the overlay, for an
+            overlay smaller than the frame. Defaults to (0, 0).
+
+    Returns:
+        Pad: The composited video.
+    """
+    x, y = position or (0, 0)
+    background = graph.chain(base, f"scale={width}x{height}") if width and height else base
+    options = ":shortest=1" if shortest else ""
+    return graph.chain([background, overlay], f"overlay={x}:{y}:format=auto{options}")
+
+
+def placement(video: Video) -> Tuple[int, int, int, int]:
+    """
+    Returns the (x, y, width, height) area a clip covers on the output canvas.
+    """
+    x, y = video.position or (0, 0)
+    return int(x), int(y), int(video.width), int(video.height)
+
+
+def common_box(videos: Sequence[Video]) -> Tuple[int, int, int, int]:
+    """
+    Returns the smallest (x, y, width, height) area covering every clip.
+    """
+    boxes = [placement(video) for video in videos]
+    left, top = min(box[0] for box in boxes), min(box[1] for box in boxes)
+    right = max(box[0] + box[2] for box in boxes)
+    bottom = max(box[1] + box[3] for box in boxes)
+    return left, top, right - left, bottom - top
+
+
+def align_fragment(graph: FilterGraph, pad: Pad, video: Video, box: Tuple[int, int, int, int]) -> Pad:
+    """
+    Pads a clip with transparency so it covers `box` (see `common_box`), so
+    clips with different bounding boxes can be joined. A clip already
+    covering exactly `box` is returned as it is, and a clip that already has
+    an alpha channel is padded in its own pixel format.
+    """
+    x, y, width, height = placement(video)
+    if (x, y, width, height) == box:
+        return pad
+    filters = [] if has_alpha(video.peek('pix_fmt')) else ["format=yuva420p"]
+    return graph.chain(pad, [
+        *filters,
+        f"pad={box[2]}:{box[3]}:{x - box[0]}:{y - box[1]}:color=0x00000000"
+    ])
+
+
+def video_info_fragment(
+    graph: FilterGraph,
+    video: Pad,
+    audio: Optional[Pad],
+    watermark: str = None,
+    bg_audio: str = None,
+    end_video: str = None,
+    bg_volume: float = 0.3,
+    image_scale: float = 0.7,
+    layers: Optional[Sequence[StaticLayer]] = None
+) -> Tuple[Pad, Optional[Pad]]:
+    """
+    Adds a watermark, background audio and an end video to a video/audio pair.
+
+    The watermark and any other static `layers` are pre-scaled and merged
+    into one cached image (see `bake_layers`), so the graph overlays a
+    single ready-made input. With `audio` None (audio mastered separately,
+    see `master_audio`) only the video is handled.
+
+    Returns:
+        Tuple[Pad, Pad]: The finished video and audio.
+    """
+    video = layers_fragment(graph, video, watermark, image_scale, layers)
+    if audio is not None:
+        audio = music_fragment(graph, audio, bg_audio, bg_volume)
+
+    if end_video:
+        index = graph.add_input(end_video)
+        video = graph.chain([video, graph.stream(index, 'v')], "concat=n=2:v=1:a=0")
+        if audio is not None:
+            audio = graph.chain([audio, graph.stream(index, 'a')], "concat=n=2:v=0:a=1")
+
+    return video, audio
+
+
+def layers_fragment(
+    graph: FilterGraph,
+    video: Pad,
+    watermark: str = None,
+    image_scale: float = 0.7,
+    layers: Optional[Sequence[StaticLayer]] = None
+) -> Pad:
+    """
+    Draws the watermark and any other static `layers` over a video, merged
+    into one cached image (see `bake_layers`).
+
+    Returns:
+        Pad: The video, unchanged when there is nothing to draw.
+    """
+    overlays = static_layers(watermark, image_scale, layers)
+    if not overlays:
+        return video
+    image, (x, y) = bake_layers(overlays)
+    return graph.chain([video, graph.input(image)], f"overlay={x}:{y}")
+
+
+def music_fragment(graph: FilterGraph, audio: Pad, bg_audio: str = None, bg_volume: float = 0.3) -> Pad:
+    """
+    Mixes background music under an audio pad, for the length of the audio.
+
+    Returns:
+        Pad: The mixed audio, unchanged without `bg_audio`.
+    """
+    if not bg_audio:
+        return audio
+    music = graph.chain(graph.input(bg_audio, kind='a'), f"volume={bg_volume}")  # Reduce volume to 30%
+    return graph.chain([audio, music], "amix=inputs=2:duration=first")
+
+
+def stream_layout(video: Video, audio: bool = True) -> Tuple[tuple, ...]:
+    """
+    Returns the parameters that must be identical for two files to be joined
+    by stream copy: per stream its codec and, for video, size, pixel format,
+    frame rate, time base, codec profile and level, B-frame delay and codec
+    extradata (the SPS/PPS of H.264, written once in the joined file's
+    header), for audio, sample format, rate and channels. Only the video
+    streams without `audio`. Read from the (cached) probe of the file.
+    """
+    layout = []
+    for stream in get_MediaInfo(str(video)).STREAMS:
+        if stream['type'] == 'video':
+            layout.append((
+                'video', stream['codec_name'], stream['width'], stream['height'],
+                stream['pix_fmt'], stream['r_frame_rate'], stream['time_base'],
+                stream.get('profile'), stream.get('level'), stream.get('has_b_frames'),
+                stream.get('extradata_hash')
+            ))
+        elif audio:
+            layout.append((
+                'audio', stream['codec_name'], stream['sample_fmt'],
+                stream['sample_rate'], stream['channels']
+            ))
+    return tuple(layout)
+
+
+def write_concat_list(list_file: str, paths: Iterable[str]) -> str:
+    """
+    Writes a concat demuxer list of `paths` (absolute, quotes escaped) and
+    returns `list_file`. Read it with `-f concat -safe 0 -i list_file`.
+    """
+    with open(list_file, "w", encoding="utf-8") as f:
+        for path in paths:
+            escaped = os.path.abspath(str(path)).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    return list_file
+
+
 class edit:
     @staticmethod
     def adjust_timestamps(timestamps):
@@ -43,8 +320,8 @@ class edit:
         audio: Audio,
         timestamps: List[Tuple[float,float,str]],
         images: List[Video],
-        output_path: str
-        
+        output_path: str,
+        workspace: Optional[str] = None
     ) -> Optional[Video]:
         """
         Generate video clip from images synchronized with audio using timestamps
@@ -53,12 +330,13 @@ class edit:
             timestamps: List of (start_ms, end_ms, text) for each image
             images: List of Image objects in order
             output_path: Output video path
+            workspace: Job directory for the list file, defaults to setting.temp_path
         """
         if len(timestamps) != len(images):
             print("Mismatch between timestamps and images count")
             return None
         
-        list_file = os.path.join(setting.temp_path,"concat.txt")
+        list_file = generate_unique_path(workspace or setting.temp_path, "txt")
         with open(list_file,"w",encoding="utf-8") as f:
             for idx, ((start, end, _), image) in enumerate(zip(edit.adjust_timestamps(timestamps), images)):
                 duration = (end - start)# / 1000  # Convert ms to seconds
@@ -72,36 +350,124 @@ class edit:
         cmd = [
             "-f", "concat", "-safe", "0", "-i", str(list_file),
             "-i", str(audio),
-            "-c:v", "qtrle",              # Use QuickTime Animation (RLE) codec
-            "-pix_fmt", "argb",           # Preserve alpha channel
-            "-c:a", "aac", "-strict", "experimental",  # Required for AAC in older FFmpeg
+            *get_profile('intermediate', alpha=True).video_args(),  # Preserve alpha channel
+            "-c:a", "copy",  # encoded once, by the final render
             "-y", str(output_path)
         ]
         
-        if not ffmpeg.run('ffmpeg', cmd):
-            return None
-        
-        os.remove(list_file)
+        try:
+            if not ffmpeg.run('ffmpeg', cmd):
+                return None
+        finally:
+            os.remove(list_file)
         return Video(output_path)
 
     @staticmethod
     def convert_video(
         input_video: Video, 
-        output_video: str
+        output_video: str,
+        consume: bool = False
     ) -> Video:
-        cmd = [ '-i', str(input_video) ]
-        
+        """
+        Converts a video to the intermediate encoding of the output's container
+        (.mp4, or .mov with alpha).
+
+        A video already encoded that way is not encoded again: it is linked
+        (renamed with `consume`, when the caller no longer needs the input) if
+        the container matches too, otherwise remuxed (see `conformance`).
+        """
+        output_video = str(output_video)
         if output_video.endswith('.mp4'):
-            cmd.extend(['-c:v', 'libx264','-pix_fmt', 'yuv420p'])
+            profile = get_profile('intermediate')
         elif output_video.endswith('.mov'):
-            cmd.extend(['-c:v', 'prores_ks','-pix_fmt', 'yuva420p'])
+            profile = get_profile('intermediate', alpha=True)
         else:
             raise ValueError("Output video must be either .mp4 or .mov")
         
-        cmd.extend(['-c:a', 'aac', output_video])
-        ffmpeg.run("ffmpeg",cmd)
-        return Video(output_video)
+        if conforms(input_video, profile):
+            if same_container(input_video, output_video):
+                reuse(input_video, output_video, consume)
+            else:
+                remux(input_video, output_video, duration = input_video.peek('duration'))
+        else:
+            # the audio is stream copied or left out, never encoded in an intermediate
+            audio = ['-map', '0:a', '-c:a', 'copy'] if copies_audio(input_video, output_video) else ['-an']
+            cmd = ['-i', str(input_video), '-map', '0:v:0', *profile.video_args(), *audio, '-y', output_video]
+            ffmpeg.run("ffmpeg", cmd, duration = input_video.peek('duration'))
+        return Video(
+            output_video,
+            position = input_video.position,
+            codec = profile.stream_codec,
+            pix_fmt = profile.pix_fmt,
+            width = input_video.peek('width'),
+            height = input_video.peek('height'),
+            fps = input_video.peek('fps'),
+            duration = input_video.peek('duration')
+        )
 
+    @staticmethod
+    def cut_video(
+        input_video: Video,
+        output_path: str,
+        duration: float,
+        start: float = 0.0,
+        width: Optional[int] = None,
+        height: Optional[int] = None
+    ) -> Video:
+        """
+        Cuts a `duration` seconds segment out of a video (looping it when it
+        is shorter), without re-encoding whenever possible.
+
+        When the source is already encoded like an intermediate (and has the
+        requested size), the video stream is copied: the cut starts at the
+        keyframe at or before `start`, found in the asset's keyframe index,
+        and a short source is looped by the demuxer. Otherwise the segment
+        is re-encoded from exactly `start`.
+
+        Args:
+            input_video (Video): Source video.
+            output_path (str): Destination path.
+            duration (float): Segment duration in seconds.
+            start (float, optional): Requested start in the source. Defaults to 0.
+            width (int, optional): Output width. Defaults to the source's.
+            height (int, optional): Output height. Defaults to the source's.
+
+        Returns:
+            Video: The segment (video only).
+        """
+        profile = get_profile('intermediate')
+        source_duration = float(input_video.duration or 0)
+        copy = not input_video.isimage() and profile.matches(input_video, width, height)
+
+        if source_duration and source_duration < duration:
+            loop_count = math.ceil(duration / source_duration) - 1
+            window, start = ['-stream_loop', str(loop_count)], 0.0
+        else:
+            start = min(max(start, 0.0), max(source_duration - duration, 0.0))
+            if copy:
+                keyframe = get_keyframes(input_video).before(start)
+                copy = keyframe is not None
+                start = keyframe if copy else start
+            window = ['-ss', f"{start:.3f}"] if start else []
+
+        cmd = [*window, '-t', f"{duration:.3f}", '-i', str(input_video), '-map', '0:v:0']
+        if copy:
+            cmd.extend(['-c:v', 'copy', '-avoid_negative_ts', 'make_zero'])
+        else:
+            if width is not None and height is not None:
+                cmd.extend(['-vf', f"scale={width}:{height}"])
+            cmd.extend(profile.video_args())
+        ffmpeg.run('ffmpeg', cmd + ['-y', str(output_path)], duration = duration)
+
+        return Video(
+            output_path,
+            codec = profile.stream_codec,
+            pix_fmt = profile.pix_fmt,
+            width = width or input_video.width,
+            height = height or input_video.height,
+            fps = input_video.peek('fps'),
+            duration = duration
+        )
 
     @staticmethod
     def concatenate_by_video(
@@ -109,53 +475,138 @@ class edit:
         audio: bool = True,
         output_path = ''
     ) -> Video:
+        """
+        Joins videos (with their audio, unless `audio` is False) back to back.
+
+        When every input has the same stream parameters (see `stream_layout`)
+        and position, the files are remuxed with the concat demuxer and
+        `-c copy`; otherwise they are joined with the concat filter and
+        re-encoded, clips with different bounding boxes padded to a common one.
+        Re-encoded audio is stored as PCM: it is only encoded by the final render.
+        """
         # Ensure there are at least two videos to concatenate
         if len(videos) <= 1:
             return edit.convert_video(videos[0],output_path)
-        
-        cmd = []
+
+        durations = [video.peek('duration') for video in videos]
+        total_duration = sum(durations) if None not in durations else None
+
+        # clips made by the same renderer share every stream parameter: join
+        # their packets with the concat demuxer instead of re-encoding them
+        layouts = {stream_layout(video) for video in videos}
+        box = common_box(videos)
+        position = None if all(video.position is None for video in videos) else box[:2]
+        if len(layouts) == 1 and len({placement(video) for video in videos}) == 1:
+            list_file = write_concat_list(f"{output_path}.concat.txt", videos)
+            try:
+                ffmpeg.run('ffmpeg', [
+                    '-f', 'concat', '-safe', '0', '-i', list_file,
+                    '-map', '0' if audio else '0:v', '-c', 'copy', '-y', output_path
+                ], duration = total_duration)
+            finally:
+                os.remove(list_file)
+            return Video(
+                output_path,
+                position = position,
+                codec = videos[0].codec,
+                pix_fmt = videos[0].pix_fmt,
+                width = videos[0].width,
+                height = videos[0].height,
+                fps = videos[0].fps,
+                duration = total_duration
+            )
+        logger.debug(f"concatenate_by_video: inputs differ ({len(layouts)} stream layouts), re-encoding")
+
+        graph = FilterGraph()
+        streams = []
         for video in videos:
-            cmd.extend(['-i', str(video)])
-        
-        # Prepare the filter_complex argument
-        filter_complex = []
-        for idx in range(len(videos)):
-            filter_complex.append(f"[{idx}:v][{idx}:a]")
-        
+            index = graph.add_input(video)
+            # clips cut to different bounding boxes are padded to a common one
+            pad = align_fragment(graph, graph.stream(index, 'v'), video, box)
+            streams.append((pad, graph.stream(index, 'a')))
         
-        filter_complex.append(f"concat=n={len(videos)}:v=1:a=1[v][a]")
-        cmd.extend(['-filter_complex', ' '.join(filter_complex)])
-        cmd.extend(['-map', '[v]', '-map', '[a]','-c:v','prores_ks','-y',output_path])
-        
-        ffmpeg.run('ffmpeg',cmd,False)
-        return Video(output_path)
+        profile = get_profile('intermediate', alpha=True)
+        if audio:
+            video_pad, audio_pad = concat_av_fragment(graph, streams)
+            cmd = graph.command([video_pad, audio_pad], [
+                *profile.video_args(), '-c:a', 'pcm_s16le',
+                '-y', output_path
+            ])
+        else:
+            video_pad = graph.chain([pad for pad, _ in streams], f"concat=n={len(streams)}:v=1:a=0")
+            cmd = graph.command([video_pad], [*profile.video_args(), '-an', '-y', output_path])
+        ffmpeg.run('ffmpeg', cmd, False, duration = total_duration)
+        return Video(
+            output_path,
+            position = position,
+            codec = profile.stream_codec,
+            pix_fmt = profile.pix_fmt,
+            width = box[2],
+            height = box[3],
+            fps = videos[0].peek('fps'),
+            duration = total_duration
+        )
     
     @staticmethod
     def overlay_video_image(
         base_video: Video,
         overlay_video: Video, 
         output_path: str,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        audio: bool = True
     ) -> Video:
-        video_size = f"{overlay_video.width}x{overlay_video.height}"  # Corrected order (width x height)
+        """
+        Draws `overlay_video` (with alpha) over `base_video`, keeping the overlay's
+        audio: stream copied, or encoded to AAC once when the output container
+        cannot hold it as it is (PCM in an .mp4).
 
-        cmd = [
-            '-i', str(base_video),   # Base video (background)
-            '-i', str(overlay_video) # Overlay video
-        ]
+        An overlay cut to a bounding box is drawn at its `position`, so only
+        its own pixels are composited.
 
-        filter_complex = (
-            f"[0:v]scale={video_size},format=rgba[bg];"
-            f"[bg][1:v]overlay=0:0:format=auto[video]"
-        )
+        Args:
+            base_video (Video): Background video.
+            overlay_video (Video): Video drawn on top.
+            output_path (str): Destination path.
+            width (int, optional): Output width. Defaults to the overlay's width, or
+                the background's for an overlay with a position.
+            height (int, optional): Output height, defaulting like `width`.
+            audio (bool, optional): Keep the overlay's audio. False when the audio is
+                mastered separately (see `master_audio`). Defaults to True.
+        """
+        canvas = base_video if overlay_video.position is not None else overlay_video
+        width, height = width or canvas.width, height or canvas.height
 
-        cmd.extend([
-            '-filter_complex', filter_complex,
-            '-map', '[video]', '-map', '1:a',  # Map video & audio
-            '-c:v', 'libx264', '-c:a', 'aac', '-strict', 'experimental',
+        graph = FilterGraph()
+        base = graph.input(base_video)            # Base video (background)
+        overlay_index = graph.add_input(overlay_video)  # Overlay video
+
+        video_pad = overlay_fragment(
+            graph, base, graph.stream(overlay_index, 'v'), width, height,
+            position = overlay_video.position
+        )
+        profile = get_profile('intermediate')
+        outputs, audio_args = [video_pad], ['-an']
+        if audio and audio_codecs(overlay_video):
+            outputs.append(graph.stream(overlay_index, 'a'))
+            if copies_audio(overlay_video, output_path):
+                audio_args = ['-c:a', 'copy']  # encoded once, by the final render
+            else:
+                logger.debug(f"overlay_video_image: {output_path} cannot hold the overlay's audio as it is, encoding it")
+                audio_args = ['-c:a', 'aac']
+        cmd = graph.command(outputs, [
+            *profile.video_args(),
+            *audio_args,
             '-shortest', '-y', str(output_path)  # Stop when shorter video ends
         ])
         ffmpeg.run('ffmpeg',cmd)
-        return Video(output_path)
+        return Video(
+            output_path,
+            codec = profile.stream_codec,
+            width = width,
+            height = height,
+            fps = base_video.peek('fps')
+        )
     
     @staticmethod
     def concatenate_stream(
@@ -164,54 +615,327 @@ class edit:
         width: int,
         height: int,
         transition_effect: VALID_TRANSITIONS | None = None,
-        transition_duration: int = 1
+        transition_duration: int = 1,
+        copy_segments: bool = False,
+        workspace: Optional[str] = None,
+        output_format: Optional[OutputFormat] = None
     ) -> Video:
         """
         Concatenates video
+
+        With `copy_segments` and a transition, only the windows around each
+        transition are re-encoded (see `concatenate_windows`) when the clips
+        allow it; otherwise the whole timeline is rendered in one graph.
+        Their segments are kept in `workspace` (defaults to setting.temp_path).
+        This is opt-in: the engine renders through `compose_final`, which joins
+        the clips inside its own filter graph.
+
+        The output has the frame rate of `output_format` (which also sets the
+        size when given), else the clips' common frame rate, so clips already
+        at it are not resampled.
         """
-        size = f"{width}x{height}"
-        cmd = []
-        frame_rate = 24
+        if output_format is not None:
+            width, height, frame_rate = output_format.width, output_format.height, output_format.fps
+        else:
+            rates = {frame_rate_of(video.peek('fps')) for video in videos}
+            frame_rate = rates.pop() if len(rates) == 1 and None not in rates else DEFAULT_FORMAT.fps
 
-        for video in videos:
-            cmd.extend(['-i', str(video)])
+        if copy_segments and transition_effect and has_filter('xfade'):
+            video = concatenate_windows(
+                videos, output_path, width, height, frame_rate, transition_effect, transition_duration,
+                workspace = workspace
+            )
+            if video is not None:
+                return video
 
-        # Apply scale filter so no error raise
-        filter_complex = []
-        for idx in range(len(videos)):
-            filter_complex.append(f"[{idx}:v]scale={size},fps={frame_rate},settb=AVTB[vid{idx}]")
+        graph = FilterGraph()
+        pads = [graph.input(video) for video in videos]
+        durations = [video.duration for video in videos] if transition_effect else []
+        final = concat_fragment(
+            graph, pads, durations, width, height, frame_rate, transition_effect, transition_duration, videos
+        )
+        cmd = graph.command([final], [*get_profile('intermediate').video_args(), '-y', output_path])
 
-        if transition_effect is None:
-            # If no transition effect, concatenate normally
-            video_concat = "".join([f"[vid{idx}]" for idx in range(len(videos))])
-            filter_complex.append(f"{video_concat}concat=n={len(videos)}:v=1:a=0[final]")
+        durations = [video.peek('duration') for video in videos]
+        total_duration = None
+        if None not in durations:
+            overlap = transition_duration * (len(videos) - 1) if transition_effect else 0
+            total_duration = sum(durations) - overlap
 
-        else:
-            # Generate xfade transitions method
-            xfade = lambda id1, id2, out, offset: filter_complex.append(
-                (f"[{id1}][{id2}]xfade=transition={transition_effect}:"
-                f"duration={transition_duration}:offset={offset}[{out}]")
+        print(cmd)
+        f = ffmpeg.run('ffmpeg', cmd, True, progress = log_progress, duration = total_duration)
+        print(f.stderr)
+        return Video(output_path, width = width, height = height, fps = frame_rate)
+
+def plan_windows(
+    videos: Sequence[Video],
+    transition_duration: float
+) -> Optional[List[Tuple[float, float]]]:
+    """
+    Finds, for each clip of a transition chain, the part that can be stream
+    copied: from the first keyframe after its incoming transition to the last
+    keyframe that leaves room for its outgoing one.
+
+    Returns:
+        List[Tuple[float, float]] or None: (start, end) of each clip's copied
+        part, None if a clip has no such part (too short, or too few keyframes).
+    """
+    ranges = []
+    last = len(videos) - 1
+    for i, video in enumerate(videos):
+        duration = float(video.duration)
+        index = get_keyframes(video)
+        start = index.after(transition_duration) if i > 0 else 0.0
+        end = index.before(duration - transition_duration) if i < last else duration
+        if start is None or end is None or end <= start:
+            return None
+        ranges.append((start, end))
+    return ranges
+
+
+def concatenate_windows(
+    videos: Sequence[Video],
+    output_path: str,
+    width: int,
+    height: int,
+    frame_rate: int,
+    transition_effect: VALID_TRANSITIONS,
+    transition_duration: float = 1,
+    workspace: Optional[str] = None
+) -> Optional[Video]:
+    """
+    Joins clips with xfade transitions, re-encoding only the transitions.
+
+    Each clip is split at keyframes into a middle part, stream copied, and
+    the tail and head around each transition, which are rendered with xfade
+    as a short window. The windows are rendered in parallel and everything is
+    joined by the concat demuxer, so a 60 s video with 1 s transitions
+    re-encodes a few seconds instead of all of it.
+    The parts live in a private directory under `workspace` (defaults to
+    setting.temp_path) that is removed afterwards.
+
+    This only works when the clips are already encoded like the windows will
+    be (intermediate profile, output size and frame rate, same parameters).
+    Codec profile, level and extradata only show once a window exists, so the
+    windows are compared with the clips (see `stream_layout`) before joining.
+
+    Returns:
+        Video or None: The joined video, or None when the clips do not allow it
+        and the caller has to render the whole timeline.
+    """
+    profile = get_profile('intermediate')
+    layouts = {stream_layout(video, audio=False) for video in videos}
+    if len(layouts) != 1:
+        return None
+    if not profile.matches(videos[0], width, height, frame_rate):
+        return None
+    ranges = plan_windows(videos, transition_duration)
+    if ranges is None:
+        return None
+
+    directory = tempfile.mkdtemp(prefix='windows_', dir=workspace or getattr(setting, 'temp_path', None))
+    try:
+        jobs, parts, windows = [], [], []
+        for i, (video, (start, end)) in enumerate(zip(videos, ranges)):
+            segment = os.path.join(directory, f"segment_{i}.mp4")
+            jobs.append(([
+                '-ss', f"{start:.6f}", '-t', f"{end - start:.6f}", '-i', str(video),
+                '-map', '0:v:0', '-c:v', 'copy', '-avoid_negative_ts', 'make_zero', '-y', segment
+            ], end - start))
+            parts.append(segment)
+            if i == len(videos) - 1:
+                break
+
+            # window: this clip's tail after its copied part, the next clip's head before its own
+            tail = float(video.duration) - end
+            head = ranges[i + 1][0]
+            graph = FilterGraph()
+            pads = [
+                graph.input(video, ['-ss', f"{end:.6f}", '-t', f"{tail:.6f}"]),
+                graph.input(videos[i + 1], ['-t', f"{head:.6f}"]),
+            ]
+            pad = concat_fragment(
+                graph, pads, [tail], width, height, frame_rate, transition_effect, transition_duration,
+                videos[i:i + 2]
             )
+            window = os.path.join(directory, f"window_{i}.mp4")
+            jobs.append((graph.command([pad], [*profile.video_args(), '-y', window]), tail + head - transition_duration))
+            parts.append(window)
+            windows.append(window)
 
-            # 1. creating first videos
-            nidx = ('v0', videos[0].duration - transition_duration)
-            xfade('vid0', 'vid1', nidx[0], nidx[1])
-            nidx = (nidx[0], nidx[1] + videos[1].duration - transition_duration)
+        workers = min(len(jobs), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    ffmpeg.run, 'ffmpeg', cmd, duration = duration, label = 'concatenate_windows', share = workers
+                )
+                for cmd, duration in jobs
+            ]
+            for future in futures:
+                future.result()
 
-            # 2. creating remain videos
-            for idx in range(2, len(videos)):
-                xfade(nidx[0], f'vid{idx}', f'v{idx - 1}', nidx[1])
-                nidx = (f'v{idx - 1}', nidx[1] + videos[idx].duration - transition_duration)
+        # e.g. clips from another H.264 encoder: same size and rate, other SPS/PPS
+        if any({stream_layout(window, audio=False)} != layouts for window in windows):
+            logger.debug("concatenate_windows: windows are encoded unlike the clips, rendering the whole timeline")
+            return None
 
-            filter_complex.append(f"[{nidx[0]}]format=yuv420p[final]")
+        list_file = write_concat_list(os.path.join(directory, "concat.txt"), parts)
+        total_duration = sum(float(video.duration) for video in videos) - transition_duration * (len(videos) - 1)
+        ffmpeg.run('ffmpeg', [
+            '-f', 'concat', '-safe', '0', '-i', list_file, '-c', 'copy', '-y', str(output_path)
+        ], duration = total_duration)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
 
-        cmd.extend(['-filter_complex', '; '.join(filter_complex)])
-        cmd.extend(['-map', '[final]', '-y', output_path])
+    logger.debug(f"concatenate_windows: {len(videos) - 1} transitions rendered, {len(videos)} segments copied")
+    return Video(
+        output_path,
+        codec = profile.stream_codec,
+        pix_fmt = profile.pix_fmt,
+        width = width,
+        height = height,
+        fps = frame_rate,
+        duration = total_duration
+    )
+
+
+def plan_chunks(video: Video, chunks: int) -> List[Tuple[float, Optional[int]]]:
+    """
+    Splits a video into up to `chunks` parts of about equal length, each
+    starting at a keyframe: seeking to a part decodes nothing before it, and
+    the part ends exactly on the frame where the next one starts.
+
+    Returns:
+        List[Tuple[float, Optional[int]]]: (start, frames) of each part, start
+        relative to the beginning of the video and frames None for the last
+        part (until the end). A single part when there are too few keyframes.
+    """
+    duration = float(video.duration)
+    fps = frame_rate_of(video.fps)
+    if fps is None:
+        return [(0.0, None)]
+    index = get_keyframes(video)
+    first = index.times[0] if len(index) else 0.0
+
+    starts = [first]
+    for i in range(1, chunks):
+        keyframe = index.before(first + duration * i / chunks)
+        if keyframe is not None and keyframe > starts[-1]:
+            starts.append(keyframe)
+
+    parts = [(start - first, round((end - start) * fps)) for start, end in zip(starts, starts[1:])]
+    parts.append((starts[-1] - first, None))
+    return parts
+
+
+def encode_chunked(
+    video: Video,
+    output_path: str,
+    chunks: int,
+    watermark: str = None,
+    bg_audio: str = None,
+    end_video: str = None,
+    bg_volume: float = 0.3,
+    image_scale: float = 0.7,
+    stage: str = 'final',
+    layers: Optional[Sequence[StaticLayer]] = None,
+    workspace: Optional[str] = None,
+    master: Optional[str] = None
+) -> Optional[Video]:
+    """
+    `add_video_info` as several encodes running in parallel.
+
+    x264 stops scaling after a few threads at 720x1280, so one process cannot
+    use a larger machine. Here the video is split at keyframes (see
+    `plan_chunks`) and each part, and the end video, is encoded by its own
+    ffmpeg process; the audio (with the background music and the end video's
+    audio) is encoded once alongside them. The parts are joined by stream copy
+    and the audio is muxed in. The processes split the cores evenly (see
+    `ThreadBudget.reserve`), and the end video is conformed to the size and
+    frame rate of `video`. With a `master` (see `add_video_info`) the audio is
+    encoded from it by the final mux instead.
+
+    Returns:
+        Video or None: The finished video, or None when the video has too few
+        keyframes to split and the caller has to encode it in one pass.
+    """
+    parts = plan_chunks(video, chunks)
+    if len(parts) < 2:
+        return None
+
+    profile = get_profile(stage)
+    duration = float(video.duration)
+    end = Video(end_video) if end_video else None
+    end_duration = float(end.duration) if end is not None else 0.0
+    total_duration = duration + end_duration
+
+    directory = tempfile.mkdtemp(prefix='chunks_', dir=workspace or getattr(setting, 'temp_path', None))
+    try:
+        jobs, segments = [], []
+        for i, (start, frames) in enumerate(parts):
+            graph = FilterGraph()
+            pad = layers_fragment(graph, graph.input(video, ['-ss', f"{start:.6f}"]), watermark, image_scale, layers)
+            segment = os.path.join(directory, f"chunk_{i}.mp4")
+            limit = ['-frames:v', str(frames)] if frames is not None else []
+            length = parts[i + 1][0] - start if frames is not None else duration - start
+            jobs.append((graph.command([pad], [*profile.video_args(), *limit, '-an', '-y', segment]), length))
+            segments.append(segment)
+
+        if end_video:
+            # the parts are joined by stream copy: the end video must come out
+            # in the size and frame rate of the main video, like the parts
+            conform = OutputFormat(video.width, video.height, video.fps).conform_filters(end)
+            filters = ['-vf', ','.join([*conform, 'setsar=1'])] if conform else []
+            segment = os.path.join(directory, "chunk_end.mp4")
+            jobs.append(([
+                '-i', str(end_video), '-map', '0:v:0', *filters, *profile.video_args(), '-an', '-y', segment
+            ], end_duration))
+            segments.append(segment)
+
+        if master is None and not audio_codecs(video):
+            logger.debug(f"encode_chunked: {video} has no audio, writing a silent video")
+            audio_input, audio_maps, audio_args = [], [], ['-c', 'copy', '-an']
+        elif master is None:
+            graph = FilterGraph()
+            audio = music_fragment(graph, graph.input(video, kind='a'), bg_audio, bg_volume)
+            if end_video:
+                audio = graph.chain([audio, graph.input(end_video, kind='a')], "concat=n=2:v=0:a=1")
+            audio_file = os.path.join(directory, "audio.m4a")
+            jobs.append((graph.command([audio], ['-c:a', 'aac', '-vn', '-y', audio_file]), total_duration))
+            audio_input, audio_maps, audio_args = ['-i', audio_file], ['-map', '1:a'], ['-c', 'copy']
+        else:
+            audio_input, audio_maps, audio_args = [*MASTER_INPUT_ARGS, '-i', str(master)], ['-map', '1:a'], ['-c:v', 'copy', '-c:a', 'aac']
+
+        workers = min(len(jobs), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    ffmpeg.run, 'ffmpeg', cmd, duration = length, label = 'encode_chunked',
+                    stage = 'final', share = workers
+                )
+                for cmd, length in jobs
+            ]
+            for future in futures:
+                future.result()
+
+        list_file = write_concat_list(os.path.join(directory, "concat.txt"), segments)
+        ffmpeg.run('ffmpeg', [
+            '-f', 'concat', '-safe', '0', '-i', list_file, *audio_input,
+            '-map', '0:v', *audio_maps, *audio_args,
+            '-movflags', '+faststart', '-shortest', '-y', str(output_path)
+        ], duration = total_duration, stage = 'final')
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    logger.debug(f"encode_chunked: {len(segments)} parts encoded in parallel")
+    return Video(
+        output_path,
+        codec = profile.stream_codec,
+        width = video.peek('width'),
+        height = video.peek('height'),
+        fps = video.peek('fps')
+    )
 
-        print(cmd)
-        f = ffmpeg.run('ffmpeg', cmd, True)
-        print(f.stderr)
-        return Video(output_path)
 
 def add_video_info(
     video: Video,
@@ -220,43 +944,247 @@ def add_video_info(
     bg_audio: str = None,   # Changed to string path
     end_video: str = None,  # Changed to string path,
     bg_volume: int = 0.3,  # Changed to string,
-    image_scale: int = 0.7
+    image_scale: int = 0.7,
+    stage: str = 'final',
+    layers: Optional[Sequence[StaticLayer]] = None,
+    chunks: int = 1,
+    workspace: Optional[str] = None,
+    master: Optional[str] = None
 ) -> Video:
     """
     Add watermark, background audio, and an end video to the main video.
+    Extra static `layers` (logos...) are merged with the watermark into one overlay.
+    The output is encoded with the `stage` encode profile ("final" or "preview").
+    With `chunks` > 1 the video is encoded in that many parts in parallel
+    (see `encode_chunked`), their temp files kept in `workspace`.
+    A `master` (raw PCM from `master_audio`, already holding the music and
+    the end video's audio) replaces the video's own audio; without either
+    the output is silent.
     """
-    cmd = ['-i', str(video)]
-    filter_complex = []
-    input_count = 1        # Tracks input indices
-    video_label = "[0:v]"  # Base video input
-    audio_label = "[0:a]"  # Base audio input
-    
-    if watermark:
-        cmd.extend(['-i', watermark])
-        filter_complex.append(f"[{input_count}:v]scale=iw*{image_scale}:ih*{image_scale}[wm]")  # Scale watermark
-        filter_complex.append(f"{video_label}[wm]overlay=0:0[video]")  # Position watermark at (10,10)
-        video_label = "[video]"
-        input_count += 1
-    
-    if bg_audio:
-        cmd.extend(['-i', bg_audio])
-        filter_complex.append(f"[{input_count}:a]volume={bg_volume}[bg_audio]")  # Reduce volume to 30%
-        filter_complex.append(f"{audio_label}[bg_audio]amix=inputs=2:duration=first[audio]")
-        audio_label = "[audio]"  # Update label for next filter
-        input_count += 1
-
-    if end_video:
-        cmd.extend(['-i', end_video])
-        filter_complex.append(f"{video_label}[{input_count}:v]concat=n=2:v=1:a=0[final_video]")
-        filter_complex.append(f"{audio_label}[{input_count}:a]concat=n=2:v=0:a=1[final_audio]")
+    if chunks > 1:
+        result = encode_chunked(
+            video, output_path, chunks, watermark, bg_audio, end_video,
+            bg_volume, image_scale, stage, layers, workspace, master
+        )
+        if result is not None:
+            return result
 
-    
-    cmd.extend([
-        '-filter_complex', ';'.join(filter_complex),
-        '-map', video_label, '-map', audio_label,
-        '-c:v', 'libx264', '-c:a', 'aac', '-strict', 'experimental',
+    graph = FilterGraph()
+    index = graph.add_input(video)
+    audio = master is None and bool(audio_codecs(video))
+    if master is None and not audio:
+        logger.debug(f"add_video_info: {video} has no audio, writing a silent video")
+    video_pad, audio_pad = video_info_fragment(
+        graph, graph.stream(index, 'v'), graph.stream(index, 'a') if audio else None,
+        watermark, bg_audio, end_video, bg_volume, image_scale, layers
+    )
+    if master is not None:
+        audio_pad = graph.input(master, MASTER_INPUT_ARGS, kind='a')
+    profile = get_profile(stage)
+    outputs, audio_args = [video_pad], ['-an']
+    if audio_pad is not None:
+        outputs.append(audio_pad)
+        audio_args = ['-c:a', 'aac', '-strict', 'experimental']
+    cmd = graph.command(outputs, [
+        *profile.video_args(),
+        *audio_args,
         '-shortest', '-y', output_path
     ])
-    f = ffmpeg.run('ffmpeg', cmd)
+    f = ffmpeg.run('ffmpeg', cmd, duration = video.peek('duration'), stage = 'final')
     print(f.stderr)
-    return Video(output_path)
+    return Video(
+        output_path,
+        codec = profile.stream_codec,
+        width = video.peek('width'),
+        height = video.peek('height'),
+        fps = video.peek('fps')
+    )
+
+
+def compose_final(
+    clips: List[Video],
+    subtitles: List[Video],
+    output_path: str,
+    width: int,
+    height: int,
+    frame_rate: int = 24,
+    transition_effect: VALID_TRANSITIONS | None = None,
+    transition_duration: int = 1,
+    watermark: str = None,
+    bg_audio: str = None,
+    end_video: str = None,
+    bg_volume: int = 0.3,
+    image_scale: int = 0.7,
+    stage: str = 'final',
+    pipeline: Optional[StreamPipeline] = None,
+    layers: Optional[Sequence[StaticLayer]] = None,
+    chunks: int = 1,
+    workspace: Optional[str] = None,
+    audio: Optional[AudioTimeline] = None,
+    output_format: Optional[OutputFormat] = None
+) -> Video:
+    """
+    Renders the finished video from the background clips and subtitle clips
+    in a single ffmpeg run.
+
+    With `chunks` > 1 (and no `pipeline`) the composite is rendered once at
+    the fast intermediate profile instead, and the slow final encode of it is
+    split into that many parts encoded in parallel (see `encode_chunked`).
+
+    This fuses `edit.concatenate_stream`, `edit.concatenate_by_video`,
+    `edit.overlay_video_image` and `add_video_info` into one filter graph, so
+    none of their intermediate files are encoded or decoded again.
+
+    Args:
+        clips (List[Video]): Background clips, in order.
+        subtitles (List[Video]): Subtitle clips (with alpha and the narration audio), in
+            order; full frame or cut to a bounding box (`Video.position`).
+        output_path (str): Destination path.
+        width (int): Output width.
+        height (int): Output height.
+        frame_rate (int, optional): Output frame rate. Defaults to 24.
+        transition_effect (str, optional): xfade transition between clips, None to concatenate.
+        transition_duration (int, optional): Length of each transition. Defaults to 1.
+        watermark (str, optional): Watermark image path.
+        bg_audio (str, optional): Background music path.
+        end_video (str, optional): Video appended at the end.
+        bg_volume (float, optional): Background music volume. Defaults to 0.3.
+        image_scale (float, optional): Watermark scale. Defaults to 0.7.
+        stage (str, optional): Encode profile, "final" or "preview". Defaults to 'final'.
+        pipeline (StreamPipeline, optional): Pipeline some of the clips are streamed
+            from; its producers run alongside this render. Defaults to None.
+        layers (Sequence[StaticLayer], optional): Extra static images drawn over the
+            video, merged with the watermark into one overlay. Defaults to None.
+        chunks (int, optional): Number of parallel final encodes. Defaults to 1.
+        workspace (str, optional): Job directory for temp files. Defaults to setting.temp_path.
+        audio (AudioTimeline, optional): Narration and sound effects of silent subtitle
+            clips. It is mixed with the music and the end video's audio into one PCM
+            master (see `master_audio`), encoded once here. Defaults to the clips' audio.
+        output_format (OutputFormat, optional): The job's format; overrides `width`,
+            `height` and `frame_rate`. Clips already in it are not scaled or resampled.
+
+    Returns:
+        Video: The finished video.
+    """
+    if output_format is not None:
+        width, height, frame_rate = output_format.width, output_format.height, output_format.fps
+    graph = FilterGraph()
+
+    # background: scaled clips joined together
+    pads = [
+        graph.input(clip, pipeline.input_options(clip) if pipeline else None)
+        for clip in clips
+    ]
+    durations = [clip.duration for clip in clips] if transition_effect else []
+    background = concat_fragment(
+        graph, pads, durations, width, height, frame_rate, transition_effect, transition_duration, clips
+    )
+
+    # subtitles: joined with their audio, then drawn over the background
+    # (clips cut to bounding boxes are padded to a common box and drawn at its position)
+    box = common_box(subtitles)
+    streams = []
+    for subtitle in subtitles:
+        index = graph.add_input(subtitle)
+        pad = align_fragment(graph, graph.stream(index, 'v'), subtitle, box)
+        streams.append((pad, graph.stream(index, 'a')))
+    if audio is None:
+        subtitle_video, sound = concat_av_fragment(graph, streams)
+    else:
+        # the narration is on the audio timeline, the subtitle clips are silent
+        subtitle_video, sound = graph.chain([pad for pad, _ in streams], f"concat=n={len(streams)}:v=1:a=0"), None
+    # the background comes out of concat_fragment at the output size
+    video = overlay_fragment(graph, background, subtitle_video, None, None, shortest=True, position=box[:2])
+
+    durations = [subtitle.peek('duration') for subtitle in subtitles]
+    total_duration = sum(durations) if None not in durations else None
+    master = None
+    if audio is not None:
+        # the overlay ends with the shorter of the two (-shortest): the end video
+        # starts there, after the transitions have shortened the background
+        background_duration = joined_duration(
+            [clip.peek('duration') for clip in clips], transition_effect, transition_duration
+        )
+        main_duration = min(
+            (duration for duration in (background_duration, total_duration) if duration is not None),
+            default=None
+        )
+        master = master_audio(
+            audio, str(generate_unique_path(workspace or setting.temp_path, "f32")),
+            main_duration, bg_audio, bg_volume, end_video
+        )
+    try:
+        if chunks > 1 and pipeline is None:
+            return _compose_chunked(
+                graph, video, sound, output_path, width, height, frame_rate, total_duration,
+                watermark, bg_audio, end_video, bg_volume, image_scale, stage, layers, chunks, workspace, master
+            )
+
+        video, sound = video_info_fragment(
+            graph, video, sound, watermark, bg_audio, end_video, bg_volume, image_scale, layers
+        )
+        if master is not None:
+            sound = graph.input(master, MASTER_INPUT_ARGS, kind='a')
+        profile = get_profile(stage)
+        cmd = graph.command([video, sound], [
+            *profile.video_args(),
+            '-c:a', 'aac', '-strict', 'experimental',
+            '-shortest', '-y', output_path
+        ])
+
+        if pipeline is not None:
+            pipeline.run(cmd, progress = log_progress, duration = total_duration, label = 'compose_final', stage = 'final')
+        else:
+            ffmpeg.run('ffmpeg', cmd, progress = log_progress, duration = total_duration, stage = 'final')
+    finally:
+        if master is not None and os.path.exists(master):
+            os.remove(master)
+    return Video(
+        output_path,
+        codec = profile.stream_codec,
+        width = width,
+        height = height,
+        fps = frame_rate
+    )
+
+
+def _compose_chunked(
+    graph: FilterGraph,
+    video: Pad,
+    sound: Optional[Pad],
+    output_path: str,
+    width: int,
+    height: int,
+    frame_rate: int,
+    total_duration: Optional[float],
+    watermark: str,
+    bg_audio: str,
+    end_video: str,
+    bg_volume: float,
+    image_scale: float,
+    stage: str,
+    layers: Optional[Sequence[StaticLayer]],
+    chunks: int,
+    workspace: Optional[str],
+    master: Optional[str]
+) -> Video:
+    """
+    The chunked end of `compose_final`: renders the composite once at the
+    fast intermediate profile, since the parts need a seekable source with
+    regular keyframes, then encodes it with `add_video_info` in parallel parts.
+    """
+    mezzanine = str(generate_unique_path(workspace or setting.temp_path, "mov"))
+    audio_args = ['-c:a', 'pcm_s16le'] if sound is not None else ['-an']
+    cmd = graph.command([video, sound] if sound is not None else [video], [
+        *get_profile('intermediate').video_args(), *audio_args, '-shortest', '-y', mezzanine
+    ])
+    try:
+        ffmpeg.run('ffmpeg', cmd, progress = log_progress, duration = total_duration, label = 'compose_final')
+        return add_video_info(
+            Video(mezzanine, width = width, height = height, fps = frame_rate, duration = total_duration), output_path,
+            watermark, bg_audio, end_video, bg_volume, image_scale, stage, layers, chunks, workspace, master
+        )
+    finally:
+        if os.path.exists(mezzanine):
+            os.remove(mezzanine)
+
@@ -1,27 +1,255 @@
-from typing import List, Tuple, Literal, Optional
+from typing import List, Tuple, Literal, Optional, Callable, Dict, Union
+from functools import partial
+import random
+import math
 from video_gen.editor.media import Video, Audio
-from video_gen.editor.ffmpeg import ffmpeg
+from video_gen.editor.ffmpeg import ffmpeg, log_progress
+from video_gen.editor.filtergraph import FilterGraph, Pad
+from video_gen.editor.capabilities import has_filter
+from video_gen.editor.profiles import get_profile
+from video_gen.editor.streaming import StreamPipeline
+from video_gen.editor.keyframes import get_keyframes
+from video_gen.editor.conformance import conforms, reuse, remux
+from video_gen.editor.output_format import OutputFormat, DEFAULT_FORMAT, frame_rate_of
 from video_gen.utils import assets
 
-def get_size_code(
-    total_duration: int,
-    required_duration: int,
-    videoid: str,
-    frame_rate:int,
-    custom_width: int = 720, 
-    custom_height: int = 1080
-) -> str:
-    loop_count = required_duration // total_duration
-    
-    if required_duration % total_duration != 0:
-        loop_count += 1
-        
-    loop_cmd = f"loop={int(loop_count)}:1:0"
-    trim_cmd = f"trim=duration={required_duration}"
-    fps_cmd = f"fps={frame_rate}"
-    scale_cmd = f"scale={custom_width}x{custom_height}"
+OFFSET = Union[float, Literal['random'], None]
+
+
+def source_window(
+    source_duration: Optional[float],
+    duration: float,
+    offset: OFFSET = None,
+    seed: Optional[str] = None
+) -> List[str]:
+    """
+    Returns the input options that make ffmpeg read only the part of a source
+    that is needed for a `duration` seconds clip.
+
+    A source longer than the clip is seeked with `-ss` and cut with `-t`, so
+    only that window is demuxed and decoded. A shorter source is repeated by
+    the demuxer with `-stream_loop`.
+
+    Args:
+        source_duration (float or None): Duration of the source, None if unknown.
+        duration (float): Duration of the clip in seconds.
+        offset (float or 'random', optional): Start time in the source. 'random'
+            picks one at random. Defaults to None (the start of the source).
+        seed (str, optional): Seed for a 'random' offset, so the same seed always
+            picks the same window. Defaults to None (a new offset every run).
+
+    Returns:
+        List[str]: Input options, placed before the source's -i.
+    """
+    if not source_duration:
+        return ['-stream_loop', '-1', '-t', f"{duration:.3f}"]
+
+    if source_duration < duration:
+        loop_count = math.ceil(duration / source_duration) - 1
+        return ['-stream_loop', str(loop_count), '-t', f"{duration:.3f}"]
+
+    latest = source_duration - duration
+    if offset == 'random':
+        offset = random.Random(seed).uniform(0, latest)
+    offset = min(max(float(offset or 0), 0), latest)
+
+    options = ['-ss', f"{offset:.3f}"] if offset else []
+    return options + ['-t', f"{duration:.3f}"]
+
+
+def source_fragment(
+    graph: FilterGraph,
+    source: Video,
+    duration: float,
+    frame_rate: int,
+    offset: OFFSET = None,
+    seed: Optional[str] = None
+) -> Pad:
+    """
+    Adds a source to the graph, reading only a `duration` seconds window of it
+    (see `source_window`), and sets the frame rate (a source already at
+    `frame_rate` is not resampled).
+
+    Returns:
+        Pad: The source video, exactly `duration` seconds long.
+    """
+    pad = graph.input(source, source_window(source.duration, duration, offset, seed))
+    filters = [f"trim=duration={duration}"]
+    if frame_rate_of(source.fps) != frame_rate_of(frame_rate):
+        filters.append(f"fps={frame_rate}")
+    return graph.chain(pad, filters)
+
+
+def fit_fragment(
+    graph: FilterGraph,
+    pad: Pad,
+    source_width: int,
+    source_height: int,
+    width: int,
+    height: int,
+    position: Literal['left', 'center', 'right', 'top', 'bottom'] = 'center'
+) -> Pad:
+    """
+    Crops a video to the output aspect ratio (keeping the `position` part of
+    the frame) and scales it to the output size. A video already at the
+    output size is returned as it is, and one already at its aspect ratio
+    is only scaled.
+
+    Returns:
+        Pad: The cropped and scaled video.
+    """
+    if (int(source_width), int(source_height)) == (int(width), int(height)):
+        return pad
+    start_x, start_y, crop_width, crop_height = calculate_crop_params(
+        input_width = source_width,
+        input_height = source_height,
+        target_aspect_w = width,
+        target_aspect_h = height,
+        align = position
+    )
+    filters = [f"scale={width}:{height}"]
+    if (crop_width, crop_height) != (int(source_width), int(source_height)):
+        filters.insert(0, f"crop={crop_width}:{crop_height}:{start_x}:{start_y}")
+    return graph.chain(pad, filters)
+
+
+def conformed_clip(
+    source: Video,
+    output_path: str,
+    duration: float,
+    width: int,
+    height: int,
+    frame_rate: int,
+    offset: OFFSET = None,
+    seed: Optional[str] = None
+) -> Optional[Video]:
+    """
+    Makes a plain background clip without encoding, when the source already
+    is one: a video encoded like an intermediate at the output size and
+    frame rate needs no crop, scale or fps filter.
+
+    A source of the clip's length is hard linked as it is; otherwise the
+    window of it (see `source_window`) is cut by stream copy, starting at the
+    keyframe at or before the window's start.
+
+    Returns:
+        Video or None: The clip, or None when the source has to be filtered and encoded.
+    """
+    profile = get_profile('intermediate')
+    if not conforms(source, profile, width, height, frame_rate):
+        return None
+
+    source_duration = float(source.duration or 0)
+    if source_duration and abs(source_duration - duration) < 0.5 / frame_rate:
+        reuse(source, output_path)
+    else:
+        window = source_window(source_duration, duration, offset, seed)
+        if '-ss' in window:
+            index = window.index('-ss') + 1
+            keyframe = get_keyframes(source).before(float(window[index]))
+            if keyframe is None:
+                return None
+            window[index] = f"{keyframe:.3f}"
+        remux(source, output_path, window, audio=False, duration=duration)
+
+    return Video(
+        output_path,
+        codec = profile.stream_codec,
+        pix_fmt = profile.pix_fmt,
+        width = width,
+        height = height,
+        fps = frame_rate,
+        duration = duration
+    )
+
+
+def still_fragment(graph: FilterGraph, pad: Pad, duration: float, frame_rate: int) -> Pad:
+    """
+    Turns the single frame of a still image into a `duration` seconds video.
+
+    The frame is decoded (and fitted) once and repeated by the loop filter,
+    instead of the demuxer re-reading and re-decoding the image for every
+    output frame.
+
+    Returns:
+        Pad: The still video, exactly `duration` seconds long.
+    """
+    frames = max(1, round(duration * frame_rate))
+    return graph.chain(pad, [
+        f"loop=loop={frames - 1}:size=1",
+        f"setpts=N/({frame_rate})/TB",
+        f"fps={frame_rate}"
+    ])
+
+
+def fitted_source(
+    graph: FilterGraph,
+    source: Video,
+    duration: float,
+    width: int,
+    height: int,
+    frame_rate: int,
+    position: Literal['left', 'center', 'right', 'top', 'bottom'] = 'center',
+    offset: OFFSET = None,
+    seed: Optional[str] = None
+) -> Tuple[Pad, bool]:
+    """
+    Adds a source to the graph, fitted to the output size.
+
+    A video is cut to a `duration` seconds window first (see `source_fragment`).
+    A still image is read once and fitted as a single frame: it is still
+    that frame, and the caller turns it into a video, with `still_fragment`
+    or a zoom that generates the frames itself (`ken_burns_fragment`).
+
+    Returns:
+        Tuple[Pad, bool]: The fitted source and whether it is a single still frame.
+    """
+    if source.isimage():
+        pad, still = graph.input(source), True
+    else:
+        pad, still = source_fragment(graph, source, duration, frame_rate, offset, seed), False
+    return fit_fragment(graph, pad, source.width, source.height, width, height, position), still
+
+
+def ken_burns_fragment(
+    graph: FilterGraph,
+    pad: Pad,
+    duration: float,
+    width: int,
+    height: int,
+    fps: int,
+    zoom_direction: Literal['top', 'bottom', 'center'] = 'center',
+    target_zoom: float = 1.5,
+    still: bool = False
+) -> Pad:
+    """
+    Adds a slow Ken Burns zoom to a video that is already `width`x`height`
+    at `fps` and `duration` seconds long.
+
+    With `still` the input is a single frame (a still image) and zoompan
+    generates every output frame from it, so the image is never looped.
+
+    Returns:
+        Pad: The zoomed video.
+    """
+    # Calculate the zoom factor
+    total_fps = fps * duration
+    zoom_ipf = round((target_zoom - 1) / total_fps, 5)  # Zoom increment per frame
+    d = max(1, round(total_fps)) if still else 1  # output frames per input frame
+    zoompan = f"zoompan=z='1+{zoom_ipf}*on'"
+    output = f"d={d}:s={width}x{height}:fps={fps}"
     
-    return f"{videoid}{loop_cmd},{trim_cmd},{fps_cmd},{scale_cmd}[out];"
+    # Set the zoom direction
+    if zoom_direction == 'center':
+        zoompan_filter = f"{zoompan}:x='(1-1/zoom)*iw/2':y='(1-1/zoom)*ih/2':{output}"
+    elif zoom_direction == 'top':
+        zoompan_filter = f"{zoompan}:{output}"
+    elif zoom_direction == 'bottom':
+        zoompan_filter = f"{zoompan}:x='(1-1/zoom)*iw/2':y='(1-1/zoom)*(ih-ih/4)':{output}"
+    else:
+        raise ValueError(f"Unknown zoom direction: {zoom_direction}")
+
+    return graph.chain(pad, zoompan_filter)
 
 
 def Ken_Burns(
@@ -32,9 +260,11 @@ def Ken_Burns(
     target_zoom: float = 1.5,
     custom_width: int = 720,
     custom_height: int = 1080,
-    fps: int = 24,
+    fps: int = DEFAULT_FORMAT.fps,
+    offset: OFFSET = None,
+    output_format: Optional[OutputFormat] = None,
     **kwargs
-) -> None:
+) -> Video:
     """
     Generates the Ken Burns effect on a video and processes it with ffmpeg.
 
@@ -47,49 +277,43 @@ def Ken_Burns(
         custom_width (int, optional): The width of the output video. Defaults to 1280.
         custom_height (int, optional): The height of the output video. Defaults to 800.
         fps (int, optional): The frame rate of the video. Defaults to 24.
+        offset (float or 'random', optional): Start time in the source. Defaults to None.
+        output_format (OutputFormat, optional): The job's format; overrides
+            `custom_width`, `custom_height` and `fps`. Defaults to None.
 
     Returns:
-        None: Runs the ffmpeg command to generate the video.
+        Video: The rendered video.
     """
-    cmd = ['-i', str(input_path)]
+    if output_format is not None:
+        custom_width, custom_height, fps = output_format.width, output_format.height, output_format.fps
+    graph = FilterGraph()
 
-    # Get the size code filter to loop and trim video
-    filter_complex = []
-    filter_complex.append(
-        get_size_code(input_path.duration, total_duration, '[0:v]', fps, custom_width, custom_height) #always [out]
+    # read only the needed window of the video (or the image, once), then zoom into it
+    still = input_path.isimage()
+    if still:
+        pad = graph.input(input_path)
+    else:
+        pad = source_fragment(graph, input_path, total_duration, fps, offset)
+    pad = graph.chain(pad, f"scale={custom_width}x{custom_height}")
+    pad = ken_burns_fragment(
+        graph, pad, total_duration, custom_width, custom_height, fps, zoom_direction, target_zoom, still
     )
-    
-    # Calculate the zoom factor
-    total_fps = fps * total_duration
-    zoom_ipf = round((target_zoom - 1) / total_fps, 5)  # Zoom increment per frame
-    zoompan, d= f"zoompan=z='1+{zoom_ipf}*on'", 1
-    
-    # Set the zoom direction
-    if zoom_direction == 'center':
-        zoompan_filter = f"[out]{zoompan}:x='(1-1/zoom)*iw/2':y='(1-1/zoom)*ih/2':d={d}:s={custom_width}x{custom_height}"
-    elif zoom_direction == 'top':
-        zoompan_filter = f"[out]{zoompan}:d={d}:s={custom_width}x{custom_height}"
-    elif zoom_direction == 'bottom':
-        zoompan_filter = f"[out]{zoompan}:x='(1-1/zoom)*iw/2':y='(1-1/zoom)*(ih-ih/4)':d={d}:s={custom_width}x{custom_height}"
 
-    filter_complex.append(zoompan_filter)
-
-    # Combine filters into one string
-    filter_complex_str = ''.join(filter_complex)
-
-    # Create the final ffmpeg command
-    total_command = [
-        *cmd, 
-        '-filter_complex', f'{filter_complex_str}', 
-        '-c:v', 'libx264', 
-        '-pix_fmt', 'yuv420p', 
+    profile = get_profile('intermediate')
+    total_command = graph.command([pad], [
+        *profile.video_args(),
         '-y', output_path
-    ]
-    # print(' '.join(total_command),'\n\n')
-
-    # Run the command using subprocess
-    ffmpeg.run('ffmpeg', total_command)
-    return Video(output_path)
+    ])
+    ffmpeg.run('ffmpeg', total_command, progress = log_progress, duration = total_duration)
+    return Video(
+        output_path,
+        codec = profile.stream_codec,
+        pix_fmt = profile.pix_fmt,
+        width = custom_width,
+        height = custom_height,
+        fps = fps,
+        duration = total_duration
+    )
 
 
 def Ken_Burns_reversed(media:Video) -> Video:
@@ -143,7 +367,14 @@ def calculate_crop_params(input_width: int, input_height: int, target_aspect_w:
     return start_x, start_y, crop_width, crop_height
 
 
-def copy_video(input_path: Video, output_path: str, duration: int, position: Literal['left', 'center', 'right'], **kwargs):
+def copy_video(
+    input_path: Video,
+    output_path: str,
+    duration: int,
+    position: Literal['left', 'center', 'right'],
+    offset: OFFSET = None,
+    **kwargs
+):
     """
     Copies a video file to a new location and processes it with ffmpeg.
     Handles resizing, cropping, positioning, and looping.
@@ -153,45 +384,143 @@ def copy_video(input_path: Video, output_path: str, duration: int, position: Lit
         output_path (str): Destination path.
         duration (int): Final video duration in seconds.
         position (Literal['left', 'center', 'right']): Cropping position.
+        offset (float or 'random', optional): Start time in the source. Defaults to None.
     """
-    width, height = kwargs.get("width", 720), kwargs.get("height", 1280)
-    start_x, start_y, crop_width, crop_height = calculate_crop_params(
-        input_width = input_path.width,
-        input_height = input_path.height,
-        target_aspect_w = kwargs.get("width", 720),
-        target_aspect_h = kwargs.get("height", 1280),
-        align = position
-    )
-    # Looping logic
-    loop_count = duration // input_path.duration
-    if duration % input_path.duration != 0:
-        loop_count += 1
-        
-    loop_cmd = f"loop={loop_count}:1:0"
-    trim_cmd = f"trim=duration={duration}"
-    fps_cmd = f"fps=24"
-
-    # FFmpeg filter chain
-    code_ = (
-        f"[0:v]{loop_cmd},{trim_cmd},{fps_cmd},"
-        f"crop={crop_width}:{crop_height}:{start_x}:{start_y},"
-        f"scale={width}:{height}[out];"
+    output_format = kwargs.get("output_format") or OutputFormat(
+        kwargs.get("width", DEFAULT_FORMAT.width),
+        kwargs.get("height", DEFAULT_FORMAT.height),
+        kwargs.get("fps", DEFAULT_FORMAT.fps)
     )
+    width, height, fps = output_format.width, output_format.height, output_format.fps
 
-    # Build FFmpeg command
-    cmd = [
-        "-i", str(input_path),
-        "-filter_complex", code_,
-        "-map", "[out]",
+    # nothing to crop, scale or resample: no encode needed
+    clip = conformed_clip(input_path, output_path, duration, width, height, fps, offset)
+    if clip is not None:
+        return clip
+
+    graph = FilterGraph()
+    pad, still = fitted_source(graph, input_path, duration, width, height, fps, position, offset)
+    if still:
+        pad = still_fragment(graph, pad, duration, fps)
+
+    profile = get_profile('intermediate')
+    cmd = graph.command([pad], [
+        *profile.video_args(),
         "-y", output_path
-    ]
+    ])
+    ffmpeg.run('ffmpeg', cmd, duration = duration)
+
+    return Video(
+        output_path,
+        codec = profile.stream_codec,
+        pix_fmt = profile.pix_fmt,
+        width = width,
+        height = height,
+        fps = fps,
+        duration = duration
+    )
+
+
+# Effect fragments share one signature:
+#   fragment(graph, pad, duration, width, height, fps, still=False) -> Pad
+# and work on a stream that is already cut to length and fitted to the output,
+# or with `still` on the single fitted frame of an image, which they expand
+# to `duration` seconds.
+EFFECT_FRAGMENTS: Dict[str, Optional[Callable[..., Pad]]] = {
+    "Ken_Burns_middle": partial(ken_burns_fragment, zoom_direction='center'),
+    "Ken_Burns_top": partial(ken_burns_fragment, zoom_direction='top'),
+    "Ken_Burns_bottom": partial(ken_burns_fragment, zoom_direction='bottom'),
+    "no_effect": None,
+}
+
 
-    # Run FFmpeg
-    ffmpeg.run('ffmpeg', cmd)
+def apply_effects(
+    input_path: Video,
+    output_path: str,
+    effects: List[str],
+    duration: float,
+    width: int = 720,
+    height: int = 1280,
+    position: Literal['left', 'center', 'right', 'top', 'bottom'] = 'center',
+    fps: int = 24,
+    offset: OFFSET = None,
+    seed: Optional[str] = None,
+    pipeline: Optional[StreamPipeline] = None,
+    output_format: Optional[OutputFormat] = None
+) -> Video:
+    """
+    Renders a background clip with a chain of effects in a single ffmpeg run.
+
+    Only the needed window of the source is read (looped by the demuxer when
+    the source is too short; a still image is decoded once) and fitted to the
+    output once, then every
+    effect fragment is appended to the same filter graph, so a chain of
+    effects costs one decode and one encode instead of one per effect.
+
+    Args:
+        input_path (Video): Source video or still image.
+        output_path (str): Destination path.
+        effects (List[str]): Effect names, applied in order. Unknown names, and
+            effects the installed ffmpeg cannot render, are skipped.
+        duration (float): Output duration in seconds.
+        width (int, optional): Output width. Defaults to 720.
+        height (int, optional): Output height. Defaults to 1280.
+        position (str, optional): Part of the frame kept when cropping. Defaults to 'center'.
+        fps (int, optional): Output frame rate. Defaults to 24.
+        offset (float or 'random', optional): Start time in the source. Defaults to None.
+        seed (str, optional): Seed making a 'random' offset reproducible. Defaults to None.
+        pipeline (StreamPipeline, optional): Stream the clip instead of rendering it
+            now: `output_path` must be one of the pipeline's FIFOs, and the clip is
+            produced while the pipeline's consumer reads it. Defaults to None.
+        output_format (OutputFormat, optional): The job's format; overrides `width`,
+            `height` and `fps`. Defaults to None.
 
-    return Video(output_path)
+    Returns:
+        Video: The rendered clip (or the stream, with `pipeline`).
+    """
+    if output_format is not None:
+        width, height, fps = output_format.width, output_format.height, output_format.fps
+    # every effect fragment is built on zoompan
+    active = [name for name in effects if EFFECT_FRAGMENTS.get(name) is not None and has_filter('zoompan')]
+    if not active and pipeline is None:
+        # without effects a source that already fits the output is not encoded again
+        clip = conformed_clip(input_path, output_path, duration, width, height, fps, offset, seed)
+        if clip is not None:
+            return clip
+
+    graph = FilterGraph()
+    pad, still = fitted_source(graph, input_path, duration, width, height, fps, position, offset, seed)
+
+    for name in active:
+        # the first one expands a still image into the whole clip
+        pad = EFFECT_FRAGMENTS[name](graph, pad, duration, width, height, fps, still=still)
+        still = False
 
+    if still:
+        pad = still_fragment(graph, pad, duration, fps)
 
+    if pipeline is not None:
+        cmd = graph.command([pad], [*pipeline.output_args(), '-y', output_path])
+        pipeline.add(cmd, output_path, label = 'apply_effects', duration = duration)
+        codec, pix_fmt = 'rawvideo', 'yuv420p'
+    else:
+        profile = get_profile('intermediate')
+        cmd = graph.command([pad], [
+            *profile.video_args(),
+            '-y', output_path
+        ])
+        ffmpeg.run('ffmpeg', cmd, progress = log_progress, duration = duration)
+        codec, pix_fmt = profile.stream_codec, profile.pix_fmt
+
+    return Video(
+        output_path,
+        codec = codec,
+        pix_fmt = pix_fmt,
+        width = width,
+        height = height,
+        fps = fps,
+        duration = duration
+    )
 
 
 class effect_get:
@@ -209,4 +538,4 @@ class effect_get:
         if value is None:
             value = copy_video
         
-        return value
\ No newline at end of file
+        return value
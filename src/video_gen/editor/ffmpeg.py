@@ -1,12 +1,171 @@
 from video_gen.utils import validate_executable, OS_NAME, validate_file, assets
-from typing import Dict, Any, List
+from video_gen.editor.cache import media_cache
+from video_gen.editor.profiles import thread_budget, thread_args, unsupported_profiles
+from video_gen.editor.capabilities import use_binary, check_capabilities
+from video_gen.editor.trace import tracer
+from video_gen.editor.supervisor import supervisor, popen_kwargs, kill_group, STAGE_CLASSES
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Iterable, Optional, Tuple, AsyncIterator, Callable
+import contextlib
 import subprocess
+import threading
+import asyncio
+import signal
+import time
+import sys
+import logging
 import json
+import os
 
 # Default data to use for rn
 ffmpeg_path = assets.ffmpeg
 ffprobe_path = assets.ffprobe
 terminal = False
+logger = logging.getLogger(__name__)
+
+# Only the entries MediaInfo actually reads; keeps ffprobe from
+# collecting chapters, programs and every stream tag.
+PROBE_ENTRIES = ":".join([
+    "format=filename,format_name,duration,size,bit_rate,nb_streams",
+    "format_tags=creation_time",
+    (
+        "stream=index,codec_type,codec_name,codec_tag_string,width,height,pix_fmt,"
+        "profile,level,has_b_frames,extradata_hash,"
+        "r_frame_rate,time_base,duration_ts,duration,bit_rate,nb_frames,"
+        "sample_fmt,sample_rate,channels,bits_per_sample"
+    ),
+])
+
+
+class FFmpegProgress:
+    """
+    One progress report of a running ffmpeg command (a `-progress` block).
+
+    Attributes:
+        frame (int): Frames written so far.
+        fps (float): Current encoding speed in frames per second.
+        bitrate (str): Current output bitrate as reported by ffmpeg (e.g. "1234.5kbits/s").
+        total_size (int): Bytes written so far.
+        out_time (float): Position of the output in seconds.
+        speed (float): Encoding speed relative to real time (1.0 = real time).
+        elapsed (float): Wall-clock seconds since the command started.
+        duration (float or None): Expected output duration in seconds, if known.
+        eta (float or None): Estimated seconds until the command ends, if known.
+        done (bool): True for the last report of the command.
+    """
+    __slots__ = (
+        'frame', 'fps', 'bitrate', 'total_size', 'out_time',
+        'speed', 'elapsed', 'duration', 'eta', 'done'
+    )
+
+    def __init__(self, values: Dict[str, str], elapsed: float, duration: Optional[float] = None) -> None:
+        """
+        Args:
+            values (Dict[str, str]): The key=value pairs of one progress block.
+            elapsed (float): Wall-clock seconds since the command started.
+            duration (float, optional): Expected output duration in seconds.
+        """
+        self.frame = int(self._number(values.get('frame'), 0))
+        self.fps = self._number(values.get('fps'), 0.0)
+        self.bitrate = values.get('bitrate', 'N/A')
+        self.total_size = int(self._number(values.get('total_size'), 0))
+        self.out_time = self._number(values.get('out_time_us', values.get('out_time_ms')), 0.0) / 1_000_000
+        self.speed = self._number(values.get('speed', '').rstrip('x'), 0.0)
+        self.elapsed = elapsed
+        self.duration = duration
+        self.done = values.get('progress') == 'end'
+        self.eta = self._estimate()
+
+    @staticmethod
+    def _number(value: Optional[str], default: float) -> float:
+        """Parse a number reported by ffmpeg ("N/A" and missing values give default)."""
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return default
+
+    def _estimate(self) -> Optional[float]:
+        """
+        Estimate the remaining time from the speed, or from the elapsed
+        time when ffmpeg does not report a speed yet.
+        """
+        if self.done:
+            return 0.0
+        if not self.duration or self.out_time <= 0:
+            return None
+
+        remaining = max(self.duration - self.out_time, 0.0)
+        if self.speed > 0:
+            return remaining / self.speed
+        return self.elapsed * remaining / self.out_time
+
+    @property
+    def percent(self) -> Optional[float]:
+        """Completion in percent, if the expected duration is known."""
+        if self.done:
+            return 100.0
+        if not self.duration:
+            return None
+        return min(100.0, self.out_time * 100 / self.duration)
+
+    def __repr__(self) -> str:
+        return (
+            f"FFmpegProgress(out_time={self.out_time:.2f}, fps={self.fps}, "
+            f"speed={self.speed}x, bitrate={self.bitrate}, eta={self.eta})"
+        )
+
+
+class ProgressParser:
+    """
+    Turns the `-progress pipe:1` output of ffmpeg into FFmpegProgress reports.
+
+    Feed it stdout line by line; a report is returned each time a block ends
+    (on its `progress=continue` / `progress=end` line).
+    """
+    def __init__(self, duration: Optional[float] = None) -> None:
+        """
+        Args:
+            duration (float, optional): Expected output duration in seconds, used for the ETA.
+        """
+        self.duration = duration
+        self.start = time.monotonic()
+        self.last: Optional[FFmpegProgress] = None
+        self._values: Dict[str, str] = {}
+
+    def feed(self, line: str) -> Optional[FFmpegProgress]:
+        """
+        Parse one line of progress output.
+
+        Args:
+            line (str): A "key=value" line.
+
+        Returns:
+            Optional[FFmpegProgress]: A report when the line ends a block, else None.
+        """
+        key, sep, value = line.strip().partition('=')
+        if not sep:
+            return None
+
+        self._values[key] = value.strip()
+        if key != 'progress':
+            return None
+
+        self.last = FFmpegProgress(self._values, time.monotonic() - self.start, self.duration)
+        self._values = {}
+        return self.last
+
+
+def log_progress(progress: FFmpegProgress) -> None:
+    """
+    A ready-made progress callback that writes each report to the debug log.
+    """
+    percent = f"{progress.percent:.1f}%" if progress.percent is not None else "?"
+    eta = f"{progress.eta:.1f}s" if progress.eta is not None else "?"
+    logger.debug(
+        f"ffmpeg {percent} out_time={progress.out_time:.2f}s fps={progress.fps} "
+        f"speed={progress.speed}x bitrate={progress.bitrate} eta={eta}"
+    )
+
 
 
 class FFmpeg:
@@ -58,26 +217,53 @@ class FFmpeg:
             try:
                 validate_executable(name, path)
                 setattr(self, f"{name}_path", path)
+                if name == "ffmpeg":
+                    use_binary(path)
                 
             except (FileNotFoundError, PermissionError) as e:
                 if not error_handle: raise e from None
         
-    def run(self, command_type:str, args:List[str], check:bool = True) -> subprocess.CompletedProcess:
+    def check_capabilities(self) -> List[str]:
         """
-        Generic method to run FFmpeg commands.
+        Check once, up front, that the configured ffmpeg has the filters and
+        encoders the pipeline needs, so a missing feature is reported before
+        any rendering starts.
+
+        Returns:
+            List[str]: Missing required features, empty when ffmpeg is usable.
+        """
+        missing = check_capabilities()
+        for name in unsupported_profiles():
+            logger.error(f"ffmpeg has no encoder for the {name} profile")
+            missing.append(f"encoder for the {name} profile")
+        return missing
+
+    def _build_command(
+        self,
+        command_type:str,
+        args:List[str],
+        progress:bool = False,
+        threads:Optional[int] = None
+    ) -> Tuple[List[str], Dict[str, Any]]:
+        """
+        Build the full command line and the extra subprocess keyword arguments.
 
         Args:
             command_type (str): "ffmpeg" or "ffprobe".
-            args (List[str]): Additional command-line arguments.
-            check (bool): If True, raises an error if the command fails.
+            args (List[str]): Additional command-line arguments, ending with the output.
+            progress (bool): Make ffmpeg write progress reports to stdout.
+            threads (int, optional): Thread count for the encoder and filter graphs
+                (ffmpeg only); the encoder option is placed just before the output.
 
         Returns:
-            subprocess.CompletedProcess: The result of the subprocess execution.
+            Tuple[List[str], Dict[str, Any]]: The command and the subprocess kwargs.
         """
         kwargs = {}
         
         if command_type == 'ffmpeg':
             base_command = [str(self.ffmpeg_path)] #+ terminal_info
+            if progress:
+                base_command.extend(['-progress', 'pipe:1', '-nostats'])
             
         elif command_type == 'ffprobe':
             base_command = [str(self.ffprobe_path)]
@@ -85,27 +271,306 @@ class FFmpeg:
         else:
             raise ValueError("Invalid command type. Use 'ffmpeg' or 'ffprobe'")
         
+        # own process group, so the supervisor can kill the child with everything it spawned
+        kwargs.update(popen_kwargs())
         if self.no_terminal:
             if OS_NAME == 'Windows':
                 kwargs['creationflags'] = subprocess.CREATE_NO_WINDOW
                 
-        before = []                                                  #['cpulimit', '-l', '50', '--', 'ffmpeg']
         terminal_info = ['-hide_banner', '-loglevel', 'error']       #'-progress', 'pipe:1'
-        cpu_manage = ['-preset', 'ultrafast', '-threads', '2']
-        try:
-            result = subprocess.run(
-                before + base_command + args + terminal_info + cpu_manage,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                check=check,
+        if command_type == 'ffmpeg' and threads is not None:
+            cpu_manage = thread_args(threads)
+            base_command.extend(cpu_manage['global'])
+            args = args[:-1] + cpu_manage['output'] + args[-1:]
+        return base_command + args + terminal_info, kwargs
+
+    def run(
+        self,
+        command_type:str,
+        args:List[str],
+        check:bool = True,
+        progress:Optional[Callable[[FFmpegProgress], None]] = None,
+        duration:Optional[float] = None,
+        label:Optional[str] = None,
+        stage:Optional[STAGE_CLASSES] = None,
+        share:Optional[int] = None
+    ) -> subprocess.CompletedProcess:
+        """
+        Generic method to run FFmpeg commands.
+
+        Args:
+            command_type (str): "ffmpeg" or "ffprobe".
+            args (List[str]): Additional command-line arguments.
+            check (bool): If True, raises an error if the command fails.
+            progress (Callable, optional): Called with an FFmpegProgress report
+                (out_time, fps, speed, bitrate, ETA) while an ffmpeg command runs.
+            duration (float, optional): Expected output duration in seconds, used for the ETA.
+            label (str, optional): Stage name recorded in the trace. Defaults to
+                the name of the calling function.
+            stage (str, optional): Supervisor stage class, which sets the deadline
+                (proportional to `duration`), niceness and resource limits.
+                Defaults to "probe" for ffprobe and "intermediate" for ffmpeg.
+            share (int, optional): Number of ffmpeg processes the caller runs side by
+                side, to split the thread budget evenly between them (see `ThreadBudget.reserve`).
+
+        Returns:
+            subprocess.CompletedProcess: The result of the subprocess execution.
+
+        Raises:
+            RuntimeError: If `check` is set and the command fails or misses its deadline.
+
+        Note:
+            every ffmpeg command reserves its `-threads` / `-filter_complex_threads` /
+            `-filter_threads` count from `thread_budget` for as long as it runs; the
+            codec settings come from the stage's EncodeProfile (see profiles.py).
+            When `tracer` is enabled each invocation is recorded with its wall time,
+            CPU time, peak RSS and I/O.
+        """
+        label = label or sys._getframe(1).f_code.co_name
+
+        if command_type != 'ffmpeg':
+            return self._run(command_type, args, check, None, duration, None, label, stage or 'probe')
+
+        with thread_budget.reserve(share) as threads:
+            return self._run(command_type, args, check, progress, duration, threads, label, stage or 'intermediate')
+
+    def _run(
+        self,
+        command_type:str,
+        args:List[str],
+        check:bool,
+        progress:Optional[Callable[[FFmpegProgress], None]],
+        duration:Optional[float],
+        threads:Optional[int],
+        label:str,
+        stage:STAGE_CLASSES
+    ) -> subprocess.CompletedProcess:
+        """
+        Run one command to completion; see `run`.
+        """
+        command, kwargs = self._build_command(
+            command_type, args, progress=progress is not None, threads=threads
+        )
+        parser = ProgressParser(duration)
+        started = time.monotonic()
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            **kwargs
+        )
+        # drain stderr on the side so a chatty ffmpeg can never block on a full pipe
+        stderr_chunks = []
+        stderr_reader = threading.Thread(
+            target=lambda: stderr_chunks.append(process.stderr.read()),
+            daemon=True
+        )
+        stderr_reader.start()
+
+        with process, supervisor.watch(process.pid, label, stage, duration) as watch:
+            if progress is None:
+                stdout = process.stdout.read()
+            else:
+                stdout_lines = []
+                for line in process.stdout:
+                    stdout_lines.append(line)
+                    report = parser.feed(line)
+                    if report is not None:
+                        progress(report)
+                stdout = ''.join(stdout_lines)
+            usage = _wait_with_usage(process)
+            stderr_reader.join()
+
+        tracer.record(label, command, started, process.returncode, usage, output=args[-1] if args else None)
+        return self._completed(
+            command_type, command, process.returncode, stdout, ''.join(stderr_chunks), check,
+            watch.error(command_type) if watch.expired else None
+        )
+
+    @staticmethod
+    def _completed(
+        command_type:str,
+        command:List[str],
+        returncode:int,
+        stdout:str,
+        stderr:str,
+        check:bool,
+        timeout_error:Optional[str] = None
+    ) -> subprocess.CompletedProcess:
+        """
+        Wrap the outcome of a command, raising RuntimeError on failure when `check` is set.
+        `timeout_error` is the message to raise with when the supervisor killed the command.
+        """
+        if check and timeout_error:
+            raise RuntimeError(timeout_error) from subprocess.TimeoutExpired(command, None, stdout, stderr)
+        if check and returncode != 0:
+            error_message = stderr.strip() if stderr else "No error message available."
+            raise RuntimeError(f"{command_type} \nERROR: {error_message}") from subprocess.CalledProcessError(
+                returncode, command, stdout, stderr
+            )
+        return subprocess.CompletedProcess(command, returncode, stdout, stderr)
+
+    async def run_async(
+        self,
+        command_type:str,
+        args:List[str],
+        check:bool = True,
+        progress:Optional[Callable[[FFmpegProgress], None]] = None,
+        duration:Optional[float] = None,
+        label:Optional[str] = None,
+        stage:Optional[STAGE_CLASSES] = None
+    ) -> subprocess.CompletedProcess:
+        """
+        Asyncio version of `run`.
+
+        The child is started with asyncio's subprocess support, so other coroutines
+        (another encode, TTS requests...) keep running while it works. At most
+        `process_limiter.limit` commands run at the same time across the process.
+        If the awaiting task is cancelled the child is terminated (then killed if
+        it does not exit in time) before the cancellation propagates.
+
+        Args:
+            command_type (str): "ffmpeg" or "ffprobe".
+            args (List[str]): Additional command-line arguments.
+            check (bool): If True, raises an error if the command fails.
+            progress (Callable, optional): Called with an FFmpegProgress report
+                while an ffmpeg command runs.
+            duration (float, optional): Expected output duration in seconds, used for the ETA.
+            label (str, optional): Stage name recorded in the trace. Defaults to "run_async".
+            stage (str, optional): Supervisor stage class (see `run`).
+
+        Returns:
+            subprocess.CompletedProcess: The result of the subprocess execution.
+
+        Note:
+            asyncio reaps the child itself, so traced records of async commands
+            carry wall time and file sizes but no CPU/RSS/I/O figures.
+        """
+        report_progress = progress is not None and command_type == 'ffmpeg'
+        parser = ProgressParser(duration)
+        label = label or 'run_async'
+        stage = stage or ('intermediate' if command_type == 'ffmpeg' else 'probe')
+
+        async def read_stdout(stream: asyncio.StreamReader) -> bytes:
+            if not report_progress:
+                return await stream.read()
+            lines = []
+            async for line in stream:
+                lines.append(line)
+                report = parser.feed(line.decode(errors='replace'))
+                if report is not None:
+                    progress(report)
+            return b''.join(lines)
+
+        async with process_limiter.acquire(), contextlib.AsyncExitStack() as stack:
+            threads = None
+            if command_type == 'ffmpeg':
+                threads = stack.enter_context(thread_budget.reserve())
+            command, kwargs = self._build_command(
+                command_type, args, progress=report_progress, threads=threads
+            )
+            started = time.monotonic()
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
                 **kwargs
             )
-            return result
-        
-        except subprocess.CalledProcessError as e:
-            error_message = e.stderr.strip() if e.stderr else "No error message available."
-            raise RuntimeError(f"{command_type} \nERROR: {error_message}") from e
+            watch = stack.enter_context(supervisor.watch(process.pid, label, stage, duration))
+            try:
+                stdout, stderr = await asyncio.gather(
+                    read_stdout(process.stdout),
+                    process.stderr.read()
+                )
+                await process.wait()
+            except asyncio.CancelledError:
+                await _terminate_async(process)
+                raise
+
+        tracer.record(label, command, started, process.returncode, output=args[-1] if args else None)
+        return self._completed(
+            command_type, command, process.returncode,
+            stdout.decode(errors='replace'), stderr.decode(errors='replace'), check,
+            watch.error(command_type) if watch.expired else None
+        )
+
+
+def _wait_with_usage(process: subprocess.Popen) -> Any:
+    """
+    Wait for a child and return its own resource usage (os.wait4), or None
+    where wait4 is not available.
+    """
+    if not hasattr(os, 'wait4'):
+        process.wait()
+        return None
+    try:
+        _, status, usage = os.wait4(process.pid, 0)
+    except ChildProcessError:
+        process.wait()
+        return None
+
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return usage
+
+
+async def _terminate_async(process: asyncio.subprocess.Process, grace: float = 5.0) -> None:
+    """
+    Ask a child process (and its process group) to stop, and kill it if it
+    is still alive after `grace` seconds.
+    """
+    if process.returncode is not None:
+        return
+    try:
+        kill_group(process.pid, signal.SIGTERM)
+        await asyncio.wait_for(process.wait(), grace)
+    except asyncio.TimeoutError:
+        kill_group(process.pid, getattr(signal, 'SIGKILL', signal.SIGTERM))
+        await process.wait()
+
+
+class ProcessLimiter:
+    """
+    Async context manager capping how many ffmpeg/ffprobe children run at once.
+
+    The limit is shared by every caller of `FFmpeg.run_async` in the process.
+    The underlying asyncio.Semaphore is bound to the running event loop and
+    recreated if a new loop (e.g. a new asyncio.run call) starts using it.
+
+    Attributes:
+        limit (int): Maximum number of concurrent child processes.
+    """
+    def __init__(self, limit: int) -> None:
+        self.limit = max(1, limit)
+        self._semaphore = None
+        self._loop = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.limit)
+            self._loop = loop
+        return self._semaphore
+
+    def set_limit(self, limit: int) -> None:
+        """
+        Change the limit; commands already waiting keep the previous one.
+        """
+        self.limit = max(1, limit)
+        self._loop = None
+
+    @contextlib.asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        """
+        Wait for a free slot and hold it for the duration of the block.
+        """
+        semaphore = self._get_semaphore()
+        async with semaphore:
+            yield
+
+
+# Half the cores, so the thread budget can still give every child at least two threads
+process_limiter = ProcessLimiter((os.cpu_count() or 2) // 2)
 
 
 # do not support these:-
@@ -206,6 +671,10 @@ class MediaInfo:
             'width': data.get('width', 0),
             'height': data.get('height', 0),
             'pix_fmt': data.get('pix_fmt', None),
+            'profile': data.get('profile', None),
+            'level': data.get('level', None),
+            'has_b_frames': data.get('has_b_frames', None),
+            'extradata_hash': data.get('extradata_hash', None),
             'r_frame_rate': self._parse_frame_rate(data.get('r_frame_rate', '0/1')),
             'time_base': self._parse_frame_rate(data.get('time_base', '0/1')),
             'duration_ts': int(self._try_convert_number(data.get('duration_ts', 0))),
@@ -254,16 +723,45 @@ class MediaInfo:
             self.STREAMS.append(processed_stream)
             
 
-def get_MediaInfo(file_path: str) -> MediaInfo:
+def _probe_media(file_path: str) -> Dict[str, Any]:
+    """
+    Run ffprobe on a file and return its parsed JSON output,
+    restricted to the entries listed in PROBE_ENTRIES.
+    """
+    ffmpeg = FFmpeg()
+    result = ffmpeg.run(
+        'ffprobe', 
+        [
+            "-v", "error",
+            "-show_entries", PROBE_ENTRIES,
+            "-show_data_hash", "sha256",  # for extradata_hash
+            "-print_format", "json",
+            str(file_path)
+        ]
+    )
+
+    try:
+        return json.loads(result.stdout)
+    except json.JSONDecodeError as e:
+        raise ValueError("Failed to parse ffprobe output") from e
+
+
+def get_MediaInfo(file_path: str, use_cache: bool = True) -> MediaInfo:
     """
     Extracts and returns detailed media metadata using ffprobe.
 
     This function checks if the given media file exists and then invokes ffprobe
-    to retrieve format, stream, chapter, and program information in JSON format.
+    to retrieve the format and stream information in JSON format.
     The extracted metadata is parsed and returned as a MediaInfo object.
 
+    The raw ffprobe output is kept in the persistent `media_cache`, keyed by the
+    file's path, size, mtime and inode, so probing an unchanged file again only
+    costs a stat() call instead of a subprocess.
+
     Args:
         file_path (str): The path to the media file.
+        use_cache (bool, optional): Look up / store the result in the metadata cache.
+            Defaults to True.
 
     Returns:
         MediaInfo: An object containing the extracted metadata.
@@ -275,23 +773,65 @@ def get_MediaInfo(file_path: str) -> MediaInfo:
     if not validate_file(file_path):
         raise FileNotFoundError(f"Media file not found: {file_path}")
 
-    ffmpeg = FFmpeg()
-    result = ffmpeg.run(
-        'ffprobe', 
-        [
-            "-v", "error",
-            "-show_format",
-            "-show_streams",
-            "-show_chapters",
-            "-show_programs",
-            "-print_format", "json",
-            file_path
-        ]
-    )
+    media_data = media_cache.get(file_path) if use_cache else None
+    if media_data is not None:
+        return MediaInfo(media_data)
+
+    media_data = _probe_media(file_path)
+    if use_cache:
+        media_cache.put(file_path, media_data)
+    return MediaInfo(media_data)
+
+
+def get_MediaInfo_many(
+    paths: Iterable[str],
+    max_workers: Optional[int] = None,
+    use_cache: bool = True,
+    ignore_errors: bool = False
+) -> Dict[str, MediaInfo]:
+    """
+    Probe a batch of media files concurrently.
+
+    Cached files are answered straight from `media_cache`; the remaining ones are
+    probed by a bounded pool of worker threads (each one waiting on its own
+    ffprobe process) and stored back in the cache. Use it to pre-probe every
+    asset of a job up front, so later Video/Audio objects only hit the cache.
+
+    Args:
+        paths (Iterable[str]): Media files to probe; duplicates are probed once.
+        max_workers (int, optional): Size of the worker pool. Defaults to the CPU count.
+        use_cache (bool, optional): Look up / store results in the metadata cache. Defaults to True.
+        ignore_errors (bool, optional): Log and skip files that cannot be probed
+            instead of raising. Defaults to False.
+
+    Returns:
+        Dict[str, MediaInfo]: MediaInfo for every probed path, keyed by the path as given.
+
+    Raises:
+        FileNotFoundError: If a file does not exist (unless ignore_errors).
+        RuntimeError, ValueError: If ffprobe fails on a file (unless ignore_errors).
+    """
+    paths = list(dict.fromkeys(str(path) for path in paths))
+    if not paths:
+        return {}
+
+    max_workers = max_workers or os.cpu_count() or 1
+    results: Dict[str, MediaInfo] = {}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as pool:
+        futures = {
+            path: pool.submit(get_MediaInfo, path, use_cache)
+            for path in paths
+        }
+        for path, future in futures.items():
+            try:
+                results[path] = future.result()
+            except (FileNotFoundError, RuntimeError, ValueError) as e:
+                if not ignore_errors:
+                    raise
+                logger.warning(f"Could not probe {path}: {e}")
+
+    return results
 
-    try:
-        return MediaInfo(json.loads(result.stdout))
-    except json.JSONDecodeError as e:
-        raise ValueError("Failed to parse ffprobe output") from e
 
 ffmpeg = FFmpeg()
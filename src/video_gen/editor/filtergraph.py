@@ -0,0 +1,171 @@
+from typing import List, Optional, Union, Iterable, Dict, Literal
+import itertools
+
+PAD_KIND = Literal['v', 'a']
+
+
+class Pad:
+    """
+    A typed stream endpoint of a filter graph.
+
+    A pad is either an input stream ("0:v", "2:a") or a labelled filter output
+    ("v3"). Labelled outputs can be consumed exactly once, input streams as
+    often as needed.
+
+    Attributes:
+        name (str): Stream specifier or label, without brackets.
+        kind (str): "v" for video, "a" for audio.
+    """
+    __slots__ = ('name', 'kind')
+
+    def __init__(self, name: str, kind: PAD_KIND = 'v') -> None:
+        self.name = name
+        self.kind = kind
+
+    @property
+    def is_input(self) -> bool:
+        """True for an input stream, False for a labelled filter output."""
+        return ':' in self.name
+
+    @property
+    def map_arg(self) -> str:
+        """The value to pass to `-map` for this pad."""
+        return self.name if self.is_input else f"[{self.name}]"
+
+    def __str__(self) -> str:
+        return f"[{self.name}]"
+
+    def __repr__(self) -> str:
+        return f"Pad({self.name!r}, kind={self.kind!r})"
+
+
+class FilterGraph:
+    """
+    Builds the inputs and `-filter_complex` of a single ffmpeg invocation.
+
+    Stage helpers ("fragments") take a graph and the pads they work on, append
+    their filter chains and return the pads they produce. Because fragments
+    only talk in pads, several of them can be chained inside one graph and
+    rendered by one ffmpeg process, instead of one process (and one full
+    intermediate encode) per stage.
+
+    Example:
+        >>> graph = FilterGraph()
+        >>> video = graph.input("in.mp4")
+        >>> video = graph.chain(video, ["fps=24", "scale=720:1280"])
+        >>> cmd = graph.command([video], ["-y", "out.mp4"])
+    """
+    def __init__(self) -> None:
+        self._inputs: List[List[str]] = []
+        self._chains: List[str] = []
+        self._consumed: set = set()
+        self._counters: Dict[str, itertools.count] = {}
+
+    def add_input(self, path: str, options: Optional[List[str]] = None) -> int:
+        """
+        Add an input file.
+
+        Args:
+            path (str): Input path (anything ffmpeg accepts after -i).
+            options (List[str], optional): Input options placed before its -i.
+
+        Returns:
+            int: The input index.
+        """
+        self._inputs.append([*(options or []), '-i', str(path)])
+        return len(self._inputs) - 1
+
+    def input(self, path: str, options: Optional[List[str]] = None, kind: PAD_KIND = 'v') -> Pad:
+        """
+        Add an input file and return the pad of its first stream of `kind`.
+        """
+        return self.stream(self.add_input(path, options), kind)
+
+    def stream(self, index: int, kind: PAD_KIND = 'v') -> Pad:
+        """
+        Return the pad of an input's stream of `kind`.
+        """
+        if not 0 <= index < len(self._inputs):
+            raise IndexError(f"No input with index {index}")
+        return Pad(f"{index}:{kind}", kind)
+
+    def new_pad(self, kind: PAD_KIND = 'v', prefix: Optional[str] = None) -> Pad:
+        """
+        Return a fresh, uniquely labelled pad.
+        """
+        prefix = prefix or kind
+        counter = self._counters.setdefault(prefix, itertools.count())
+        return Pad(f"{prefix}{next(counter)}", kind)
+
+    def _consume(self, pads: Iterable[Pad]) -> str:
+        labels = []
+        for pad in pads:
+            if not pad.is_input:
+                if pad.name in self._consumed:
+                    raise ValueError(f"Pad {pad} is already consumed")
+                self._consumed.add(pad.name)
+            labels.append(str(pad))
+        return ''.join(labels)
+
+    def chain(
+        self,
+        inputs: Union[Pad, List[Pad]],
+        filters: Union[str, List[str]],
+        kind: Optional[PAD_KIND] = None,
+        outputs: Union[int, List[PAD_KIND]] = 1
+    ) -> Union[Pad, List[Pad]]:
+        """
+        Append a filter chain and return its output pad(s).
+
+        Args:
+            inputs (Pad | List[Pad]): Pads fed to the first filter.
+            filters (str | List[str]): Filters applied in sequence.
+            kind (str, optional): Kind of the output pads. Defaults to the kind of the first input.
+            outputs (int | List[str], optional): Number of output pads of the last filter,
+                or the kind of each one for filters with mixed outputs (concat). Defaults to 1.
+
+        Returns:
+            Pad | List[Pad]: The output pad, or a list when there are several.
+        """
+        inputs = [inputs] if isinstance(inputs, Pad) else list(inputs)
+        filters = [filters] if isinstance(filters, str) else list(filters)
+        kind = kind or inputs[0].kind
+        kinds = [kind] * outputs if isinstance(outputs, int) else list(outputs)
+
+        sources = self._consume(inputs)
+        pads = [self.new_pad(pad_kind) for pad_kind in kinds]
+        self._chains.append(f"{sources}{','.join(filters)}{''.join(str(pad) for pad in pads)}")
+        return pads[0] if len(pads) == 1 else pads
+
+    def build(self) -> str:
+        """
+        Return the `-filter_complex` graph description.
+        """
+        return ';'.join(self._chains)
+
+    def input_args(self) -> List[str]:
+        """
+        Return the input options of every input, in index order.
+        """
+        return [arg for options in self._inputs for arg in options]
+
+    def command(self, maps: List[Pad], output_args: List[str]) -> List[str]:
+        """
+        Return the full ffmpeg argument list for this graph.
+
+        Args:
+            maps (List[Pad]): Pads written to the output, in stream order.
+            output_args (List[str]): Output options, ending with the output path.
+
+        Returns:
+            List[str]: Inputs, filter graph, maps and output options.
+        """
+        cmd = self.input_args()
+        if self._chains:
+            cmd.extend(['-filter_complex', self.build()])
+        for pad in maps:
+            cmd.extend(['-map', pad.map_arg])
+        return cmd + list(output_args)
+
+    def __str__(self) -> str:
+        return self.build()
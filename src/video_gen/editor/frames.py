@@ -0,0 +1,147 @@
+from video_gen.editor.ffmpeg import ffmpeg
+from video_gen.editor.supervisor import SupervisedPopen
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
+import subprocess
+
+# Packed pixel formats that map directly onto a (height, width, channels) array.
+PIX_FMT_CHANNELS = {
+    'gray': 1,
+    'rgb24': 3,
+    'bgr24': 3,
+    'rgba': 4,
+    'bgra': 4,
+}
+
+
+def frame_shape(width: int, height: int, pix_fmt: str) -> Tuple[int, int, int]:
+    """
+    Return the array shape of one frame.
+
+    Raises:
+        ValueError: If `pix_fmt` is not a supported packed 8-bit format.
+    """
+    try:
+        return height, width, PIX_FMT_CHANNELS[pix_fmt]
+    except KeyError:
+        raise ValueError(
+            f"Unsupported pixel format for frames: {pix_fmt} (use one of {', '.join(PIX_FMT_CHANNELS)})"
+        ) from None
+
+
+class FrameReader:
+    """
+    Decodes a video with ffmpeg and yields its frames as NumPy arrays.
+
+    ffmpeg writes raw frames to a pipe, already scaled to the requested size
+    and converted to the requested pixel format, and each frame is read
+    straight into a preallocated ring of `ring` buffers; no memory is
+    allocated per frame. A yielded array is therefore only valid until
+    `ring` more frames have been read: copy it to keep it longer.
+
+    Decoding at a small size is the cheap way to run analysis passes: the
+    scaler runs inside ffmpeg and only the small frames cross the pipe.
+
+    Attributes:
+        file_path (str): The video to decode.
+        width (int): Output frame width.
+        height (int): Output frame height.
+        pix_fmt (str): Output pixel format.
+        fps (float or None): Output frame rate, None for the source's.
+        start (float or None): Start time in seconds (input seek).
+        end (float or None): End time in seconds.
+        frames (int or None): Stop after this many frames.
+        ring (int): Number of reused frame buffers.
+    """
+    def __init__(
+        self,
+        file_path: str,
+        width: int,
+        height: int,
+        pix_fmt: str = 'rgb24',
+        fps: Optional[float] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        frames: Optional[int] = None,
+        ring: int = 2
+    ) -> None:
+        self.file_path = str(file_path)
+        self.width = int(width)
+        self.height = int(height)
+        self.pix_fmt = pix_fmt
+        self.fps = fps
+        self.start = start
+        self.end = end
+        self.frames = frames
+        self.ring = max(1, ring)
+        self.shape = frame_shape(self.width, self.height, pix_fmt)
+
+    def command(self) -> List[str]:
+        """
+        Return the ffmpeg command writing the raw frames to stdout.
+        """
+        cmd = [str(ffmpeg.ffmpeg_path), '-hide_banner', '-loglevel', 'error', '-nostdin']
+
+        # input side seeking: jump to the keyframe before `start`, then decode
+        # only up to the exact frame, instead of decoding from the beginning
+        if self.start:
+            cmd.extend(['-ss', f"{self.start:.3f}"])
+        if self.end is not None:
+            cmd.extend(['-t', f"{self.end - (self.start or 0):.3f}"])
+        cmd.extend(['-i', self.file_path, '-an', '-sn', '-dn'])
+
+        filters = [f"fps={self.fps}"] if self.fps else []
+        filters.append(f"scale={self.width}:{self.height}:flags=area")
+        cmd.extend(['-vf', ','.join(filters), '-pix_fmt', self.pix_fmt])
+
+        if self.frames is not None:
+            cmd.extend(['-frames:v', str(self.frames)])
+        return cmd + ['-f', 'rawvideo', 'pipe:1']
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        buffers = np.empty((self.ring, *self.shape), dtype=np.uint8)
+        views = [memoryview(buffer).cast('B') for buffer in buffers]
+
+        duration = None if self.end is None else self.end - (self.start or 0)
+        process = SupervisedPopen(
+            self.command(), 'iter_frames', duration=duration,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0
+        )
+        try:
+            index = 0
+            while _read_exact(process.stdout, views[index]):
+                yield buffers[index]
+                index = (index + 1) % self.ring
+            stderr = process.stderr.read().decode(errors='replace')
+            process.wait()
+        finally:
+            # consumer stopped early (break, close) or an error: do not leave ffmpeg behind
+            if process.poll() is None:
+                process.kill()
+            # always wait: it ends the deadline, even when poll() already reaped the child
+            process.wait()
+            process.stdout.close()
+            process.stderr.close()
+
+        if process.watch.expired:
+            raise RuntimeError(process.watch.error('ffmpeg'))
+        if process.returncode != 0:
+            raise RuntimeError(f"ffmpeg \nERROR: {stderr.strip() or 'No error message available.'}")
+
+
+def _read_exact(stream, view: memoryview) -> bool:
+    """
+    Fill `view` from `stream`. Returns False at the end of the stream.
+
+    Raises:
+        RuntimeError: If the stream ends in the middle of a frame.
+    """
+    filled = 0
+    while filled < len(view):
+        count = stream.readinto(view[filled:])
+        if not count:
+            if filled == 0:
+                return False
+            raise RuntimeError(f"Truncated frame: got {filled} of {len(view)} bytes")
+        filled += count
+    return True
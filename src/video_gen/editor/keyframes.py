@@ -0,0 +1,123 @@
+from video_gen.editor.cache import FileCache
+from video_gen.editor.ffmpeg import ffmpeg
+from video_gen.utils import assets
+from typing import Dict, List, Optional
+import bisect
+import os
+
+# Stored next to the metadata cache (media_info.json) and validated the same
+# way, so an asset is only indexed again after it changes.
+keyframe_cache = FileCache(os.path.join(assets.cache_path, "keyframes.json"), max_entries=256)
+
+
+class KeyframeIndex:
+    """
+    The keyframes of a video's first video stream.
+
+    Stream copy can only start a cut at a keyframe; the index tells where
+    those are without decoding anything.
+
+    Attributes:
+        times (List[float]): Presentation time of every keyframe in seconds, ascending.
+        positions (List[int]): Byte offset of every keyframe packet (-1 if unknown).
+    """
+    __slots__ = ('times', 'positions')
+
+    def __init__(self, times: List[float], positions: List[int]) -> None:
+        self.times = times
+        self.positions = positions
+
+    def before(self, t: float) -> Optional[float]:
+        """
+        Return the last keyframe at or before `t`, None if there is none.
+        """
+        i = bisect.bisect_right(self.times, t + 1e-6)
+        return self.times[i - 1] if i else None
+
+    def after(self, t: float) -> Optional[float]:
+        """
+        Return the first keyframe at or after `t`, None if there is none.
+        """
+        i = bisect.bisect_left(self.times, t - 1e-6)
+        return self.times[i] if i < len(self.times) else None
+
+    def to_dict(self) -> Dict[str, List]:
+        return {'times': self.times, 'positions': self.positions}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, List]) -> 'KeyframeIndex':
+        return cls(data['times'], data['positions'])
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __repr__(self) -> str:
+        return f"KeyframeIndex(keyframes={len(self.times)})"
+
+
+def probe_keyframes(file_path: str) -> KeyframeIndex:
+    """
+    List the keyframes of a video with ffprobe.
+
+    Only packet headers are read (`-show_packets`), nothing is decoded, so
+    this costs about as much as reading the file once.
+
+    Args:
+        file_path (str): The video.
+
+    Returns:
+        KeyframeIndex: The video's keyframes.
+    """
+    result = ffmpeg.run('ffprobe', [
+        '-v', 'error',
+        '-select_streams', 'v:0',
+        '-show_entries', 'packet=pts_time,pos,flags',
+        '-of', 'compact=p=0',
+        str(file_path)
+    ])
+
+    keyframes = []
+    for line in result.stdout.splitlines():
+        fields = dict(field.split('=', 1) for field in line.split('|') if '=' in field)
+        if 'K' not in fields.get('flags', ''):
+            continue
+        try:
+            pts = float(fields['pts_time'])
+        except (KeyError, ValueError):  # "N/A"
+            continue
+        position = fields.get('pos', '')
+        keyframes.append((pts, int(position) if position.isdigit() else -1))
+
+    # packets are in decode order; keyframes are in presentation order anyway
+    keyframes.sort()
+    return KeyframeIndex([pts for pts, _ in keyframes], [position for _, position in keyframes])
+
+
+def get_keyframes(file_path: str, use_cache: bool = True) -> KeyframeIndex:
+    """
+    Return the keyframe index of a video, probing it only once per version
+    of the file.
+
+    Args:
+        file_path (str): The video.
+        use_cache (bool, optional): Look up / store the index in the keyframe cache.
+            Defaults to True.
+
+    Returns:
+        KeyframeIndex: The video's keyframes.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    file_path = str(file_path)
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"Media file not found: {file_path}")
+
+    data = keyframe_cache.get(file_path) if use_cache else None
+    if data is not None:
+        return KeyframeIndex.from_dict(data)
+
+    index = probe_keyframes(file_path)
+    if use_cache:
+        keyframe_cache.put(file_path, index.to_dict())
+    return index
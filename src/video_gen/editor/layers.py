@@ -0,0 +1,183 @@
+from video_gen.editor.cache import file_signature, prune_directory
+from video_gen.utils import assets
+from typing import List, Optional, Sequence, Tuple
+from PIL import Image
+import threading
+import hashlib
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+layer_cache_path = os.path.join(assets.cache_path, "layers")
+
+# Every edit of a layer image, scale or combination makes a new entry; the
+# least recently used files are removed once the cache grows past this size.
+LAYER_CACHE_MAX_BYTES = 256 * 2**20
+
+
+class StaticLayer:
+    """
+    An image drawn unchanged over every frame of a video (watermark, logo...).
+
+    Attributes:
+        file_path (str): The image.
+        scale (float): Scale factor applied to the image.
+        position (Tuple[int, int]): Top left corner on the output canvas.
+    """
+    __slots__ = ('file_path', 'scale', 'position')
+
+    def __init__(self, file_path: str, scale: float = 1.0, position: Tuple[int, int] = (0, 0)) -> None:
+        self.file_path = str(file_path)
+        self.scale = scale
+        self.position = (int(position[0]), int(position[1]))
+
+    def fingerprint(self) -> Optional[str]:
+        """
+        Return the cache key of the scaled image: the file's path and signature
+        plus the scale. None if the file cannot be stat()ed.
+        """
+        path = os.path.abspath(self.file_path)
+        signature = file_signature(path)
+        if signature is None:
+            return None
+        return f"{path}|{signature}|{self.scale}"
+
+    def __repr__(self) -> str:
+        return f"StaticLayer(file_path={self.file_path}, scale={self.scale}, position={self.position})"
+
+
+def _cache_file(key: str) -> str:
+    return os.path.join(layer_cache_path, f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.png")
+
+
+def _save(image: Image.Image, cache_file: str) -> None:
+    """
+    Write a PNG into the layer cache; the rename makes it appear complete to
+    concurrent readers. Old entries are pruned afterwards.
+    """
+    os.makedirs(layer_cache_path, exist_ok=True)
+    temp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        image.save(temp_file, format="PNG")
+        os.replace(temp_file, cache_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+    prune_layer_cache(keep=cache_file)
+
+
+def _cached(cache_file: str) -> bool:
+    """True if `cache_file` is in the cache; it is then marked as recently used."""
+    try:
+        os.utime(cache_file)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def prune_layer_cache(max_bytes: int = LAYER_CACHE_MAX_BYTES, keep: Optional[str] = None) -> None:
+    """
+    Remove the least recently used layer images until the cache fits `max_bytes`.
+
+    Args:
+        max_bytes (int, optional): Size budget. Defaults to LAYER_CACHE_MAX_BYTES.
+        keep (str, optional): A file never to remove (the one just written).
+    """
+    prune_directory(layer_cache_path, '.png', max_bytes, keep)
+
+
+def _scaled(layer: StaticLayer) -> Image.Image:
+    """Open a layer's image as RGBA, scaled by its factor."""
+    with Image.open(layer.file_path) as image:
+        image = image.convert("RGBA")
+    if layer.scale != 1:
+        size = (max(1, round(image.width * layer.scale)), max(1, round(image.height * layer.scale)))
+        image = image.resize(size, Image.LANCZOS)
+    return image
+
+
+def prepare_layer(layer: StaticLayer) -> str:
+    """
+    Return the path of a layer's image, scaled and ready to overlay as it is.
+
+    The scaled image is made once per (image, scale) and kept in the layer
+    cache, so the render only decodes a small PNG instead of scaling the
+    original in its filter graph every time. Entries of edited images are
+    never used again and age out (see `prune_layer_cache`).
+
+    Raises:
+        FileNotFoundError: If the image does not exist.
+    """
+    key = layer.fingerprint()
+    if key is None:
+        raise FileNotFoundError(f"Layer image not found: {layer.file_path}")
+
+    cache_file = _cache_file(key)
+    if _cached(cache_file):
+        return cache_file
+    _save(_scaled(layer), cache_file)
+    return cache_file
+
+
+def bake_layers(layers: Sequence[StaticLayer]) -> Tuple[str, Tuple[int, int]]:
+    """
+    Merge static layers into a single ready-to-overlay image.
+
+    The layers are scaled and drawn in order onto a transparent canvas
+    covering all of them, so the render composites one input instead of one
+    per layer. The result is cached by the layers' images, scales and positions.
+
+    Args:
+        layers (Sequence[StaticLayer]): Layers, bottom first.
+
+    Returns:
+        Tuple[str, Tuple[int, int]]: The image, and where to draw it on the output.
+
+    Raises:
+        ValueError: If there are no layers.
+        FileNotFoundError: If a layer image does not exist.
+    """
+    if not layers:
+        raise ValueError("No static layers to bake")
+    if len(layers) == 1:
+        return prepare_layer(layers[0]), layers[0].position
+
+    keys = []
+    for layer in layers:
+        key = layer.fingerprint()
+        if key is None:
+            raise FileNotFoundError(f"Layer image not found: {layer.file_path}")
+        keys.append(f"{key}|{layer.position}")
+
+    left = min(layer.position[0] for layer in layers)
+    top = min(layer.position[1] for layer in layers)
+    cache_file = _cache_file("\n".join(keys))
+    if _cached(cache_file):
+        return cache_file, (left, top)
+
+    images = []
+    for layer in layers:
+        with Image.open(prepare_layer(layer)) as image:
+            images.append((image.convert("RGBA"), layer.position))
+    right = max(x + image.width for image, (x, _) in images)
+    bottom = max(y + image.height for image, (_, y) in images)
+
+    canvas = Image.new("RGBA", (right - left, bottom - top), (0, 0, 0, 0))
+    for image, (x, y) in images:
+        canvas.alpha_composite(image, (x - left, y - top))
+    _save(canvas, cache_file)
+    return cache_file, (left, top)
+
+
+def static_layers(
+    watermark: Optional[str] = None,
+    image_scale: float = 0.7,
+    layers: Optional[Sequence[StaticLayer]] = None
+) -> List[StaticLayer]:
+    """
+    Return the static layers of a render: the watermark (at the top left
+    corner, scaled by `image_scale`) under any extra `layers`.
+    """
+    result = [StaticLayer(watermark, image_scale)] if watermark else []
+    return result + list(layers or [])
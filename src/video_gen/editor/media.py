@@ -1,20 +1,129 @@
 from __future__ import annotations
 from video_gen.utils import Media
 from video_gen.editor.ffmpeg import get_MediaInfo
-from typing import Dict
+from video_gen.editor.frames import FrameReader
+from video_gen.editor.pcm import load_pcm
+from typing import Dict, Any, Tuple, Iterator, Optional
+import numpy as np
+import os
 
+# Still image files: ffprobe reports them as a one frame "video" stream
+# (demuxer image2 or <codec>_pipe).
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tif', '.tiff')
+IMAGE_CODECS = ('mjpeg', 'png', 'webp', 'bmp', 'tiff')
 
-class Video(Media):
+
+class LazyMedia(Media):
+    """
+    Base class for media descriptors that probe their file lazily.
+
+    Metadata fields listed in `_FIELDS` are stored in slots and filled on the
+    first access of a field that is not yet known, with a single call to
+    get_MediaInfo. Stages that already know what they wrote (codec, size, fps,
+    duration...) can pass it as keyword arguments, so the file is only probed
+    when something else is asked for - most intermediates are never probed.
+
+    Attributes:
+        file_path (str): The path to the media file.
+    """
+    __slots__ = ('file_path', '_loaded')
+    _FIELDS: Tuple[str, ...] = ()
+
+    def __init__(self, file_path: str, **metadata: Any) -> None:
+        """
+        Args:
+            file_path (str): The path to the media file.
+            **metadata: Known values for any of the `_FIELDS`; None values are ignored.
+
+        Raises:
+            TypeError: If an unknown metadata field is given.
+        """
+        self.file_path = file_path
+        self._loaded = False
+
+        for name, value in metadata.items():
+            if name not in self._FIELDS:
+                raise TypeError(f"{type(self).__name__} got an unknown metadata field: {name!r}")
+            if value is not None:
+                setattr(self, name, value)
+
+    def __getattr__(self, name: str) -> Any:
+        """
+        Called only for attributes that are not set yet: probe the file once
+        when a metadata field is requested.
+        """
+        if name in type(self)._FIELDS and not self._loaded:
+            self._load_info()
+            self._loaded = True
+            return getattr(self, name)
+
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def _load_info(self) -> None:
+        """
+        Load metadata from the file; implemented by child classes.
+        """
+        raise NotImplementedError("Child classes should implement this method.")
+
+    def _fill(self, values: Dict[str, Any]) -> None:
+        """
+        Set probed values for fields that are not already known.
+        """
+        for name, value in values.items():
+            if self.peek(name) is None:
+                setattr(self, name, value)
+
+    def peek(self, name: str, default: Any = None) -> Any:
+        """
+        Return a metadata value if it is already known, without probing the file.
+
+        Args:
+            name (str): Field name.
+            default (Any, optional): Value returned when the field is unknown.
+        """
+        try:
+            return object.__getattribute__(self, name)
+        except AttributeError:
+            return default
+
+    @property
+    def loaded(self) -> bool:
+        """True once the file has been probed."""
+        return self._loaded
+
+    @property
+    def known_metadata(self) -> Dict[str, Any]:
+        """
+        Return every metadata field known so far, without probing the file.
+        """
+        return {
+            name: self.peek(name)
+            for name in self._FIELDS if self.peek(name) is not None
+        }
+
+    def __str__(self) -> str:
+        """
+        Return the file path of the media.
+        """
+        return str(self.file_path)
+
+
+class Video(LazyMedia):
     """
     A class to represent a video file and its metadata.
 
     This class extracts video-related metadata from a media file using ffprobe.
+    The file is probed lazily, on first access of a metadata attribute, and any
+    metadata already known by the caller can be passed to the constructor.
     It provides methods to access detailed properties such as resolution, frame rate,
     codec information, duration, and more. An associated audio track can also be linked.
 
     Attributes:
         file_path (str): The path to the video file.
         audio (Audio or None): An optional Audio object linked to the video.
+        position (Tuple[int, int] or None): Where the video is drawn on the output
+            canvas, for clips covering only part of it (e.g. a subtitle's bounding box).
+            None for a full-frame video.
         format (str): The container format of the video.
         size (int): The file size of the video.
         creation_time (str): The creation time of the video file.
@@ -31,26 +140,43 @@ class Video(Media):
         time_base (str): The time base of the video stream.
 
     Methods:
-        _load_video_info(): Loads video-specific metadata from the file.
+        _load_info(): Loads video-specific metadata from the file.
         link_audio(audio_obj): Links an Audio object to the video.
         summary(): Returns a formatted summary of the video details.
+        iter_frames(size, pix_fmt, fps, start, end): Iterates over decoded frames as arrays.
+        frame_at(t, size, pix_fmt): Returns the frame shown at time t.
+        isimage(): Returns True if the file is a still image.
         __repr__(): Returns a concise string representation of the video.
         __str__(): Returns the video file path.
         __len__(): Returns the duration of the video in timestamp units.
     """
     
-    def __init__(self, file_path: str) -> None:
+    __slots__ = (
+        'audio', 'position', 'format', 'size', 'creation_time', 'index', 'width', 'height',
+        'fps', 'bitrate', 'duration', 'duration_ts', 'codec', 'nb_frames',
+        'pix_fmt', 'time_base'
+    )
+    _FIELDS = (
+        'format', 'size', 'creation_time', 'index', 'width', 'height',
+        'fps', 'bitrate', 'duration', 'duration_ts', 'codec', 'nb_frames',
+        'pix_fmt', 'time_base'
+    )
+
+    def __init__(self, file_path: str, position: Optional[Tuple[int, int]] = None, **metadata: Any) -> None:
         """
-        Initialize a Video object by loading media information from the given file path.
+        Initialize a Video object for the given file path; the file is not probed yet.
 
         Args:
             file_path (str): The path to the video file.
+            position (Tuple[int, int], optional): Top left corner on the output canvas,
+                for a clip smaller than the output. Defaults to None (full frame).
+            **metadata: Already known metadata (e.g. width, height, fps, codec, duration).
         """
-        self.file_path = file_path
+        super().__init__(file_path, **metadata)
         self.audio = None
-        self._load_video_info()
+        self.position = position
 
-    def _load_video_info(self) -> None:
+    def _load_info(self) -> None:
         """
         Load video-specific metadata from the file using get_MediaInfo.
 
@@ -58,9 +184,6 @@ class Video(Media):
             ValueError: If no video stream is found in the media file.
         """
         media_info = get_MediaInfo(self.file_path)
-        self.format = media_info.format
-        self.size = media_info.size
-        self.creation_time = media_info.creation_time
 
         if not media_info.VIDEO:
             raise ValueError("No video stream found in file")
@@ -72,17 +195,22 @@ class Video(Media):
         if video_stream is None:
             raise ValueError("No video stream found in file")
             
-        self.index = video_stream['index']
-        self.width = video_stream['width']
-        self.height = video_stream['height']
-        self.fps = video_stream['r_frame_rate']
-        self.bitrate = video_stream['bit_rate']
-        self.duration = video_stream['duration']
-        self.duration_ts = video_stream['duration_ts']
-        self.codec = video_stream['codec_name']
-        self.nb_frames = video_stream['nb_frames']
-        self.pix_fmt = video_stream['pix_fmt']
-        self.time_base = video_stream['time_base']
+        self._fill({
+            'format': media_info.format,
+            'size': media_info.size,
+            'creation_time': media_info.creation_time,
+            'index': video_stream['index'],
+            'width': video_stream['width'],
+            'height': video_stream['height'],
+            'fps': video_stream['r_frame_rate'],
+            'bitrate': video_stream['bit_rate'],
+            'duration': video_stream['duration'],
+            'duration_ts': video_stream['duration_ts'],
+            'codec': video_stream['codec_name'],
+            'nb_frames': video_stream['nb_frames'],
+            'pix_fmt': video_stream['pix_fmt'],
+            'time_base': video_stream['time_base'],
+        })
 
     def link_audio(self, audio_obj: 'Audio') -> None:
         """
@@ -123,8 +251,98 @@ class Video(Media):
         summary_lines = [f"{key}: {value}" for key, value in details.items()]
         return "\n".join(summary_lines)
     
-    def isimage(self):
-        return True
+    def _frame_size(self, size: Optional[Tuple[int, int]]) -> Tuple[int, int]:
+        """
+        Resolve a requested (width, height); None keeps the video's size and a
+        None (or -1) side is computed from the other one to keep the aspect ratio.
+        """
+        width, height = size or (None, None)
+        width = None if width in (None, -1) else int(width)
+        height = None if height in (None, -1) else int(height)
+
+        if width is None and height is None:
+            return int(self.width), int(self.height)
+        if width is None:
+            width = max(1, round(self.width * height / self.height))
+        if height is None:
+            height = max(1, round(self.height * width / self.width))
+        return width, height
+
+    def iter_frames(
+        self,
+        size: Optional[Tuple[int, int]] = None,
+        pix_fmt: str = 'rgb24',
+        fps: Optional[float] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        ring: int = 2
+    ) -> Iterator[np.ndarray]:
+        """
+        Iterate over the decoded frames of the video.
+
+        Frames are decoded by ffmpeg (scaled and converted there) and read into
+        a ring of `ring` reused buffers, so a yielded array is overwritten after
+        `ring` more frames; copy it to keep it.
+
+        Args:
+            size (Tuple[int, int], optional): Output (width, height); use None for
+                one side to keep the aspect ratio. A small size makes analysis
+                passes cheap. Defaults to the video's size.
+            pix_fmt (str, optional): "rgb24", "bgr24", "rgba", "bgra" or "gray". Defaults to 'rgb24'.
+            fps (float, optional): Resample to this frame rate. Defaults to the video's.
+            start (float, optional): First second to decode (seeked, not decoded through).
+            end (float, optional): Second to stop at. Defaults to the end of the video.
+            ring (int, optional): Number of reused buffers. Defaults to 2.
+
+        Yields:
+            np.ndarray: One (height, width, channels) uint8 frame.
+        """
+        width, height = self._frame_size(size)
+        return iter(FrameReader(self.file_path, width, height, pix_fmt, fps, start, end, ring=ring))
+
+    def frame_at(
+        self,
+        t: float,
+        size: Optional[Tuple[int, int]] = None,
+        pix_fmt: str = 'rgb24'
+    ) -> np.ndarray:
+        """
+        Return the frame shown at `t` seconds.
+
+        ffmpeg seeks to the keyframe before `t` and decodes from there to the
+        exact frame, so the cost does not grow with `t`.
+
+        Args:
+            t (float): Time in seconds.
+            size (Tuple[int, int], optional): Output (width, height), see `iter_frames`.
+            pix_fmt (str, optional): Output pixel format. Defaults to 'rgb24'.
+
+        Returns:
+            np.ndarray: A (height, width, channels) uint8 frame owned by the caller.
+
+        Raises:
+            ValueError: If there is no frame at `t` (e.g. past the end).
+        """
+        width, height = self._frame_size(size)
+        reader = FrameReader(self.file_path, width, height, pix_fmt, start=t, frames=1, ring=1)
+        for frame in reader:
+            return frame.copy()
+        raise ValueError(f"No frame at {t}s in {self.file_path}")
+
+    def isimage(self) -> bool:
+        """
+        Return True if the file is a still image rather than a video.
+
+        Known image extensions are answered without probing the file; anything
+        else is an image when ffprobe read it with an image demuxer.
+
+        Returns:
+            bool: True for a still image.
+        """
+        if os.path.splitext(str(self.file_path))[1].lower() in IMAGE_EXTENSIONS:
+            return True
+        format_name = str(self.format or '')
+        return self.codec in IMAGE_CODECS and (format_name == 'image2' or format_name.endswith('_pipe'))
 
     def __repr__(self) -> str:
         """
@@ -138,15 +356,6 @@ class Video(Media):
             f"({self.codec}), Format: {self.format}, File Size: {self.size}"
         )
 
-    def __str__(self) -> str:
-        """
-        Return the file path of the video.
-
-        Returns:
-            str: The video file path.
-        """
-        return str(self.file_path)
-
     def __len__(self) -> int:
         """
         Return the duration of the video in timestamp units.
@@ -157,11 +366,12 @@ class Video(Media):
         return self.duration_ts
 
 
-class Audio(Media):
+class Audio(LazyMedia):
     """
     A class to represent an audio file and its metadata.
 
     This class extracts audio-related metadata from a media file using ffprobe.
+    Like Video, the file is probed lazily and known metadata can be passed in.
     It provides methods to access details such as codec, sample rate, bitrate, and duration.
     The metadata is useful for audio analysis and processing.
 
@@ -183,24 +393,37 @@ class Audio(Media):
         nb_frames (int): The total number of frames in the audio.
     
     Methods:
-        _load_audio_info(): Loads audio-specific metadata from the file.
+        _load_info(): Loads audio-specific metadata from the file.
         summary(): Returns a formatted summary of the audio details.
+        samples(sample_rate, channels): Returns the decoded samples as a memory-mapped array.
         __repr__(): Returns a concise string representation of the audio.
         __str__(): Returns the audio file path.
         __len__(): Returns the duration of the audio in timestamp units.
     """
-    def __init__(self, file_path: str) -> None:
+    __slots__ = (
+        'metadata', 'linked_video', 'format', 'size', 'creation_time', 'index',
+        'codec', 'sample_rate', 'bits_per_sample', 'fps', 'time_base',
+        'duration', 'duration_ts', 'bitrate', 'nb_frames'
+    )
+    _FIELDS = (
+        'format', 'size', 'creation_time', 'index', 'codec', 'sample_rate',
+        'bits_per_sample', 'fps', 'time_base', 'duration', 'duration_ts',
+        'bitrate', 'nb_frames'
+    )
+
+    def __init__(self, file_path: str, **metadata: Any) -> None:
         """
-        Initialize an Audio object by loading media information from the given file path.
+        Initialize an Audio object for the given file path; the file is not probed yet.
 
         Args:
             file_path (str): The path to the audio file.
+            **metadata: Already known metadata (e.g. codec, sample_rate, duration).
         """
-        self.file_path = file_path
+        super().__init__(file_path, **metadata)
         self.metadata: Dict[str, str] = {}
-        self._load_audio_info()
+        self.linked_video = None
 
-    def _load_audio_info(self) -> None:
+    def _load_info(self) -> None:
         """
         Load audio-specific metadata from the file using get_MediaInfo.
 
@@ -208,9 +431,6 @@ class Audio(Media):
             ValueError: If no audio stream is found in the media file.
         """
         media_info = get_MediaInfo(self.file_path)
-        self.format = media_info.format
-        self.size = media_info.size
-        self.creation_time = media_info.creation_time
 
         if not media_info.AUDIO:
             raise ValueError("No audio stream found in file")
@@ -222,17 +442,22 @@ class Audio(Media):
         if audio_stream is None:
             raise ValueError("No audio stream found in file")
 
-        self.index = audio_stream['index']
-        self.codec = audio_stream['codec_name']
-        self.sample_rate = audio_stream['sample_rate']
-        # bits_per_sample might not always be available so we use .get()
-        self.bits_per_sample = audio_stream.get('bits_per_sample', None)
-        self.fps = audio_stream['r_frame_rate']
-        self.time_base = audio_stream['time_base']
-        self.duration = audio_stream['duration']
-        self.duration_ts = audio_stream['duration_ts']
-        self.bitrate = audio_stream['bit_rate']
-        self.nb_frames = audio_stream['nb_frames']
+        self._fill({
+            'format': media_info.format,
+            'size': media_info.size,
+            'creation_time': media_info.creation_time,
+            'index': audio_stream['index'],
+            'codec': audio_stream['codec_name'],
+            'sample_rate': audio_stream['sample_rate'],
+            # bits_per_sample might not always be available so we use .get()
+            'bits_per_sample': audio_stream.get('bits_per_sample', None),
+            'fps': audio_stream['r_frame_rate'],
+            'time_base': audio_stream['time_base'],
+            'duration': audio_stream['duration'],
+            'duration_ts': audio_stream['duration_ts'],
+            'bitrate': audio_stream['bit_rate'],
+            'nb_frames': audio_stream['nb_frames'],
+        })
 
     @property
     def summary(self) -> str:
@@ -261,6 +486,23 @@ class Audio(Media):
         summary_lines = [f"{key}: {value}" for key, value in details.items()]
         return "\n".join(summary_lines)
 
+    def samples(self, sample_rate: int = 48000, channels: int = 2) -> np.memmap:
+        """
+        Return the decoded samples of the audio.
+
+        The file is decoded once into the PCM cache (keyed by its fingerprint)
+        and memory-mapped from there, so alignment, loudness analysis and
+        mixing can work on the samples without decoding the file again.
+
+        Args:
+            sample_rate (int, optional): Output sample rate. Defaults to 48000.
+            channels (int, optional): Output channel count. Defaults to 2.
+
+        Returns:
+            np.memmap: Read-only float32 samples, shape (frames, channels).
+        """
+        return load_pcm(self.file_path, sample_rate, channels)
+
     def __repr__(self) -> str:
         """
         Return a concise representation of the audio information.
@@ -274,15 +516,6 @@ class Audio(Media):
             f"Format: {self.format}, File Size: {self.size}"
         )
 
-    def __str__(self) -> str:
-        """
-        Return the file path of the audio.
-
-        Returns:
-            str: The audio file path.
-        """
-        return str(self.file_path)
-
     def __len__(self) -> int:
         """
         Return the duration of the audio in timestamp units.
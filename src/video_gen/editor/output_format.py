@@ -0,0 +1,142 @@
+from fractions import Fraction
+from typing import Any, Dict, List, Optional, Union
+
+DEFAULT_WIDTH = 720
+DEFAULT_HEIGHT = 1280
+DEFAULT_FPS = 24
+DEFAULT_PIX_FMT = 'yuv420p'
+
+# Pixel formats carrying an alpha channel (prefixes and exact names as ffmpeg reports them).
+ALPHA_PIX_FMTS = ('yuva', 'rgba', 'bgra', 'argb', 'abgr', 'ya8', 'ya16', 'gbrap')
+
+
+def has_alpha(pix_fmt: Optional[str]) -> bool:
+    """True if `pix_fmt` has an alpha channel."""
+    return bool(pix_fmt) and str(pix_fmt).startswith(ALPHA_PIX_FMTS)
+
+
+# NTSC rates, which probes and job files often give rounded ("29.97", 23.976...)
+NTSC_RATES = tuple(Fraction(rate * 1000, 1001) for rate in (24, 30, 48, 60, 120))
+# MediaInfo rounds probed rates to 2 decimals (24000/1001 -> 23.98), up to 0.005 off
+NTSC_TOLERANCE = Fraction(1, 200)
+
+
+def frame_rate_of(value: Any) -> Optional[Fraction]:
+    """
+    Return a frame rate ("30000/1001", "24", 24, 29.97...) as a Fraction,
+    None if it is missing or not a rate (e.g. "0/0" for a still image).
+
+    A value within 0.005 of an NTSC rate is taken as that rate, so "23.98"
+    and 23.976 both give 24000/1001; other values are kept as they are
+    (a float as the nearest fraction with a denominator up to 1001).
+    """
+    try:
+        rate = Fraction(str(value)).limit_denominator(1001)
+    except (ValueError, ZeroDivisionError):
+        return None
+    if rate <= 0:
+        return None
+    for ntsc in NTSC_RATES:
+        if abs(rate - ntsc) <= NTSC_TOLERANCE:
+            return ntsc
+    return rate
+
+
+class OutputFormat:
+    """
+    The frame format of a job's output: size, frame rate and pixel format.
+
+    One descriptor is built per job and handed to every stage, so a source
+    is resampled, scaled and converted once, where it enters the timeline,
+    and later filter chains leave out the `fps`/`scale`/`format` nodes a
+    stream already in the format does not need.
+
+    Attributes:
+        width (int): Frame width.
+        height (int): Frame height.
+        fps (Fraction): Frame rate.
+        pix_fmt (str): Pixel format of the opaque video.
+    """
+    __slots__ = ('width', 'height', 'fps', 'pix_fmt')
+
+    def __init__(
+        self,
+        width: int = DEFAULT_WIDTH,
+        height: int = DEFAULT_HEIGHT,
+        fps: Union[int, float, str, Fraction] = DEFAULT_FPS,
+        pix_fmt: str = DEFAULT_PIX_FMT
+    ) -> None:
+        """
+        Raises:
+            ValueError: If `fps` is not a positive frame rate.
+        """
+        rate = frame_rate_of(fps)
+        if rate is None:
+            raise ValueError(f"Invalid frame rate: {fps}")
+        self.width = int(width)
+        self.height = int(height)
+        self.fps = rate
+        self.pix_fmt = pix_fmt
+
+    @property
+    def frame_rate(self) -> str:
+        """The frame rate as ffmpeg options take it ("24", "30000/1001")."""
+        return str(self.fps)
+
+    def same_size(self, video) -> bool:
+        """
+        True if `video` is known to have the frame size. Only metadata the
+        Video already holds is used (see `Video.peek`): a clip streamed
+        through a FIFO must not be probed.
+        """
+        width, height = video.peek('width'), video.peek('height')
+        return width is not None and height is not None and (int(width), int(height)) == (self.width, self.height)
+
+    def same_rate(self, video) -> bool:
+        """True if `video` is known to have the frame rate (see `same_size`)."""
+        return frame_rate_of(video.peek('fps')) == self.fps
+
+    def matches(self, video) -> bool:
+        """True if `video` is known to need no scaling, resampling or pixel format conversion."""
+        return self.same_size(video) and self.same_rate(video) and video.peek('pix_fmt') == self.pix_fmt
+
+    def conform_filters(self, video=None) -> List[str]:
+        """
+        The `scale` and `fps` filters bringing `video` to the frame size and
+        rate, without the ones it is known not to need (all of them when
+        `video` is None or its metadata is unknown).
+        """
+        filters = []
+        if video is None or not self.same_size(video):
+            filters.append(f"scale={self.width}x{self.height}")
+        if video is None or not self.same_rate(video):
+            filters.append(f"fps={self.frame_rate}")
+        return filters
+
+    @classmethod
+    def from_task(cls, info: Dict) -> 'OutputFormat':
+        """
+        The format of a job from its video settings ("width", "height",
+        "frame", "pix_fmt"). "fps" is accepted for "frame".
+        """
+        return cls(
+            info.get('width', DEFAULT_WIDTH),
+            info.get('height', DEFAULT_HEIGHT),
+            info.get('frame', info.get('fps', DEFAULT_FPS)),
+            info.get('pix_fmt', DEFAULT_PIX_FMT)
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, OutputFormat):
+            return NotImplemented
+        return (self.width, self.height, self.fps, self.pix_fmt) == (other.width, other.height, other.fps, other.pix_fmt)
+
+    def __hash__(self) -> int:
+        return hash((self.width, self.height, self.fps, self.pix_fmt))
+
+    def __repr__(self) -> str:
+        return f"OutputFormat({self.width}x{self.height}, fps={self.frame_rate}, pix_fmt={self.pix_fmt})"
+
+
+# the format of a job that does not specify one
+DEFAULT_FORMAT = OutputFormat()
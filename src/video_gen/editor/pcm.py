@@ -0,0 +1,97 @@
+from video_gen.editor.cache import file_signature, prune_directory
+from video_gen.editor.ffmpeg import ffmpeg
+from video_gen.utils import assets
+from typing import Optional
+import numpy as np
+import threading
+import hashlib
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+pcm_cache_path = os.path.join(assets.cache_path, "pcm")
+
+# Decoded PCM is large (~23 MB per minute of 48 kHz stereo), so the cache is
+# capped at this size (see `prune_pcm_cache`).
+PCM_CACHE_MAX_BYTES = 2 * 2**30
+
+
+def pcm_fingerprint(file_path: str, sample_rate: int, channels: int) -> Optional[str]:
+    """
+    Return the cache key of a decode: the file's path and signature (size,
+    mtime, inode) plus the output format. None if the file cannot be stat()ed.
+    """
+    path = os.path.abspath(file_path)
+    signature = file_signature(path)
+    if signature is None:
+        return None
+    key = f"{path}|{signature}|{sample_rate}|{channels}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def load_pcm(file_path: str, sample_rate: int = 48000, channels: int = 2) -> np.memmap:
+    """
+    Return the samples of an audio file as a read-only, memory-mapped array.
+
+    The file is decoded by ffmpeg once into a raw float32 file in the PCM
+    cache; later calls (from any stage or process) map that file instead of
+    decoding again. Because every array shares one sample rate and channel
+    layout, arrays of different sources can be mixed directly.
+
+    Args:
+        file_path (str): Any file with an audio stream.
+        sample_rate (int, optional): Output sample rate. Defaults to 48000.
+        channels (int, optional): Output channel count. Defaults to 2.
+
+    Returns:
+        np.memmap: float32 samples in [-1, 1], shape (frames, channels).
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        RuntimeError: If ffmpeg fails to decode it.
+    """
+    fingerprint = pcm_fingerprint(file_path, sample_rate, channels)
+    if fingerprint is None:
+        raise FileNotFoundError(f"Audio file not found: {file_path}")
+
+    cache_file = os.path.join(pcm_cache_path, f"{fingerprint}.f32")
+    if os.path.exists(cache_file):
+        os.utime(cache_file)  # mark as recently used
+    else:
+        _decode(file_path, cache_file, sample_rate, channels)
+
+    frames = os.path.getsize(cache_file) // (4 * channels)
+    if frames == 0:
+        return np.zeros((0, channels), dtype=np.float32)
+    return np.memmap(cache_file, dtype=np.float32, mode='r', shape=(frames, channels))
+
+
+def _decode(file_path: str, cache_file: str, sample_rate: int, channels: int) -> None:
+    """
+    Decode to raw float32 PCM next to `cache_file`, then move it into place.
+    """
+    os.makedirs(pcm_cache_path, exist_ok=True)
+    temp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        ffmpeg.run('ffmpeg', [
+            '-i', str(file_path), '-vn',
+            '-c:a', 'pcm_f32le', '-ar', str(sample_rate), '-ac', str(channels),
+            '-f', 'f32le', '-y', temp_file
+        ], label='load_pcm')
+        os.replace(temp_file, cache_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+    prune_pcm_cache(keep=cache_file)
+
+
+def prune_pcm_cache(max_bytes: int = PCM_CACHE_MAX_BYTES, keep: Optional[str] = None) -> None:
+    """
+    Remove the least recently used PCM files until the cache fits `max_bytes`.
+
+    Args:
+        max_bytes (int, optional): Size budget. Defaults to PCM_CACHE_MAX_BYTES.
+        keep (str, optional): A file never to remove (the one just decoded).
+    """
+    prune_directory(pcm_cache_path, '.f32', max_bytes, keep)
@@ -0,0 +1,241 @@
+from video_gen.editor.capabilities import Capabilities, get_capabilities
+from typing import Dict, List, Optional, Iterator, Literal
+from contextlib import contextmanager
+from video_gen.editor.output_format import frame_rate_of
+from video_gen.settings import setting
+import threading
+import os
+
+STAGES = Literal['intermediate', 'final', 'preview']
+
+
+class EncodeProfile:
+    """
+    Video encoder settings for one kind of stage.
+
+    Attributes:
+        name (str): Profile name.
+        codec (str): ffmpeg encoder name.
+        stream_codec (str): Codec name of the encoded stream, as ffprobe reports it.
+        preset (str or None): Encoder preset (only for encoders that have one).
+        crf (int or None): Constant rate factor (only for encoders that have one).
+        pix_fmt (str): Output pixel format.
+        extra (List[str]): Additional output options.
+    """
+    __slots__ = ('name', 'codec', 'stream_codec', 'preset', 'crf', 'pix_fmt', 'extra')
+
+    def __init__(
+        self,
+        name: str,
+        codec: str,
+        pix_fmt: str,
+        preset: Optional[str] = None,
+        crf: Optional[int] = None,
+        extra: Optional[List[str]] = None,
+        stream_codec: Optional[str] = None
+    ) -> None:
+        self.name = name
+        self.codec = codec
+        self.stream_codec = stream_codec or codec
+        self.pix_fmt = pix_fmt
+        self.preset = preset
+        self.crf = crf
+        self.extra = extra or []
+
+    def video_args(self) -> List[str]:
+        """
+        Return the ffmpeg output options selecting and tuning the encoder.
+        """
+        args = ['-c:v', self.codec]
+        if self.preset is not None:
+            args.extend(['-preset', self.preset])
+        if self.crf is not None:
+            args.extend(['-crf', str(self.crf)])
+        args.extend(['-pix_fmt', self.pix_fmt])
+        return args + self.extra
+
+    def matches(
+        self,
+        video,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        fps: Optional[float] = None
+    ) -> bool:
+        """
+        True if `video` is already encoded the way this profile would encode
+        it (same codec and pixel format, and `width`x`height` and `fps` when
+        given), so its stream can be copied instead of re-encoded.
+
+        Args:
+            video (Video): The video to check; it is probed if needed.
+            width (int, optional): Required width.
+            height (int, optional): Required height.
+            fps (float, optional): Required frame rate.
+        """
+        if video.codec != self.stream_codec or video.pix_fmt != self.pix_fmt:
+            return False
+        if width is not None and int(video.width) != int(width):
+            return False
+        if height is not None and int(video.height) != int(height):
+            return False
+        return fps is None or frame_rate_of(video.fps) == frame_rate_of(fps)
+
+    def __repr__(self) -> str:
+        return f"EncodeProfile(name={self.name}, codec={self.codec}, preset={self.preset}, crf={self.crf})"
+
+
+# intermediate: fast, near-lossless files consumed by the next stage
+# final: the delivered file, slower preset for a better size/quality trade-off
+# preview: quick low quality render for checking a job
+# Each profile lists its implementations fastest first; get_profile picks the
+# first one the installed ffmpeg can encode.
+PROFILES: Dict[str, List[EncodeProfile]] = {
+    'intermediate': [
+        # a keyframe every 2 s (at 24 fps), so clips can be cut by stream copy
+        EncodeProfile(
+            'intermediate', 'libx264', 'yuv420p', preset='ultrafast', crf=16,
+            extra=['-g', '48'], stream_codec='h264'
+        ),
+        EncodeProfile('intermediate', 'mpeg4', 'yuv420p', extra=['-q:v', '2']),
+    ],
+    'intermediate_alpha': [
+        EncodeProfile(
+            'intermediate_alpha', 'prores_ks', 'yuva444p10le', extra=['-profile:v', '4444'], stream_codec='prores'
+        ),
+        EncodeProfile('intermediate_alpha', 'qtrle', 'argb'),
+        EncodeProfile('intermediate_alpha', 'png', 'rgba'),
+    ],
+    'final': [
+        EncodeProfile(
+            'final', 'libx264', 'yuv420p', preset='medium', crf=20,
+            extra=['-movflags', '+faststart'], stream_codec='h264'
+        ),
+        EncodeProfile('final', 'mpeg4', 'yuv420p', extra=['-q:v', '3', '-movflags', '+faststart']),
+    ],
+    'preview': [
+        EncodeProfile('preview', 'libx264', 'yuv420p', preset='veryfast', crf=28, stream_codec='h264'),
+        EncodeProfile('preview', 'mpeg4', 'yuv420p', extra=['-q:v', '6']),
+    ],
+}
+
+
+def _supported(profile: EncodeProfile, capabilities: Optional[Capabilities]) -> bool:
+    """True if ffmpeg can encode `profile` (always True when it could not be probed)."""
+    if capabilities is None:
+        return True
+    return capabilities.has_encoder(profile.codec) and capabilities.has_pix_fmt(profile.pix_fmt)
+
+
+def get_profile(stage: STAGES, alpha: bool = False) -> EncodeProfile:
+    """
+    Return the encode profile for a stage type.
+
+    The fastest implementation the installed ffmpeg supports is chosen, e.g.
+    an alpha intermediate is ProRes 4444 when prores_ks is available and
+    QuickTime Animation or PNG otherwise.
+
+    Args:
+        stage (str): "intermediate", "final" or "preview".
+        alpha (bool, optional): The output must keep an alpha channel; only
+            intermediates support it. Defaults to False.
+
+    Returns:
+        EncodeProfile: The profile to encode with.
+
+    Raises:
+        ValueError: If the stage is unknown or alpha is requested for a delivery stage.
+        RuntimeError: If ffmpeg supports none of the stage's encoders.
+    """
+    if stage not in ('intermediate', 'final', 'preview'):
+        raise ValueError(f"Unknown encode stage: {stage}")
+    if alpha and stage != 'intermediate':
+        raise ValueError(f"Stage {stage} does not support an alpha channel")
+
+    name = 'intermediate_alpha' if alpha else stage
+    capabilities = get_capabilities()
+    for profile in PROFILES[name]:
+        if _supported(profile, capabilities):
+            return profile
+
+    encoders = ", ".join(profile.codec for profile in PROFILES[name])
+    raise RuntimeError(f"ffmpeg has no encoder for the {name} profile (tried {encoders})")
+
+
+def unsupported_profiles(capabilities: Optional[Capabilities] = None) -> List[str]:
+    """
+    Return the profiles none of whose implementations ffmpeg can encode.
+    """
+    capabilities = capabilities or get_capabilities()
+    return [
+        name for name, profiles in PROFILES.items()
+        if not any(_supported(profile, capabilities) for profile in profiles)
+    ]
+
+
+class ThreadBudget:
+    """
+    Splits the machine's cores between the ffmpeg processes running at once.
+
+    Each process reserves its threads when it starts and gives them back when
+    it ends. A reservation is capped at a per-process share, `cores //
+    concurrency`, where `concurrency` is the number of processes expected to
+    run side by side (1 by default: a lone job gets every core). A stage that
+    starts several processes itself asks for an even split of the cores with
+    `share`. Threads are handed out from what is left, so a process started
+    after the budget is spent still gets one thread instead of waiting.
+
+    Attributes:
+        cores (int): Number of cores to share.
+        concurrency (int): Number of processes expected to run at once.
+        active (int): Number of processes currently holding a reservation.
+        allocated (int): Threads currently handed out.
+    """
+    def __init__(self, cores: Optional[int] = None, concurrency: int = 1) -> None:
+        self.cores = max(1, cores or os.cpu_count() or 1)
+        self.concurrency = max(1, concurrency)
+        self.active = 0
+        self.allocated = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def reserve(self, share: Optional[int] = None) -> Iterator[int]:
+        """
+        Reserve threads for one process for the duration of the block.
+
+        Args:
+            share (int, optional): Number of processes the caller runs side by
+                side; each is capped at `cores // share` (at most
+                `cores // concurrency`). Defaults to None.
+
+        Yields:
+            int: Number of threads the process may use (at least 1).
+        """
+        with self._lock:
+            per_process = self.cores // max(self.concurrency, share or 1)
+            threads = max(1, min(per_process, self.cores - self.allocated))
+            self.active += 1
+            self.allocated += threads
+        try:
+            yield threads
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.allocated -= threads
+
+
+# FFMPEG_CONCURRENCY: ffmpeg processes expected at once, e.g. jobs rendered in parallel
+thread_budget = ThreadBudget(concurrency = setting.get('FFMPEG_CONCURRENCY', 1))
+
+
+def thread_args(threads: int) -> Dict[str, List[str]]:
+    """
+    Return the ffmpeg threading options for a reservation.
+
+    Returns:
+        Dict[str, List[str]]: "global" options (filter graph threads, placed before
+        the inputs) and "output" options (encoder threads, placed before the output).
+    """
+    return {
+        'global': ['-filter_complex_threads', str(threads), '-filter_threads', str(threads)],
+        'output': ['-threads', str(threads)],
+    }
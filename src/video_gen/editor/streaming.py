@@ -0,0 +1,229 @@
+from video_gen.editor.ffmpeg import ffmpeg, FFmpegProgress
+from video_gen.settings import setting
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Optional, Callable, Tuple
+import subprocess
+import threading
+import errno
+import tempfile
+import logging
+import shutil
+import os
+
+logger = logging.getLogger(__name__)
+
+# Stages talk over pipes in NUT (streamable, carries any codec) with raw
+# frames, so a streamed hand-off costs no encode and no decode at all.
+STREAM_OUTPUT_ARGS = ['-c:v', 'rawvideo', '-pix_fmt', 'yuv420p', '-c:a', 'pcm_s16le', '-f', 'nut']
+STREAM_INPUT_ARGS = ['-f', 'nut']
+
+
+class StreamPipeline:
+    """
+    Connects ffmpeg stages through FIFOs instead of complete temp files.
+
+    Producers (e.g. per clip effect renders) write to a FIFO from `fifo()`
+    and the consumer (e.g. the final composition) reads all of them, so the
+    consumer starts encoding as soon as the first frames exist and no
+    intermediate ever reaches the disk. The pipeline creates the FIFOs in a
+    private directory, runs the producers next to the consumer and removes
+    everything on exit.
+
+    Where FIFOs are not available (Windows) `fifo()` returns plain temp files
+    and the producers run to completion before the consumer, as before.
+
+    Example:
+        >>> with StreamPipeline() as pipeline:
+        ...     path = pipeline.fifo()
+        ...     pipeline.add(['-i', 'in.mp4', *pipeline.output_args(), '-y', path], path)
+        ...     pipeline.run(['-f', 'nut', '-i', path, '-y', 'out.mp4'])
+
+    Attributes:
+        streaming (bool): True when stages are connected by FIFOs.
+        directory (str or None): Directory holding the FIFOs while the pipeline is open.
+    """
+    def __init__(self, streaming: Optional[bool] = None, workspace: Optional[str] = None) -> None:
+        """
+        Args:
+            streaming (bool, optional): Force FIFOs on or off. Defaults to FIFOs
+                wherever the platform supports them.
+            workspace (str, optional): Job directory the FIFOs are created in.
+                Defaults to setting.temp_path.
+        """
+        supported = hasattr(os, 'mkfifo')
+        self.streaming = supported if streaming is None else streaming and supported
+        self.workspace = workspace
+        self.directory: Optional[str] = None
+        self._paths: List[str] = []
+        self._producers: List[Tuple[List[str], str, str, Optional[float]]] = []
+
+    def __enter__(self) -> 'StreamPipeline':
+        self.directory = tempfile.mkdtemp(prefix='stream_', dir=self.workspace or getattr(setting, 'temp_path', None))
+        return self
+
+    def __exit__(self, *exc) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory = None
+        self._paths.clear()
+        self._producers.clear()
+
+    def fifo(self) -> str:
+        """
+        Create a new FIFO (or temp file) for one producer and return its path.
+        """
+        if self.directory is None:
+            raise RuntimeError("StreamPipeline must be used as a context manager")
+        path = os.path.join(self.directory, f"stream_{len(self._paths)}.nut")
+        if self.streaming:
+            os.mkfifo(path)
+        self._paths.append(path)
+        return path
+
+    def output_args(self) -> List[str]:
+        """
+        Output options for a producer, placed before `-y <fifo>`.
+        """
+        return list(STREAM_OUTPUT_ARGS)
+
+    def input_options(self, path: str) -> List[str]:
+        """
+        Input options for reading `path`: the stream format for one of this
+        pipeline's FIFOs, nothing for any other file.
+        """
+        return list(STREAM_INPUT_ARGS) if str(path) in self._paths else []
+
+    def add(self, args: List[str], path: str, label: Optional[str] = None, duration: Optional[float] = None) -> None:
+        """
+        Register a producer writing to `path` (a path from `fifo()`).
+
+        Args:
+            args (List[str]): ffmpeg arguments, ending with `path`.
+            path (str): The FIFO it writes to.
+            label (str, optional): Stage name for the trace and supervisor.
+            duration (float, optional): Expected output duration in seconds.
+        """
+        self._producers.append((args, path, label or 'stream_producer', duration))
+
+    def _produce(
+        self,
+        args: List[str],
+        path: str,
+        label: str,
+        duration: Optional[float],
+        stage: str = 'intermediate',
+        done: Optional[threading.Event] = None
+    ) -> None:
+        try:
+            ffmpeg.run('ffmpeg', args, duration=duration, label=label, stage=stage)
+        except Exception:
+            # the consumer would wait for this FIFO forever: hand it an EOF,
+            # unless it already finished and nobody will ever read it again
+            _release_writer(path, done)
+            raise
+
+    def run(
+        self,
+        args: List[str],
+        progress: Optional[Callable[[FFmpegProgress], None]] = None,
+        duration: Optional[float] = None,
+        label: Optional[str] = None,
+        stage: str = 'intermediate'
+    ) -> subprocess.CompletedProcess:
+        """
+        Run the consumer together with every registered producer.
+
+        Args:
+            args (List[str]): ffmpeg arguments of the consumer.
+            progress (Callable, optional): Progress callback of the consumer.
+            duration (float, optional): Expected output duration of the consumer.
+            label (str, optional): Stage name of the consumer.
+            stage (str, optional): Supervisor stage class of the consumer.
+
+        Returns:
+            subprocess.CompletedProcess: The consumer's result.
+
+        Raises:
+            RuntimeError: If the consumer fails; when a producer failed too (other
+                than on the broken pipe the consumer's failure causes), its error is
+                raised instead, as it is the cause, chained to the consumer's.
+        """
+        producers, self._producers = self._producers, []
+
+        if not self.streaming:
+            for producer in producers:
+                self._produce(*producer)
+            return ffmpeg.run('ffmpeg', args, progress=progress, duration=duration, label=label, stage=stage)
+
+        # a streamed producer is paced by its consumer and spends most of its time
+        # blocked on the FIFO, so it runs under the consumer's deadline, not its own
+        consumer_done = threading.Event()
+        consumer_duration = max([duration or 0] + [producer[3] or 0 for producer in producers]) or None
+        consumer_error = None
+        with ThreadPoolExecutor(max_workers=max(1, len(producers))) as pool:
+            futures: List[Future] = [
+                pool.submit(self._produce, producer_args, path, producer_label, consumer_duration, stage, consumer_done)
+                for producer_args, path, producer_label, _ in producers
+            ]
+            try:
+                result = ffmpeg.run('ffmpeg', args, progress=progress, duration=duration, label=label, stage=stage)
+            except RuntimeError as e:
+                consumer_error = e
+            finally:
+                consumer_done.set()
+                # release writers blocked on a FIFO the consumer never opened
+                for _, path, _, _ in producers:
+                    _release(path, read=True)
+
+        # a producer whose consumer stopped reading fails on a broken pipe: either
+        # the consumer ended early (-shortest, trim), which does not affect the
+        # output, or it failed, and its own error is the one to report
+        errors = []
+        for future in futures:
+            error = future.exception()
+            if error is None:
+                continue
+            if 'Broken pipe' in str(error):
+                logger.debug(f"Stream producer stopped by its consumer: {error}")
+            else:
+                errors.append(error)
+
+        if consumer_error is None:
+            if errors:
+                raise errors[0]
+            return result
+        if errors:
+            raise errors[0] from consumer_error
+        raise consumer_error
+
+
+def _release(path: str, read: bool = False) -> bool:
+    """
+    Unblock the other end of a FIFO whose peer will never use it, by opening
+    and closing it without waiting.
+
+    As a writer (default) this hands an EOF to a reader that has the FIFO
+    open; with no reader it does nothing. As a reader (`read`) a writer
+    blocked in open() is released and fails on a broken pipe.
+
+    Returns:
+        bool: False if there was no reader to release (writer only).
+    """
+    flags = (os.O_RDONLY if read else os.O_WRONLY) | getattr(os, 'O_NONBLOCK', 0)
+    try:
+        os.close(os.open(path, flags))
+    except OSError as e:
+        return e.errno != errno.ENXIO
+    return True
+
+
+def _release_writer(path: str, done: Optional[threading.Event] = None, interval: float = 0.05) -> None:
+    """
+    Hand an EOF to the reader of a FIFO whose producer failed.
+
+    The reader may not have opened the FIFO yet, so this retries until it
+    does, and gives up once `done` is set: the consumer has finished and
+    nothing will ever open the read end again.
+    """
+    while not _release(path):
+        if done is None or done.wait(interval):
+            return
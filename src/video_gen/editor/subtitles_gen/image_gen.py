@@ -1,9 +1,14 @@
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Iterator, Optional
 
-from video_gen.utils import UserDict, Path, clean_files, assets
+from video_gen.utils import UserDict, Path, assets
 from video_gen.editor.media import Video, Audio
 from video_gen.editor.edit import edit
+from video_gen.editor.profiles import get_profile
+from video_gen.editor.supervisor import SupervisedPopen
 from PIL import Image, ImageFont, ImageDraw
+import tempfile
+import shutil
+import math
 import os
 import cv2
 import numpy as np
@@ -172,6 +177,61 @@ def generate_flow_image(
 
     return frame_paths
 
+def even_box(
+    left: float,
+    top: float,
+    right: float,
+    bottom: float,
+    canvas: Optional[Tuple[int, int]] = None
+) -> Tuple[int, int, int, int]:
+    """
+    Grow a box to even coordinates and sides (4:2:0 encoders need even sizes)
+    and return it as (x, y, width, height). With `canvas` (width, height) the
+    box is also cut to the canvas, rounding inward at its edges (to the last
+    even column and row of an odd canvas): nothing outside it is ever shown.
+    """
+    left, top = math.floor(left), math.floor(top)
+    left, top = left - left % 2, top - top % 2
+    right, bottom = math.ceil(right), math.ceil(bottom)
+    right, bottom = right + right % 2, bottom + bottom % 2
+    if canvas is not None:
+        limit_x, limit_y = canvas[0] - canvas[0] % 2, canvas[1] - canvas[1] % 2
+        left, top = min(max(left, 0), max(limit_x - 2, 0)), min(max(top, 0), max(limit_y - 2, 0))
+        right, bottom = min(right, limit_x), min(bottom, limit_y)
+    return left, top, max(right - left, 2), max(bottom - top, 2)
+
+def crop_to_content(images: List[Video]) -> Optional[Tuple[int, int]]:
+    """
+    Crop a sequence of cumulative frames (each frame draws on the previous
+    one, so the last frame covers everything) to the box of their visible
+    pixels, in place.
+
+    Returns:
+        Tuple[int, int] or None: Position of the box on the original canvas,
+        None if the frames are empty and were left as they are.
+    """
+    with Image.open(str(images[-1])) as last:
+        bbox = last.getchannel("A").getbbox()
+        canvas_width, canvas_height = last.size
+    if bbox is None:
+        return None
+
+    x, y, width, height = even_box(*bbox, canvas = (canvas_width, canvas_height))
+    for image in images:
+        with Image.open(str(image)) as frame:
+            cropped = frame.crop((x, y, x + width, y + height))
+        cropped.save(str(image))
+    return x, y
+
+def composite_clipped(frame: Image.Image, image: Image.Image, position: Tuple[int, int]) -> None:
+    """
+    Alpha composite `image` onto `frame` at `position`, in place. The part of
+    `image` left of or above the frame (a negative position, e.g. glow cut off
+    by a box clipped to the canvas) is dropped.
+    """
+    x, y = position
+    frame.alpha_composite(image, (max(x, 0), max(y, 0)), (max(-x, 0), max(-y, 0)))
+
 def hex_to_rgba(hex_color: str) -> Tuple[int, int, int, int]:
     """Convert a hex color string to an RGBA tuple.
 
@@ -198,7 +258,8 @@ def gen_trans_sub(
     audio: Audio,
     timestamps: List[Tuple[int, int, str]],
     file_info: UserDict,
-    output_file: Path|str
+    output_file: Path|str,
+    workspace: Optional[str] = None
 ) -> Video:
     """
     Generate a transparent subtitle video.
@@ -209,14 +270,20 @@ def gen_trans_sub(
         timestamps (List[Tuple[int, int, str]]): List of (start, end, text) tuples.
         file_info (UserDict): Dictionary containing font settings.
         output_file (Optional[Path]): Path to save the output video (defaults to None).
+        workspace (Optional[str]): Job directory for the intermediate frames
+            (defaults to assets.temp_path).
 
     Returns:
-        Video: The generated video with transparent subtitles.
+        Video: The generated video with transparent subtitles, cropped to the
+        text's bounding box (see `Video.position`).
     
     Note:
         for rn just provide .mov file path else there will be error in video gen
     """
-    frame_paths = []
+    # frames go to a directory of their own: concurrent jobs write frame_001.png too
+    root = str(workspace or assets.temp_path)
+    os.makedirs(root, exist_ok=True)
+    frame_folder = tempfile.mkdtemp(prefix='frames_', dir=root)
     
     try:
         frame_paths = generate_flow_image(
@@ -225,22 +292,27 @@ def gen_trans_sub(
             font_path = file_info.font_name,
             width = file_info.width,
             height = file_info.height,
-            output_folder = assets.temp_path,
+            output_folder = frame_folder,
             padding = file_info.padding,
             font_color = hex_to_rgba(file_info.text_color)
         )
+        # encode and composite only the part of the frame the text covers
+        position = crop_to_content(frame_paths)
         video = edit.concatenate_by_image(
             audio = audio,
             timestamps = timestamps,
             images = frame_paths,
-            output_path = output_file
+            output_path = output_file,
+            workspace = root
         )
+        if video is not None:
+            video.position = position
     
     except Exception as e:
         raise 
     
     finally:
-        clean_files(frame_paths)
+        shutil.rmtree(frame_folder, ignore_errors=True)
                 
     return video
 
@@ -287,6 +359,8 @@ import subprocess
 def init_ffmpeg_pipe(output_path, width, height, fps, bg_music, word_data=None):
     """Initialize an ffmpeg process if output_path is given; otherwise, return None."""
     if output_path:
+        # If we have word_data, compute total duration from its last tuple
+        total_duration = word_data[-1][1] if word_data else None
         ffmpeg_cmd = [
             'ffmpeg', '-y', '-loglevel', 'quiet',  # suppress logs
             '-f', 'rawvideo',
@@ -297,15 +371,13 @@ def init_ffmpeg_pipe(output_path, width, height, fps, bg_music, word_data=None):
             '-i', '-',  # Video input from stdin
         ]
         if bg_music:
-            # If we have word_data, compute total duration from its last tuple
             if word_data:
-                total_duration = word_data[-1][1]
                 ffmpeg_cmd.extend(['-t', str(total_duration)])
             # Add the audio input (without -shortest)
             ffmpeg_cmd.extend(['-i', bg_music, '-c:a', 'copy'])
-        ffmpeg_cmd.extend(['-c:v', 'qtrle', output_path])
-        return subprocess.Popen(ffmpeg_cmd, stdin=subprocess.PIPE,
-                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        ffmpeg_cmd.extend([*get_profile('intermediate', alpha=True).video_args(), output_path])
+        return SupervisedPopen(ffmpeg_cmd, 'init_ffmpeg_pipe', duration=total_duration, stdin=subprocess.PIPE,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     return None
 
 def wrap_text(full_text, font, max_width):
@@ -324,27 +396,67 @@ def wrap_text(full_text, font, max_width):
         lines.append(current_line)
     return lines
 
-def create_text_frame(text, font, width, height, background_color, padding,
-                      text_color, shadow_color, shadow_offsets, border_thickness, border_color):
+def text_layout(text, font, width, height, padding):
     """
-    Create a frame (as a NumPy array) with the given text drawn on it.
-    The text is wrapped to fit within (width - 2*padding) and centered.
-    Shadows and a text border (using stroke) are applied.
+    Wrap the text to fit within (width - 2*padding) and center it on the canvas.
+    Returns a list of (x, y, line) for each wrapped line.
     """
-    frame_img = np.full((height, width, 4), background_color, dtype=np.uint8)
-    pil_img = Image.fromarray(frame_img, 'RGBA')
-    draw = ImageDraw.Draw(pil_img)
-    
     wrapped_lines = wrap_text(text, font, width - 2 * padding)
     # Compute line height (using "Ay" as a sample)
     line_height = font.getbbox("Ay")[3] + 10
     total_text_height = len(wrapped_lines) * line_height
     start_y = (height - total_text_height) // 2
-    
+
+    layout = []
     for i, line in enumerate(wrapped_lines):
         text_width = font.getbbox(line)[2]
         x_start = padding + ((width - 2 * padding - text_width) // 2)
-        y_line = start_y + i * line_height
+        layout.append((x_start, start_y + i * line_height, line))
+    return layout
+
+def text_box(word_data, font, width, height, padding, shadow_offsets, border_thickness):
+    """
+    Return the (x, y, width, height) box covering every frame of the typing
+    animation of `word_data` (each partially typed text, with its shadows and
+    border), or None if there is no text.
+    """
+    texts, accumulated = set(), ""
+    for _, _, word in word_data or []:
+        for n in range(1, len(word) + 1):
+            texts.add((accumulated + " " + word[:n]).strip())
+        accumulated = (accumulated + " " + word).strip()
+
+    boxes = []
+    for text in texts:
+        for x, y, line in text_layout(text, font, width, height, padding):
+            left, top, right, bottom = font.getbbox(line, stroke_width=border_thickness)
+            boxes.append((x + left, y + top, x + right, y + bottom))
+            left, top, right, bottom = font.getbbox(line)
+            for dx, dy in shadow_offsets:
+                boxes.append((x + left + dx, y + top + dy, x + right + dx, y + bottom + dy))
+    if not boxes:
+        return None
+    return even_box(
+        min(box[0] for box in boxes), min(box[1] for box in boxes),
+        max(box[2] for box in boxes), max(box[3] for box in boxes),
+        canvas = (width, height)
+    )
+
+def create_text_frame(text, font, width, height, background_color, padding,
+                      text_color, shadow_color, shadow_offsets, border_thickness, border_color, box=None):
+    """
+    Create a frame (as a NumPy array) with the given text drawn on it.
+    The text is wrapped to fit within (width - 2*padding) and centered.
+    Shadows and a text border (using stroke) are applied.
+    With `box` (x, y, width, height) only that part of the canvas is drawn.
+    """
+    x0, y0, box_width, box_height = box or (0, 0, width, height)
+    frame_img = np.full((box_height, box_width, 4), background_color, dtype=np.uint8)
+    pil_img = Image.fromarray(frame_img, 'RGBA')
+    draw = ImageDraw.Draw(pil_img)
+    
+    for x_start, y_line, line in text_layout(text, font, width, height, padding):
+        x_start, y_line = x_start - x0, y_line - y0
         # Draw shadow offsets
         for dx, dy in shadow_offsets:
             draw.text((x_start + dx, y_line + dy), line, font=font, fill=shadow_color)
@@ -363,7 +475,7 @@ def output_frame(frame, proc):
 
 def typing_effect(word_data, font, width, height, background_color, padding,
                        text_color, shadow_color, shadow_offsets, border_thickness, border_color, fps,
-                       final_hold_fraction=0.3):
+                       final_hold_fraction=0.3, box=None):
     """
     Generator for word-data mode: for each word, yield frames that gradually reveal the word.
     
@@ -392,13 +504,13 @@ def typing_effect(word_data, font, width, height, background_color, padding,
             partial_word = word[:max(1, int(len(word) * fraction))]
             current_text = (accumulated_text + " " + partial_word).strip() if accumulated_text else partial_word
             frame = create_text_frame(current_text, font, width, height, background_color, padding,
-                                      text_color, shadow_color, shadow_offsets, border_thickness, border_color)
+                                      text_color, shadow_color, shadow_offsets, border_thickness, border_color, box)
             yield frame, 1.0 / fps
         
         # Finalize the word
         accumulated_text = (accumulated_text + " " + word).strip() if accumulated_text else word
         frame = create_text_frame(accumulated_text, font, width, height, background_color, padding,
-                                  text_color, shadow_color, shadow_offsets, border_thickness, border_color)
+                                  text_color, shadow_color, shadow_offsets, border_thickness, border_color, box)
         # Hold the final frame for the remaining frames
         for _ in range(hold_frames):
             yield frame, 1.0 / fps
@@ -416,7 +528,8 @@ def fallback_word_data_mode(
     shadow_color: tuple[int,int,int,int], 
     shadow_offsets: tuple[int,int,int,int],
     border_color: tuple[int,int,int,int],
-    final_hold_fraction:float  = 0.3
+    final_hold_fraction:float  = 0.3,
+    box: Optional[Tuple[int,int,int,int]] = None
     ):
     """
     Generator for word-data mode: for each word, yield frames that gradually reveal the word.
@@ -447,13 +560,13 @@ def fallback_word_data_mode(
             partial_word = word[:max(1, int(len(word) * fraction))]
             current_text = (accumulated_text + " " + partial_word).strip() if accumulated_text else partial_word
             frame = create_text_frame(current_text, font, width, height, background_color, padding,
-                                      text_color, shadow_color, shadow_offsets, border_thickness, border_color)
+                                      text_color, shadow_color, shadow_offsets, border_thickness, border_color, box)
             yield frame, 1.0 / fps
         
         # Finalize the word
         accumulated_text = (accumulated_text + " " + word).strip() if accumulated_text else word
         frame = create_text_frame(accumulated_text, font, width, height, background_color, padding,
-                                  text_color, shadow_color, shadow_offsets, border_thickness, border_color)
+                                  text_color, shadow_color, shadow_offsets, border_thickness, border_color, box)
         # Hold the final frame for the remaining frames
         for _ in range(hold_frames):
             yield frame, 1.0 / fps
@@ -478,6 +591,8 @@ def sub(font_path, font_size, width, height,
     Shadows and a text border (via stroke) are applied.
     
     If output_path is provided, frames are piped to ffmpeg to generate a transparent MOV video.
+    Only the bounding box of the animated text is rendered and encoded; the
+    returned Video carries its position on the canvas.
     If bg_music is provided, it is muxed into the output video.
     """
     # Load font
@@ -487,16 +602,18 @@ def sub(font_path, font_size, width, height,
         print("Error: Font file not found.")
         return
 
-    proc = init_ffmpeg_pipe(output_path, width, height, fps, bg_music, word_data)
+    box = text_box(word_data, font, width, height, padding, shadow_offsets, border_thickness)
+    box = box or (0, 0, width, height)
+    proc = init_ffmpeg_pipe(output_path, box[2], box[3], fps, bg_music, word_data)
     
     if animate_from_start:
         frame_gen = typing_effect(word_data, font, width, height, background_color, padding,
                                        text_color, shadow_color, shadow_offsets, border_thickness, border_color, fps,
-                                       final_hold_fraction=final_hold_fraction)
+                                       final_hold_fraction=final_hold_fraction, box=box)
     else:
         frame_gen = fallback_word_data_mode(word_data, font, width, height, background_color, padding,
                                        text_color, shadow_color, shadow_offsets, border_thickness, border_color, fps,
-                                       final_hold_fraction=final_hold_fraction)
+                                       final_hold_fraction=final_hold_fraction, box=box)
     
     for frame, frame_delay in frame_gen:
         try:
@@ -508,11 +625,23 @@ def sub(font_path, font_size, width, height,
     if proc:
         proc.stdin.close()
         proc.wait()
+        if proc.watch.expired:
+            raise RuntimeError(proc.watch.error('ffmpeg'))
     else:
         cv2.waitKey(0)
         cv2.destroyAllWindows()
-        
-    return output_path  # Or return a Video object as needed
+        return None
+
+    profile = get_profile('intermediate', alpha=True)
+    return Video(
+        output_path,
+        position = (box[0], box[1]),
+        codec = profile.stream_codec,
+        pix_fmt = profile.pix_fmt,
+        width = box[2],
+        height = box[3],
+        fps = fps
+    )
 
 
 
@@ -730,14 +859,12 @@ class NeonWordAnimator:
         draw.text((margin - bbox[0], margin - bbox[1]), word, font=self.font, fill=(255, 255, 255, 255))
         return word_img, word_width
     
-    def generate_frames(self):
+    def _layout(self):
         """
-        Yields animation frames with wrapped and aligned text.
-        Words are split into lines if adding another word would exceed the available width.
+        Breaks the words into lines that fit within the padded canvas and places them.
+        Returns a list of (start_time, end_time, word, word_width, x, y), where
+        (x, y) is the canvas position of the word's text.
         """
-        global_frame = 0
-        # Create a composite image with an opaque background.
-        composite = Image.new("RGBA", (self.canvas_width, self.canvas_height), self.bg_color)
         available_width = self.canvas_width - 2 * self.global_padding
         available_height = self.canvas_height - 2 * self.global_padding
 
@@ -773,7 +900,7 @@ class NeonWordAnimator:
         total_text_height = len(lines) * line_height + (len(lines) - 1) * vertical_spacing
         start_y = self.global_padding + (available_height - total_text_height) // 2
 
-        # Animate each line.
+        placements = []
         for line_words, line_width in lines:
             # If centered, calculate starting x so the line is centered.
             if self.pos == "center":
@@ -783,92 +910,110 @@ class NeonWordAnimator:
             else:
                 current_x = self.global_padding
 
-            # Animate each word in the line.
             for (start_time, end_time, word, word_width) in line_words:
-                duration = end_time - start_time
-                reveal_frames = max(int(round(duration * self.fps)), 1)
-                word_img, _ = self._render_word(word)
-
-                # Animate reveal for this word.
-                for step in range(reveal_frames):
-                    frame = composite.copy().convert("RGB")
-                    pulsation = 1 + 0.2 * math.sin(2 * math.pi * global_frame / 60)
-                    colored_word = generate_letter_overlay(
-                        word_img, step, reveal_frames, self.transition_pixels, self.final_color
-                    )
-                    neon_word = apply_neon_glow(
-                        colored_word,
-                        glow_layers=self.glow_layers,
-                        base_radius=self.base_glow_radius * pulsation,
-                        intensity_decay=self.intensity_decay,
-                    )
-                    # Paste word with appropriate offsets (including margin for glow)
-                    frame.paste(
-                        neon_word,
-                        (int(current_x - self.base_glow_radius * self.glow_layers),
-                         int(start_y - self.base_glow_radius * self.glow_layers)),
-                        neon_word,
-                    )
-                    yield frame
-                    global_frame += 1
-
-                # Extra hold frames for this word.
-                for _ in range(self.extra_hold_frames):
-                    frame = composite.copy().convert("RGB")
-                    neon_word = apply_neon_glow(
-                        generate_letter_overlay(
-                            word_img, reveal_frames, reveal_frames, self.transition_pixels, self.final_color
-                        ),
-                        glow_layers=self.glow_layers,
-                        base_radius=self.base_glow_radius,
-                        intensity_decay=self.intensity_decay,
-                    )
-                    frame.paste(
-                        neon_word,
-                        (int(current_x - self.base_glow_radius * self.glow_layers),
-                         int(start_y - self.base_glow_radius * self.glow_layers)),
-                        neon_word,
-                    )
-                    yield frame
-                    global_frame += 1
-
-                # Update composite image with the fully revealed word.
-                full_word = generate_letter_overlay(
-                    word_img, reveal_frames, reveal_frames, self.transition_pixels, self.final_color
+                placements.append((start_time, end_time, word, word_width, current_x, start_y))
+                current_x += word_width + self.space_between_words
+
+            # Move down to the next line.
+            start_y += line_height + vertical_spacing
+        return placements
+
+    def bounding_box(self):
+        """
+        Returns the (x, y, width, height) part of the canvas the animation draws
+        on: every word with its glow margin, cut to the canvas. The frames of `generate_frames`
+        have this size and are meant to be drawn at (x, y).
+        """
+        margin = self.base_glow_radius * self.glow_layers
+        boxes = []
+        for _, _, word, _, x, y in self._layout():
+            bbox = self.font.getbbox(word)
+            left, top = int(x - margin), int(y - margin)
+            boxes.append((left, top, left + bbox[2] - bbox[0] + 2 * margin, top + bbox[3] - bbox[1] + 2 * margin))
+        if not boxes:
+            return 0, 0, self.canvas_width, self.canvas_height
+        return even_box(
+            min(box[0] for box in boxes), min(box[1] for box in boxes),
+            max(box[2] for box in boxes), max(box[3] for box in boxes),
+            canvas = (self.canvas_width, self.canvas_height)
+        )
+
+    def generate_frames(self):
+        """
+        Yields transparent RGBA animation frames of the `bounding_box` area,
+        with wrapped and aligned text.
+        """
+        global_frame = 0
+        margin = self.base_glow_radius * self.glow_layers
+        x0, y0, box_width, box_height = self.bounding_box()
+        # The composite holds every fully revealed word so far.
+        composite = Image.new("RGBA", (box_width, box_height), self.bg_color)
+
+        # Animate each word.
+        for (start_time, end_time, word, word_width, x, y) in self._layout():
+            duration = end_time - start_time
+            reveal_frames = max(int(round(duration * self.fps)), 1)
+            word_img, _ = self._render_word(word)
+            # word image offset (including margin for glow) within the box
+            position = (int(x - margin) - x0, int(y - margin) - y0)
+
+            # Animate reveal for this word.
+            for step in range(reveal_frames):
+                frame = composite.copy()
+                pulsation = 1 + 0.2 * math.sin(2 * math.pi * global_frame / 60)
+                colored_word = generate_letter_overlay(
+                    word_img, step, reveal_frames, self.transition_pixels, self.final_color
                 )
-                full_neon = apply_neon_glow(
-                    full_word,
+                neon_word = apply_neon_glow(
+                    colored_word,
                     glow_layers=self.glow_layers,
-                    base_radius=self.base_glow_radius,
+                    base_radius=self.base_glow_radius * pulsation,
                     intensity_decay=self.intensity_decay,
                 )
-                composite.paste(
-                    full_neon,
-                    (int(current_x - self.base_glow_radius * self.glow_layers),
-                     int(start_y - self.base_glow_radius * self.glow_layers)),
-                    full_neon,
-                )
-                current_x += word_width + self.space_between_words
+                composite_clipped(frame, neon_word, position)
+                yield frame
+                global_frame += 1
 
-            # Move down to the next line.
-            start_y += line_height + vertical_spacing
+            # Fully revealed word, used by the hold frames and kept in the composite.
+            full_neon = apply_neon_glow(
+                generate_letter_overlay(
+                    word_img, reveal_frames, reveal_frames, self.transition_pixels, self.final_color
+                ),
+                glow_layers=self.glow_layers,
+                base_radius=self.base_glow_radius,
+                intensity_decay=self.intensity_decay,
+            )
+
+            # Extra hold frames for this word.
+            for _ in range(self.extra_hold_frames):
+                frame = composite.copy()
+                composite_clipped(frame, full_neon, position)
+                yield frame
+                global_frame += 1
+
+            # Update composite image with the fully revealed word.
+            composite_clipped(composite, full_neon, position)
         
         # Optionally, a final hold phase could be added here.
         
 ####################################
 # FFmpeg Video Writer
 ####################################
-def write_video_ffmpeg(frame_generator, output_path, width, height, fps=30, audio_path=None):
+def write_video_ffmpeg(frame_generator, output_path, width, height, fps=30, audio_path=None, duration=None,
+                       alpha=False):
     """
     Pipes frames from frame_generator to ffmpeg to create a video.
-    If audio_path is provided, it will be muxed.
+    If audio_path is provided, it will be muxed (stream copied: the audio is
+    only encoded by the final render).
+    With alpha, the frames are RGBA and their transparency is kept.
     """
+    profile = get_profile('intermediate', alpha=alpha)
     command = [
         "ffmpeg",
         "-y",
         "-f", "rawvideo",
         "-vcodec", "rawvideo",
-        "-pix_fmt", "bgr24",
+        "-pix_fmt", "rgba" if alpha else "bgr24",
         "-s", f"{width}x{height}",
         "-r", str(fps),
         "-i", "-",
@@ -876,33 +1021,47 @@ def write_video_ffmpeg(frame_generator, output_path, width, height, fps=30, audi
     if audio_path:
         command.extend([
             "-i", audio_path,
-            "-c:v", "libx264",
-            "-preset", "slow",
-            "-crf", "18",
-            "-c:a", "aac",
-            "-b:a", "192k",
-            "-pix_fmt", "yuv420p",
+            *profile.video_args(),
+            "-c:a", "copy",
             output_path
         ])
     else:
         command.extend([
             "-an",
-            "-c:v", "libx264",
-            "-preset", "slow",
-            "-crf", "18",
-            "-pix_fmt", "yuv420p",
+            *profile.video_args(),
             output_path
         ])
     
-    process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    process = SupervisedPopen(
+        command, 'write_video_ffmpeg', duration=duration,
+        stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
     for frame in frame_generator:
-        frame_np = cv2.cvtColor(np.array(frame), cv2.COLOR_RGB2BGR)
+        if alpha:
+            frame_np = np.asarray(frame.convert("RGBA"))
+        else:
+            frame_np = cv2.cvtColor(np.array(frame), cv2.COLOR_RGB2BGR)
         try:
             process.stdin.write(frame_np.tobytes())
         except BrokenPipeError:
             break
     process.stdin.close()
     process.wait()
+    if process.watch.expired:
+        raise RuntimeError(process.watch.error('ffmpeg'))
+
+
+def hold_last_frame(frames: Iterator[Image.Image], count: int) -> Iterator[Image.Image]:
+    """
+    Yield `frames`, then repeat the last one until `count` frames were yielded.
+    """
+    last, yielded = None, 0
+    for last in frames:
+        yielded += 1
+        yield last
+    if last is not None:
+        for _ in range(count - yielded):
+            yield last
 
 
 def typing_gen_trans_sub_std(
@@ -910,8 +1069,16 @@ def typing_gen_trans_sub_std(
     audio: Audio,
     timestamps: List[Tuple[int, int, str]],
     file_info: UserDict,
-    output_file: Path|str
+    output_file: Path|str,
+    mux_audio: bool = True
 ) -> Video:
+    """
+    Render the typing subtitle of one narration line, cut to the text's bounding box.
+
+    With `mux_audio` False the clip is silent (the narration goes on an
+    `AudioTimeline` instead) and its last frame is held for as long as the
+    narration lasts.
+    """
     width = file_info.width
     height = file_info.height
     padding = file_info.padding
@@ -936,10 +1103,26 @@ def typing_gen_trans_sub_std(
         base_canvas_width=width,
         base_canvas_height=height
     )
-    output_video = "neon_word_video.mp4"
+    # only the text's bounding box is rendered, encoded and later composited
+    x, y, box_width, box_height = animator.bounding_box()
     frame_gen = animator.generate_frames()
-    write_video_ffmpeg(frame_gen, output_file, width, height, file_info.fps, str(audio))
-    return Video(output_file)
+    audio_path = str(audio)
+    if not mux_audio:
+        frame_gen = hold_last_frame(frame_gen, math.ceil(float(audio.duration) * file_info.fps))
+        audio_path = None
+    write_video_ffmpeg(
+        frame_gen, output_file, box_width, box_height, file_info.fps, audio_path, audio.peek('duration'), alpha=True
+    )
+    profile = get_profile('intermediate', alpha=True)
+    return Video(
+        output_file,
+        position = (x, y),
+        codec = profile.stream_codec,
+        pix_fmt = profile.pix_fmt,
+        width = box_width,
+        height = box_height,
+        fps = file_info.fps
+    )
 
 def typing_gen_trans_sub(
     text: str,
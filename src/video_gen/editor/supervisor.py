@@ -0,0 +1,293 @@
+from typing import Dict, List, Optional, Iterator, Any, Literal
+from contextlib import contextmanager
+import subprocess
+import threading
+import logging
+import signal
+import time
+import os
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+STAGE_CLASSES = Literal['probe', 'intermediate', 'final', 'pipe']
+
+
+class StageClass:
+    """
+    How long a child of one kind of stage may run, and how much of the
+    machine it may take.
+
+    The deadline is `base + per_second * duration` wall seconds, where
+    `duration` is the expected output duration; `default` is used when the
+    duration is unknown.
+
+    Attributes:
+        name (str): Stage class name.
+        nice (int): Niceness added to the child (higher is lower priority).
+        base (float): Fixed part of the deadline in seconds.
+        per_second (float): Seconds allowed per second of output.
+        default (float): Deadline when the output duration is unknown.
+        memory_mb (int or None): Address space limit of the child, None for no limit.
+    """
+    __slots__ = ('name', 'nice', 'base', 'per_second', 'default', 'memory_mb')
+
+    def __init__(
+        self,
+        name: str,
+        nice: int,
+        base: float,
+        per_second: float,
+        default: float,
+        memory_mb: Optional[int] = None
+    ) -> None:
+        self.name = name
+        self.nice = nice
+        self.base = base
+        self.per_second = per_second
+        self.default = default
+        self.memory_mb = memory_mb
+
+    def deadline(self, duration: Optional[float] = None) -> float:
+        """
+        Return the wall-clock budget in seconds for an output of `duration` seconds.
+        """
+        if not duration:
+            return self.default
+        return self.base + self.per_second * duration
+
+    def __repr__(self) -> str:
+        return f"StageClass(name={self.name}, nice={self.nice}, base={self.base}, per_second={self.per_second})"
+
+
+# probe: ffprobe calls, short and never proportional to the media length
+# intermediate: per clip renders, yield the CPU to the final encode and the UI
+# final: the delivered file, normal priority and a generous budget
+# pipe: raw frames piped from Python, paced by the frame generator
+STAGES: Dict[str, StageClass] = {
+    'probe': StageClass('probe', nice=0, base=60, per_second=0, default=60),
+    'intermediate': StageClass('intermediate', nice=10, base=120, per_second=10, default=1800),
+    'final': StageClass('final', nice=0, base=300, per_second=20, default=3600),
+    'pipe': StageClass('pipe', nice=5, base=120, per_second=20, default=1800),
+}
+
+
+def popen_kwargs() -> Dict[str, Any]:
+    """
+    Return the Popen / create_subprocess_exec keyword arguments that put the
+    child in its own process group, so it can be killed with everything it spawned.
+    """
+    if os.name == 'posix':
+        return {'start_new_session': True}
+    return {}
+
+
+def apply_limits(pid: int, stage: StageClass) -> None:
+    """
+    Lower the priority of a freshly started child and cap its memory.
+
+    The limits are set from the parent (setpriority/prlimit) rather than in a
+    preexec_fn, which is not safe while other threads run. Platforms without
+    these calls run the child unrestricted.
+    """
+    if stage.nice and hasattr(os, 'setpriority'):
+        try:
+            os.setpriority(os.PRIO_PROCESS, pid, os.getpriority(os.PRIO_PROCESS, pid) + stage.nice)
+        except OSError as e:
+            logger.debug(f"Could not renice {pid}: {e}")
+
+    if resource is None or not hasattr(resource, 'prlimit'):
+        return
+    try:
+        resource.prlimit(pid, resource.RLIMIT_CORE, (0, 0))
+        if stage.memory_mb:
+            limit = stage.memory_mb * 2**20
+            resource.prlimit(pid, resource.RLIMIT_AS, (limit, limit))
+    except (OSError, ValueError) as e:
+        logger.debug(f"Could not set resource limits of {pid}: {e}")
+
+
+def kill_group(pid: int, sig: int = signal.SIGTERM) -> None:
+    """
+    Send `sig` to the process group led by `pid` (or just `pid` where process
+    groups do not exist).
+    """
+    try:
+        if hasattr(os, 'killpg'):
+            os.killpg(pid, sig)
+        else:
+            os.kill(pid, signal.SIGTERM)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+class Supervisor:
+    """
+    Watchdog for ffmpeg children.
+
+    Every supervised child gets a deadline from its stage class. A child
+    still running at its deadline is terminated together with its process
+    group, then killed if it has not exited after `grace` seconds. Each
+    timeout is recorded as an event, so the job summary can report it.
+
+    Attributes:
+        grace (float): Seconds between SIGTERM and SIGKILL.
+        events (List[Dict[str, Any]]): Timeouts recorded since the last `drain_events`.
+    """
+    def __init__(self, grace: float = 5.0) -> None:
+        self.grace = grace
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def stage(self, name: STAGE_CLASSES) -> StageClass:
+        """
+        Return the stage class `name`.
+
+        Raises:
+            ValueError: If the stage class is unknown.
+        """
+        try:
+            return STAGES[name]
+        except KeyError:
+            raise ValueError(f"Unknown stage class: {name}") from None
+
+    def start(
+        self,
+        pid: int,
+        label: str,
+        stage: STAGE_CLASSES = 'intermediate',
+        duration: Optional[float] = None
+    ) -> 'Watch':
+        """
+        Apply the stage limits to a started child and start its deadline.
+
+        Args:
+            pid (int): The child, started with `popen_kwargs()`.
+            label (str): Stage name reported in events.
+            stage (str, optional): Stage class. Defaults to 'intermediate'.
+            duration (float, optional): Expected output duration in seconds.
+
+        Returns:
+            Watch: The running deadline; cancel it once the child exited.
+        """
+        stage_class = self.stage(stage)
+        apply_limits(pid, stage_class)
+        return Watch(self, pid, label, stage_class, stage_class.deadline(duration))
+
+    @contextmanager
+    def watch(
+        self,
+        pid: int,
+        label: str,
+        stage: STAGE_CLASSES = 'intermediate',
+        duration: Optional[float] = None
+    ) -> Iterator['Watch']:
+        """
+        Context manager version of `start`: the deadline is enforced for the
+        duration of the block.
+        """
+        watch = self.start(pid, label, stage, duration)
+        try:
+            yield watch
+        finally:
+            watch.cancel()
+
+    def _record(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            self.events.append(event)
+
+    def drain_events(self) -> List[Dict[str, Any]]:
+        """
+        Return the recorded events and forget them (call once per job).
+        """
+        with self._lock:
+            events, self.events = self.events, []
+        return events
+
+
+class Watch:
+    """
+    The deadline of one supervised child (see `Supervisor.watch`).
+
+    Attributes:
+        pid (int): The supervised child.
+        label (str): Stage name.
+        deadline (float): Wall-clock budget in seconds.
+        expired (bool): True once the deadline passed and the child was stopped.
+    """
+    def __init__(self, supervisor: Supervisor, pid: int, label: str, stage: StageClass, deadline: float) -> None:
+        self.supervisor = supervisor
+        self.pid = pid
+        self.label = label
+        self.stage = stage
+        self.deadline = deadline
+        self.expired = False
+        self._started = time.monotonic()
+        self._timer = threading.Timer(deadline, self._expire)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _expire(self) -> None:
+        self.expired = True
+        elapsed = round(time.monotonic() - self._started, 1)
+        logger.error(f"{self.label}: ffmpeg still running after {elapsed}s (deadline {self.deadline:.0f}s), killing it")
+        self.supervisor._record({
+            'label': self.label,
+            'stage': self.stage.name,
+            'pid': self.pid,
+            'deadline': self.deadline,
+            'elapsed': elapsed,
+        })
+        kill_group(self.pid, signal.SIGTERM)
+        self._timer = threading.Timer(self.supervisor.grace, kill_group, (self.pid, getattr(signal, 'SIGKILL', signal.SIGTERM)))
+        self._timer.daemon = True
+        self._timer.start()
+
+    def cancel(self) -> None:
+        """Stop watching (the child exited)."""
+        self._timer.cancel()
+
+    def error(self, command_type: str) -> str:
+        """Message for a command stopped by its deadline."""
+        return f"{command_type} \nERROR: {self.label} timed out after {self.deadline:.0f}s and was killed"
+
+
+supervisor = Supervisor()
+
+
+class SupervisedPopen(subprocess.Popen):
+    """
+    A Popen for children the caller drives itself (e.g. raw frames written to
+    its stdin), started in its own process group under the supervisor. The
+    deadline ends when the child is waited for.
+
+    Attributes:
+        watch (Watch): The child's deadline.
+    """
+    def __init__(
+        self,
+        command: List[str],
+        label: str,
+        stage: STAGE_CLASSES = 'pipe',
+        duration: Optional[float] = None,
+        **kwargs
+    ) -> None:
+        """
+        Args:
+            command (List[str]): Command line.
+            label (str): Stage name reported in events.
+            stage (str, optional): Stage class. Defaults to 'pipe'.
+            duration (float, optional): Expected output duration in seconds.
+            **kwargs: Passed to subprocess.Popen.
+        """
+        super().__init__(command, **popen_kwargs(), **kwargs)
+        self.watch = supervisor.start(self.pid, label, stage, duration)
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        returncode = super().wait(timeout)
+        self.watch.cancel()
+        return returncode
@@ -0,0 +1,167 @@
+from typing import Dict, List, Any, Optional
+from collections import defaultdict
+import threading
+import logging
+import json
+import time
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def _file_size(path: str) -> Optional[int]:
+    """Return the size of a file, or None if it does not exist (pipes, null outputs...)."""
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError):
+        return None
+
+
+def _input_paths(command: List[str]) -> List[str]:
+    """Return the values of every `-i` option of a command."""
+    return [command[idx + 1] for idx, arg in enumerate(command[:-1]) if arg == '-i']
+
+
+class FFmpegTracer:
+    """
+    Records every ffmpeg/ffprobe invocation to a JSONL trace file.
+
+    Each line holds the stage label, the arguments, wall time, the child's
+    user/sys CPU time, peak RSS, block I/O, and the input/output file sizes.
+    Tracing is off until `enable()` is called; `FFmpeg.run` and
+    `FFmpeg.run_async` report to the module level `tracer`.
+
+    Attributes:
+        path (str or None): Trace file, None while tracing is disabled.
+    """
+    def __init__(self) -> None:
+        self.path: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def enable(self, path: str) -> None:
+        """
+        Start appending records to `path` (created if missing).
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = str(path)
+        logger.info(f"Tracing ffmpeg invocations to {self.path}")
+
+    def disable(self) -> None:
+        self.path = None
+
+    def record(
+        self,
+        label: str,
+        command: List[str],
+        started: float,
+        returncode: int,
+        usage: Any = None,
+        output: Optional[str] = None
+    ) -> None:
+        """
+        Append one invocation to the trace.
+
+        Args:
+            label (str): Stage name (usually the function that ran the command).
+            command (List[str]): The full command line.
+            started (float): time.monotonic() when the child was started.
+            returncode (int): Exit status of the child.
+            usage (resource.struct_rusage, optional): Resource usage of this child,
+                None when the platform or runner cannot report it.
+            output (str, optional): Output file of the command, for its size.
+        """
+        if not self.enabled:
+            return
+
+        entry = {
+            'label': label,
+            'binary': os.path.basename(command[0]),
+            'args': command[1:],
+            'started': time.time() - (time.monotonic() - started),
+            'wall': round(time.monotonic() - started, 4),
+            'returncode': returncode,
+            'user_cpu': None,
+            'sys_cpu': None,
+            'peak_rss_kb': None,
+            'read_bytes': None,
+            'write_bytes': None,
+            'input_size': sum(_file_size(path) or 0 for path in _input_paths(command)),
+            'output_size': _file_size(output) if output else None,
+        }
+        if usage is not None:
+            entry.update({
+                'user_cpu': round(usage.ru_utime, 4),
+                'sys_cpu': round(usage.ru_stime, 4),
+                'peak_rss_kb': usage.ru_maxrss,
+                # block counts are in 512 byte units
+                'read_bytes': usage.ru_inblock * 512,
+                'write_bytes': usage.ru_oublock * 512,
+            })
+
+        with self._lock:
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry) + '\n')
+            except OSError as e:
+                logger.warning(f"Could not write ffmpeg trace record: {e}")
+
+
+def summarize_trace(path: str) -> List[Dict[str, Any]]:
+    """
+    Aggregate a trace file per stage label, most expensive stage first.
+
+    Args:
+        path (str): Trace file written by FFmpegTracer.
+
+    Returns:
+        List[Dict[str, Any]]: One row per label with its call count, total wall
+        and CPU time, the largest peak RSS and total output bytes.
+    """
+    stages = defaultdict(lambda: {
+        'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'peak_rss_kb': 0, 'output_size': 0
+    })
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            stage = stages[entry['label']]
+            stage['calls'] += 1
+            stage['wall'] += entry['wall']
+            stage['cpu'] += (entry['user_cpu'] or 0) + (entry['sys_cpu'] or 0)
+            stage['peak_rss_kb'] = max(stage['peak_rss_kb'], entry['peak_rss_kb'] or 0)
+            stage['output_size'] += entry['output_size'] or 0
+
+    total_wall = sum(stage['wall'] for stage in stages.values()) or 1.0
+    rows = [
+        {'label': label, **stage, 'share': stage['wall'] / total_wall}
+        for label, stage in stages.items()
+    ]
+    return sorted(rows, key=lambda row: row['wall'], reverse=True)
+
+
+def format_summary(rows: List[Dict[str, Any]]) -> str:
+    """
+    Render the rows of `summarize_trace` as a plain text table.
+    """
+    lines = [f"{'stage':<28}{'calls':>6}{'wall s':>10}{'cpu s':>10}{'share':>8}{'rss MB':>9}{'out MB':>9}"]
+    for row in rows:
+        lines.append(
+            f"{row['label'][:27]:<28}{row['calls']:>6}{row['wall']:>10.2f}{row['cpu']:>10.2f}"
+            f"{row['share'] * 100:>7.1f}%{row['peak_rss_kb'] / 1024:>9.1f}{row['output_size'] / 2**20:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+tracer = FFmpegTracer()
+
+
+if __name__ == "__main__":
+    import sys
+    print(format_summary(summarize_trace(sys.argv[1])))
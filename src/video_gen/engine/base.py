@@ -14,6 +14,14 @@ class BaseEngine:
         """
         raise NotImplementedError("Child classes should implement this method.")
 
+    def prepare(self, tasks: List[List[Dict]]) -> None:
+        """
+        This method can be overridden by child classes if needed.
+        It is called once with every task of a batch before any of them is
+        created, e.g. to pre-probe all the media the batch uses.
+        """
+        pass
+
     def clean_buffer(self) -> None:
         """
         This method can be overridden by child classes if needed.
@@ -1,5 +1,11 @@
 from video_gen.audio_gen import get_TTSModel
 from video_gen.editor.media import Video, Audio
+from video_gen.editor.ffmpeg import get_MediaInfo_many
+from video_gen.editor.supervisor import supervisor
+from video_gen.editor.streaming import StreamPipeline
+from video_gen.editor.audio_master import AudioTimeline
+from video_gen.editor.conformance import skipped_encodes
+from video_gen.editor.output_format import OutputFormat
 from video_gen.assets import Assets
 from video_gen.settings import setting
 from video_gen.editor import (
@@ -7,8 +13,8 @@ from video_gen.editor import (
     gen_trans_sub,
     typing_gen_trans_sub,
     typing_gen_trans_sub_std,
-    effect_get,
-    add_video_info
+    apply_effects,
+    compose_final
 )
 from video_gen.utils import (
     generate_unique_path,
@@ -17,7 +23,9 @@ from video_gen.utils import (
     print_task,
     copy_file,
     TempFile,
-    SafeFile
+    SafeFile,
+    Workspace,
+    export_file
 )
 from typing import List, Dict
 
@@ -35,7 +43,11 @@ class Engine:
         self.temp_file = TempFile()
         self.texttospeach = get_TTSModel()
         self.failed_tasks = []  # Stores failed tasks along with error messages
+        self.timeouts = []      # ffmpeg children killed by the supervisor, per task
         self.semi_clip = []
+        self.audio = AudioTimeline()    # narration and sound effects of the running task
+        self.stream = None      # StreamPipeline of the running task, in streaming mode
+        self.workspace = None   # Workspace of the running task, holds all its intermediates
         self.count = 0          # Number of successfully created videos
         self.total = 0          # Total attempted video creations
     
@@ -43,16 +55,21 @@ class Engine:
         """
         Gathers essential video settings from the provided dictionary.
 
+        The frame size, rate ("frame") and pixel format become one
+        `OutputFormat` ("format"), which every stage renders to.
+
         Args:
             info (Dict): Dictionary containing video configuration parameters.
 
         Returns:
             dict: A dictionary with validated and defaulted video settings.
         """
+        output_format = OutputFormat.from_task(info)
         return AttrDict({
-            'width': info.get('width', 720),
-            'height': info.get('height', 1280),
-            'fps': info.get('fps', 24),
+            'width': output_format.width,
+            'height': output_format.height,
+            'fps': output_format.fps,
+            'format': output_format,
             'title': info.get('title', 'no_title'),
             'file_type': info.get('file_type', 'mp4'),
             'font_name': Assets.Font.getpath(info.get('font', None)),
@@ -61,9 +78,38 @@ class Engine:
             'watermark': info.get('watermark', None),
             'end_video': info.get('end_video', None),
             'padding': info.get('padding', 100),
-            'text_color': info.get('text_color', '#FFFF00')
+            'text_color': info.get('text_color', '#FFFF00'),
+            'stream': info.get('stream', False),
+            'chunks': info.get('chunks', 1)
         })
 
+    def _media_paths(self, task: List[Dict]) -> List[str]:
+        """
+        Collects every media file a task refers to (backgrounds, watermark,
+        background music and end video).
+
+        Args:
+            task (List[Dict]): The task, video settings first then the clips.
+
+        Returns:
+            List[str]: Paths of the media used by the task.
+        """
+        info, clips = task[0], task[1:]
+        paths = [info.get(key) for key in ('bg_music', 'watermark', 'end_video')]
+        paths.extend(clip.get('video') for clip in clips)
+        return [path for path in paths if path]
+
+    def prepare(self, tasks: List[List[Dict]]) -> None:
+        """
+        Pre-probes the media of a whole batch in one concurrent pass, so the
+        pipeline later reads their metadata from the cache.
+
+        Args:
+            tasks (List[List[Dict]]): Every task of the batch.
+        """
+        paths = [path for task in tasks for path in self._media_paths(task)]
+        get_MediaInfo_many(paths, ignore_errors=True)
+
     def _nano_clip_creation(self, text:str, file_info) -> Video:
         """
         the dict should contain media info and text
@@ -84,8 +130,10 @@ class Engine:
             timestamps = timestamps,
             file_info = file_info,
             output_file = self.temp_file.create_unique_file("mov"),
+            mux_audio = False
         )
-        clean_files((audio))
+        # the narration plays under its (silent) subtitle clip
+        self.audio.append(audio, mov.duration)
         return mov
     
     def _assets_work(self, task:str, file_info, duration:int) -> Video:
@@ -105,28 +153,25 @@ class Engine:
             media = Video(task['video'])
             video_effect = task.get('effect', [])
             v_postion = task.get('v_postion', 'center')
+            v_start = task.get('v_start', None)   # seconds or "random"
         except KeyError as e:
             raise ValueError('the format is not correct cloudnet find media and effect')
         
-        video = media
-        for effect in video_effect:
-            effect = effect_get.get(effect)
-            video = effect(
-                input_path = video,
-                output_path = self.temp_file.create_unique_file("mov"),
-                total_duration = duration,
-                position = v_postion
-            )
-
-        if video_effect == []:
-            video = effect_get.get('no_effect')(
-                input_path = media,
-                output_path = self.temp_file.create_unique_file("mp4"),
-                duration = duration,
-                width = file_info.width,
-                height = file_info.height,
-                position = v_postion
-            )
+        # every effect is rendered by one ffmpeg run; when streaming, that run
+        # feeds the final render through a FIFO instead of writing a file
+        video = apply_effects(
+            input_path = media,
+            output_path = self.stream.fifo() if self.stream else self.temp_file.create_unique_file("mp4"),
+            effects = video_effect,
+            duration = duration,
+            width = file_info.width,
+            height = file_info.height,
+            position = v_postion,
+            offset = v_start,
+            seed = task.get('v_seed', None),
+            pipeline = self.stream,
+            output_format = file_info.format
+        )
         return video
     
     def analyze_text(self, task:List[str]) -> None:
@@ -166,20 +211,27 @@ class Engine:
             nano_clips.append(nano_clip)
         
         if extra and extra is not None:
-            nano_clips.append(
+            countdown = Video(
                 Assets.Clips.get(extra)(
                     count=3,
                     width=file_info.width,
                     height=file_info.height,
+                    fps=file_info.fps,
                     output_file = self.temp_file.create_unique_file("mov"),
-                    audio = os.path.join("/home/akkiraj/Desktop/QuestionAnswerAssets/QuestionAnswerAssets", "sfxCountdown.wav"),
                     font_path = file_info.font_name,
                     color = file_info.text_color
                 )
             )
+            nano_clips.append(countdown)
+            # louder, the end of the sound effect, fading out with the clip
+            self.audio.append(
+                os.path.join("/home/akkiraj/Desktop/QuestionAnswerAssets/QuestionAnswerAssets", "sfxCountdown.wav"),
+                countdown.duration, gain = 2.0, fade_out = 1.0, align = 'end'
+            )
         
         semi_clip = edit.concatenate_by_video(
             videos = nano_clips,
+            audio = False,
             output_path = self.temp_file.create_unique_file('mov')
         )
         clean_files(nano_clips)
@@ -223,51 +275,34 @@ class Engine:
         
         return clips
     
-    def _pre_final_processing(self, clips: List['Video'], fine_info) -> 'Video':
+    def _final_video(self, clips: List['Video'], video_info) -> Video:
         """
-        Applies final transformations on the concatenated video before output.
+        Renders the finished video in one pass: concatenates the clips, overlays
+        the subtitle clips, then adds the watermark, background music and end video.
+        The video is written inside the task's workspace (see `pipeline`).
 
         Args:
             clips (List[Video]): List of processed clips ready for final modifications.
 
         Returns:
-            Video: The processed video after applying final adjustments.
-        """
-        print("creating concatenate_steam")
-        main = edit.concatenate_stream(
-            *clips,
-            output_path = self.temp_file.create_unique_file("mp4"),
-            transition_duration=1,
-            transition_effect=None,
-            width = fine_info.width,
-            height = fine_info.height
-        )
-        print("creating concatenate_by_video")
-        clips = edit.concatenate_by_video(
-            self.semi_clip,
-            output_path = self.temp_file.create_unique_file("mov")
-        )
-        print("creating overlay_video_image")
-        return edit.overlay_video_image(
-            base_video = main,
-            overlay_video = clips,
-            output_path = self.temp_file.create_unique_file("mp4"),
-        )
-    
-    def _final_video(self, video: Video, video_info) -> None:
+            Video: The rendered video.
         """
-        Handles finalization steps such as watermarking, background music, 
-        and exporting the video in different formats.
-
-        Args:
-            video (Video): The final video ready for export.
-        """
-        return add_video_info(
-            video = video,
-            output_path = os.path.join(setting.temp_path,f'{video_info.title}.{video_info.file_type}'),
+        return compose_final(
+            clips = clips,
+            subtitles = self.semi_clip,
+            output_path = os.path.join(self.workspace.directory, f'{video_info.title}.{video_info.file_type}'),
+            width = video_info.width,
+            height = video_info.height,
+            transition_duration = 1,
+            transition_effect = None,
             watermark = video_info.get('watermark', None),
             bg_audio = video_info.get('bg_audio', None),
-            end_video = video_info.get('end_video', None)   
+            end_video = video_info.get('end_video', None),
+            pipeline = self.stream,
+            chunks = video_info.chunks,
+            audio = self.audio,
+            output_format = video_info.format,
+            workspace = self.workspace.directory
         )
     
     def pipeline(self, task:List[Dict]) -> str:
@@ -277,8 +312,17 @@ class Engine:
         Steps:
         1. Gather video settings using `_gather_info`.
         2. Create mini clips using `_clips_creation`.
-        3. Process final modifications using `_pre_final_processing`.
-        4. Finalize and export using `_final_video`.
+        3. Render and export the finished video using `_final_video`.
+
+        With `"stream": true` in the video settings the background clips are not
+        rendered in step 2: they are streamed into step 3 through FIFOs.
+        With `"chunks": n` the final encode of step 3 runs as n parallel parts.
+
+        Every intermediate file is created in a workspace of its own (in memory
+        with the `WORKSPACE_TMPFS` setting), removed in one go once the video is
+        exported, so several tasks can run at the same time. The video is
+        exported to `temp_path` as `<title>.<file_type>`, with a number added
+        when another task already holds that name.
 
         Args:
             task (List[Dict]): List of tasks defining video generation workflow.
@@ -287,10 +331,24 @@ class Engine:
             str: Path or identifier of the generated final video.
         """
         video_info  = self._gather_info(task[0])
-        clips:List  = self._clips_creation(task[1:], video_info)
-        final_video = self._pre_final_processing(clips, video_info)
-        final_video = self._final_video(final_video, video_info)
-        clean_files(clips)
+        try:
+            with Workspace(setting.temp_path, tmpfs = setting.get('WORKSPACE_TMPFS', False)) as self.workspace:
+                self.temp_file.directory = self.workspace.directory
+                if video_info.stream:
+                    with StreamPipeline(workspace = self.workspace.directory) as self.stream:
+                        clips:List  = self._clips_creation(task[1:], video_info)
+                        final_video = self._final_video(clips, video_info)
+                    self.stream = None
+                else:
+                    clips:List  = self._clips_creation(task[1:], video_info)
+                    final_video = self._final_video(clips, video_info)
+                # rendered in the workspace, exported under a name no other job holds
+                final_video = export_file(final_video, setting.temp_path, video_info.title, video_info.file_type)
+        finally:
+            # the intermediates went away with the workspace directory
+            self.temp_file.paths.clear()
+            self.temp_file.directory = None
+            self.workspace = None
         
         return str(final_video)
     
@@ -303,6 +361,10 @@ class Engine:
             task (List[Dict]): List of tasks defining video generation workflow.
         """
         self.semi_clip =[]
+        self.audio = AudioTimeline()
+        self.stream = None
+        self.workspace = None
+        supervisor.drain_events()
         path = None
         code = 1
         try:
@@ -320,13 +382,30 @@ class Engine:
             
         finally:
             self.total += 1
-            return path, code, 'no message yet'
+            message = 'no message yet'
+            events = supervisor.drain_events()
+            if events:
+                self.timeouts.append([task, events])
+                message = "; ".join(
+                    f"{event['label']} killed after {event['elapsed']}s (deadline {event['deadline']:.0f}s)"
+                    for event in events
+                )
+            return path, code, message
     
     def summary(self) -> None:
         """
         Prints a summary of completed and failed video creations.
         """
         print(f"Total {self.count} video(s) have been created out of {self.total} videos.")
+        if skipped_encodes.total:
+            methods = ", ".join(f"{count} {method}" for method, count in skipped_encodes.counts.items())
+            print(f"{skipped_encodes.total} encode(s) skipped for inputs that already conformed ({methods}).")
+        if self.timeouts:
+            count = sum(len(events) for _, events in self.timeouts)
+            print(f"{count} ffmpeg process(es) were killed for missing their deadline.")
+            for _, events in self.timeouts:
+                for event in events:
+                    print(f"Timeout: {event['label']} ({event['stage']}) after {event['elapsed']}s")
         if not self.failed_tasks:
             return
         
@@ -118,6 +118,8 @@ setting = AttrDict(
         "ASSETS_PATH": Path("/home/akkiraj/Desktop/video-gen/assets"),
         "temp_path": Path("/home/akkiraj/Desktop/video-gen/temp"),
         "TEMP_PATH": Path("/home/akkiraj/Desktop/video-gen/temp"),
-        "SETTING_LOG_PATH": Path('/home/akkiraj/Desktop/video-gen/error.log')
+        "SETTING_LOG_PATH": Path('/home/akkiraj/Desktop/video-gen/error.log'),
+        "WORKSPACE_TMPFS": False, # keep each job's intermediates in /dev/shm
+        "FFMPEG_CONCURRENCY": 1, # ffmpeg processes expected at once; each gets cores // this many threads
     }
 )
\ No newline at end of file
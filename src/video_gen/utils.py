@@ -3,7 +3,10 @@ from typing import Literal, Union, Tuple, Dict, List, Any, Iterable
 from collections import UserDict
 from colorama import Fore, Style
 from pathlib import Path
+import itertools
+import tempfile
 import logging
+import shutil
 import json
 import uuid
 import os
@@ -172,7 +175,11 @@ def api_key(name:str) -> str:
     return os.getenv(name)
 
 class Media:
-    pass
+    """
+    Base class of every media descriptor (Video, Audio).
+    Declares empty slots so subclasses can stay dict-free.
+    """
+    __slots__ = ()
 
 class TempFile:
     """
@@ -192,12 +199,17 @@ class TempFile:
     """
     _instances = []
 
-    def __init__(self) -> None:
+    def __init__(self, directory: Union[str, Path, None] = None) -> None:
         """
         Create a TempFile instance and track it.
+
+        Args:
+            directory (str, optional): Where `create_unique_file` creates files,
+                e.g. a job's Workspace. Defaults to assets.temp_path.
         """
         self.__class__._instances.append(self)
         self.paths = set()
+        self.directory = str(directory) if directory is not None else None
     
     
     @classmethod
@@ -227,7 +239,8 @@ class TempFile:
         Create a unique file and track it.
         """
         if path is None:
-            path = os.getcwd()  # Default to current directory
+            path = self.directory or assets.temp_path
+            os.makedirs(path, exist_ok=True)
 
         unique_path = generate_unique_path(temp_path = path, file_type = extension)
         self.paths.add(unique_path)
@@ -267,6 +280,98 @@ class TempFile:
         self.delete()
 
 
+TMPFS_PATH = "/dev/shm"
+
+
+class Workspace:
+    """
+    A private scratch directory for one job.
+
+    Every intermediate of a job (clips, list files, frames, FIFOs) is created
+    inside it, so jobs running at the same time, in one process or several,
+    never share a file name, and cleaning up is a single directory removal.
+
+    Usage:
+    >>> with Workspace(tmpfs=True) as workspace:
+    >>>     path = generate_unique_path(workspace.directory, "mp4")
+
+    Attributes:
+        root (str): Directory the workspace is created in.
+        directory (str or None): The workspace, while it is open.
+    """
+    def __init__(self, root: Union[str, Path, None] = None, tmpfs: bool = False, prefix: str = "job_") -> None:
+        """
+        Args:
+            root (str, optional): Parent directory. Defaults to assets.temp_path.
+            tmpfs (bool, optional): Create the workspace in memory (/dev/shm) when
+                available, for jobs whose intermediates fit in RAM. Defaults to False.
+            prefix (str, optional): Name prefix of the directory. Defaults to "job_".
+        """
+        if tmpfs:
+            if os.path.isdir(TMPFS_PATH) and os.access(TMPFS_PATH, os.W_OK):
+                root = TMPFS_PATH
+            else:
+                logger.warning(f"{TMPFS_PATH} is not available, using a disk workspace")
+        self.root = str(root or assets.temp_path)
+        self.prefix = prefix
+        self.directory = None
+
+    def open(self) -> str:
+        """
+        Create the workspace directory and return its path.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        self.directory = tempfile.mkdtemp(prefix=self.prefix, dir=self.root)
+        return self.directory
+
+    def cleanup(self) -> None:
+        """
+        Remove the workspace and everything in it.
+        """
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+
+    def __enter__(self) -> "Workspace":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.cleanup()
+
+    def __str__(self) -> str:
+        return str(self.directory)
+
+
+def export_file(source: Union[str, Path], directory: Union[str, Path], name: str, extension: str) -> Path:
+    """
+    Move a finished file out of a workspace to `directory` as `name.extension`,
+    or `name_1.extension`, `name_2.extension`... when that name is taken.
+
+    The name is claimed atomically (O_EXCL) before the file is moved over the
+    claim, so jobs exporting files with the same name at the same time never
+    overwrite each other's output.
+
+    Returns:
+        Path: Where the file was moved to.
+    """
+    os.makedirs(directory, exist_ok=True)
+    for count in itertools.count():
+        suffix = f"_{count}" if count else ""
+        target = os.path.join(directory, f"{name}{suffix}.{extension}")
+        try:
+            os.close(os.open(target, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            continue
+    try:
+        shutil.move(str(source), target)
+    except BaseException:
+        os.remove(target)
+        raise
+    return Path(target)
+
+
 import os
 from video_gen.utils import TempFile  # Import TempFile class
 
@@ -355,6 +460,7 @@ def validate_file(file_path:str) -> bool:
 DIR = project_root()
 class assets:
     temp_path = os.path.join(DIR, "assets", "temp")
+    cache_path = os.path.join(DIR, "assets", "cache")
     font_path = os.path.join(DIR, "assets","font","Mangal Regular.ttf")
     ffmpeg  = "ffmpeg"
     ffprobe = "ffprobe"
\ No newline at end of file
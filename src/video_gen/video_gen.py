@@ -16,6 +16,13 @@ class generate_video:
         self.count = 0
         self.total = 0
         
+    def prepare(self, tasks: List[List[Dict]]) -> None:
+        """
+        Lets the engine prepare a whole batch (e.g. pre-probe its media) before execution.
+        """
+        logger.debug(f"Preparing {len(tasks)} task(s)")
+        self.engion.prepare(tasks)
+
     def execute(self, data: List[Dict]) -> None:
         """
         Executes the video generation process.